@@ -180,6 +180,92 @@ class LibroLeerCompleto(LibroLeer):
     #Muestra una lista de objetos 'Categoria' completos (anidado).
     categorias: List[CategoriaLeer] = []
     
+# --- Esquema de filtros para Libros ---
+#Define los filtros combinables de la busqueda de libros (todos opcionales).
+class FiltrosLibro(SQLModel):
+    #Nombre exacto de un autor del libro.
+    autor: Optional[str] = None
+    #Nombre exacto de una categoria del libro.
+    categoria: Optional[str] = None
+    #Nombre exacto de la serie.
+    serie: Optional[str] = None
+    #Tipo exacto del publico objetivo.
+    publico: Optional[str] = None
+    #Nombre exacto de la editorial.
+    editorial: Optional[str] = None
+    #Rango de precio (inclusivo).
+    precio_min: Optional[float] = None
+    precio_max: Optional[float] = None
+    #Rango de ano de publicacion (inclusivo).
+    ano_min: Optional[int] = None
+    ano_max: Optional[int] = None
+    #Formato exacto (ej. "Físico", "Digital").
+    formato: Optional[str] = None
+
+# --- Esquemas para los conteos por faceta ---
+#Define el esquema de un valor de faceta (ej. una categoria) con su numero de libros.
+class Faceta(SQLModel):
+    id: int
+    nombre: str
+    total: int
+
+#Define el esquema de RESPUESTA de /Libros/facetas (una lista por faceta, de mayor a menor).
+class Facetas(SQLModel):
+    categorias: List[Faceta] = []
+    autores: List[Faceta] = []
+    editoriales: List[Faceta] = []
+    series: List[Faceta] = []
+    publicos: List[Faceta] = []
+
+# --- Esquemas para la carga masiva de Libros ---
+#Define el esquema de un error individual dentro de una carga masiva.
+class ErrorLoteLibro(SQLModel):
+    #Posicion (desde 0) del libro dentro de la lista recibida.
+    indice: int
+    #ISBN del libro que fallo (si se envio).
+    isbn: Optional[str] = None
+    #Mensaje que explica por que no se creo el libro.
+    detalle: str
+
+#Define el esquema de RESPUESTA de una carga masiva de libros.
+class ResultadoLoteLibros(SQLModel):
+    #Numero de libros creados con exito.
+    creados: int
+    #IDs de los libros creados (en el mismo orden en que se recibieron).
+    ids: List[int] = []
+    #Lista de libros que no se pudieron crear y el motivo.
+    errores: List[ErrorLoteLibro] = []
+
+# --- Esquemas para la carga masiva de Autores, Categorias, Series y Publicos ---
+#Define el esquema de una entidad dentro del resultado de una carga masiva.
+class EntidadLote(SQLModel):
+    id: int
+    #Nombre de la entidad (para PublicoObjetivo es su 'tipo').
+    nombre: str
+
+#Define el esquema de RESPUESTA de una carga masiva de entidades.
+class ResultadoLoteEntidades(SQLModel):
+    #Entidades que se crearon en esta peticion.
+    creados: List[EntidadLote] = []
+    #Entidades que ya existian con ese nombre (no se modifican).
+    existentes: List[EntidadLote] = []
+
+# --- Esquema para la eliminacion masiva de Autores, Categorias y Editoriales ---
+#Define el esquema de RESPUESTA de una eliminacion masiva.
+class ResultadoEliminacionLote(SQLModel):
+    #IDs que se borraron en esta peticion.
+    eliminados: List[int] = []
+    #IDs que no corresponden a ningun registro.
+    no_encontrados: List[int] = []
+
+# --- Esquema para la busqueda de Libros por lote de ISBN ---
+#Define el esquema de RESPUESTA de la busqueda por lote de ISBN.
+class ResultadoIsbnLote(SQLModel):
+    #Libros encontrados (en el mismo orden en que se pidieron sus ISBN).
+    libros: List[LibroLeerCompleto] = []
+    #ISBN que no corresponden a ningun libro.
+    no_encontrados: List[str] = []
+
 #Define un esquema de LECTURA COMPLETA para un Autor.
 class AutorLeer_con_Libros(AutorLeer):
     #Muestra una lista de los 'Libros' de ese autor (anidado).
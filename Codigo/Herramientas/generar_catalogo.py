@@ -0,0 +1,208 @@
+#Generador de catalogos sinteticos para pruebas de rendimiento
+
+#Llena el esquema de 'Modelo/modelo.py' con N libros (de 1k a 1M) y sus relaciones.
+#Los autores, categorias, series y editoriales se eligen con una distribucion tipo Zipf
+#(pocos muy populares y muchos con pocos libros), parecida a la de un catalogo real.
+#Con la misma semilla siempre se genera exactamente el mismo catalogo.
+
+#Uso (desde la carpeta 'Codigo'):
+#   python -m Herramientas.generar_catalogo --libros 100000 --bd sqlite:///./catalogo_100k.db
+
+#Modulos y librerias necesarias
+import argparse
+import itertools
+import logging
+import random
+import time
+from typing import Dict, List
+from sqlalchemy import event, func, insert
+from sqlmodel import Session, create_engine, select
+from Modelo import modelo
+from Servicios import facetas, versiones
+from Servicios.database import aplicar_pragmas, preparar_base_de_datos
+
+logger = logging.getLogger(__name__)
+
+#Numero de libros que se insertan por sentencia (executemany).
+TAMANO_BLOQUE = 10000
+
+#Listas de palabras para formar nombres y titulos.
+NOMBRES = [
+    "Ana", "Luis", "Maria", "Jose", "Carmen", "Juan", "Laura", "Pedro", "Sofia", "Miguel",
+    "Elena", "Jorge", "Lucia", "Diego", "Paula", "Andres", "Valeria", "Ricardo", "Isabel", "Fernando",
+    "Gabriela", "Raul", "Daniela", "Alberto", "Monica", "Hector", "Patricia", "Sergio", "Adriana", "Oscar",
+]
+APELLIDOS = [
+    "Garcia", "Martinez", "Lopez", "Hernandez", "Gonzalez", "Perez", "Rodriguez", "Sanchez", "Ramirez", "Torres",
+    "Flores", "Rivera", "Gomez", "Diaz", "Cruz", "Morales", "Reyes", "Ortiz", "Castillo", "Jimenez",
+    "Vargas", "Romero", "Mendoza", "Ruiz", "Aguilar", "Navarro", "Suarez", "Vega", "Rojas", "Silva",
+]
+CATEGORIAS = [
+    "Novela", "Ciencia Ficcion", "Fantasia", "Misterio", "Terror", "Romance", "Historia", "Biografia",
+    "Poesia", "Ensayo", "Filosofia", "Psicologia", "Ciencia", "Matematicas", "Fisica", "Quimica",
+    "Biologia", "Medicina", "Programacion", "Bases de Datos", "Redes", "Economia", "Negocios", "Derecho",
+    "Politica", "Sociologia", "Arte", "Musica", "Cine", "Fotografia", "Cocina", "Viajes",
+    "Deportes", "Salud", "Autoayuda", "Religion", "Infantil", "Juvenil", "Comic", "Teatro",
+]
+PUBLICOS = ["Publico en general", "Infantil", "Juvenil", "+18"]
+PALABRAS_TITULO = [
+    "sombra", "camino", "ciudad", "noche", "mar", "tiempo", "memoria", "fuego", "silencio", "jardin",
+    "viaje", "secreto", "reino", "luz", "tierra", "espejo", "invierno", "rio", "puerta", "historia",
+    "guerra", "sueno", "ciencia", "algoritmo", "codigo", "bosque", "estrella", "voz", "frontera", "isla",
+]
+FORMATOS = ["Físico", "Digital"]
+EDICIONES = ["1a", "2a", "3a", "4a"]
+
+#Define una funcion de ayuda que calcula los pesos acumulados de una distribucion Zipf con 'n' valores.
+def pesos_zipf(n: int, exponente: float = 1.1) -> List[float]:
+    return list(itertools.accumulate(1 / (rango ** exponente) for rango in range(1, n + 1)))
+
+#Define una funcion de ayuda que devuelve el siguiente id libre de una tabla.
+def siguiente_id(session: Session, modelo_cls) -> int:
+    return (session.exec(select(func.max(modelo_cls.id))).one() or 0) + 1
+
+#Define una funcion de ayuda que inserta filas en bloques de 'TAMANO_BLOQUE' (una sentencia por bloque).
+def insertar_en_bloques(session: Session, modelo_cls, filas: List[dict]) -> None:
+    for inicio in range(0, len(filas), TAMANO_BLOQUE):
+        session.execute(insert(modelo_cls), filas[inicio:inicio + TAMANO_BLOQUE])
+
+#Define la funcion que genera un catalogo con 'libros' libros en la base de datos del engine recibido.
+def generar_catalogo(motor, libros: int, semilla: int = 42) -> Dict[str, int]:
+    #Generador de numeros aleatorios propio (no altera el 'random' global).
+    rng = random.Random(semilla)
+    #Tamanos de cada entidad en proporcion al numero de libros.
+    total_autores = max(10, libros // 8)
+    total_series = max(5, libros // 50)
+    total_editoriales = max(5, min(500, libros // 200))
+
+    with Session(motor) as session:
+        #Solo se generan catalogos sobre una base de datos sin libros (los ISBN sinteticos chocarian).
+        if session.exec(select(func.count()).select_from(modelo.Libro)).one():
+            raise SystemExit("La base de datos ya tiene libros; usa un archivo nuevo para el catalogo sintetico.")
+
+        # 1. Entidades relacionadas (ids explicitos, para no tener que leerlos de vuelta)
+        primer_autor = siguiente_id(session, modelo.Autor)
+        autores_ids = list(range(primer_autor, primer_autor + total_autores))
+        vistos = set()
+        filas_autores = []
+        for autor_id in autores_ids:
+            nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+            #Los nombres repetidos se distinguen con el id (los servicios buscan por nombre exacto).
+            if nombre in vistos:
+                nombre = f"{nombre} {autor_id}"
+            vistos.add(nombre)
+            filas_autores.append({"id": autor_id, "nombre": nombre})
+        insertar_en_bloques(session, modelo.Autor, filas_autores)
+
+        primera_categoria = siguiente_id(session, modelo.Categoria)
+        categorias_ids = list(range(primera_categoria, primera_categoria + len(CATEGORIAS)))
+        insertar_en_bloques(session, modelo.Categoria, [
+            {"id": categoria_id, "nombre": nombre, "descripcion": f"Libros de {nombre.lower()}"}
+            for categoria_id, nombre in zip(categorias_ids, CATEGORIAS)
+        ])
+
+        primera_serie = siguiente_id(session, modelo.Serie)
+        series_ids = list(range(primera_serie, primera_serie + total_series))
+        insertar_en_bloques(session, modelo.Serie, [
+            {"id": serie_id, "nombre": f"Saga {rng.choice(PALABRAS_TITULO).capitalize()} {serie_id}"}
+            for serie_id in series_ids
+        ])
+
+        primer_publico = siguiente_id(session, modelo.PublicoObjetivo)
+        publicos_ids = list(range(primer_publico, primer_publico + len(PUBLICOS)))
+        insertar_en_bloques(session, modelo.PublicoObjetivo, [
+            {"id": publico_id, "tipo": tipo} for publico_id, tipo in zip(publicos_ids, PUBLICOS)
+        ])
+
+        #Cada editorial necesita su propia direccion (relacion uno-a-uno).
+        primera_direccion = siguiente_id(session, modelo.Direccion)
+        primera_editorial = siguiente_id(session, modelo.Editorial)
+        editoriales_ids = list(range(primera_editorial, primera_editorial + total_editoriales))
+        insertar_en_bloques(session, modelo.Direccion, [
+            {
+                "id": primera_direccion + i,
+                "calle": f"Calle {rng.choice(APELLIDOS)} {rng.randint(1, 999)}",
+                "ciudad_pais": rng.choice(["CDMX, Mexico", "Madrid, Espana", "Bogota, Colombia", "Buenos Aires, Argentina"]),
+                "codigo_postal": f"{rng.randint(10000, 99999)}",
+            }
+            for i in range(total_editoriales)
+        ])
+        insertar_en_bloques(session, modelo.Editorial, [
+            {"id": editorial_id, "nombre": f"Editorial {rng.choice(APELLIDOS)} {editorial_id}", "direccion_id": primera_direccion + i}
+            for i, editorial_id in enumerate(editoriales_ids)
+        ])
+
+        # 2. Libros y enlaces, generados e insertados por bloques (la memoria no crece con N)
+        pesos_autores = pesos_zipf(total_autores)
+        pesos_categorias = pesos_zipf(len(CATEGORIAS), 0.8)
+        pesos_series = pesos_zipf(total_series)
+        pesos_editoriales = pesos_zipf(total_editoriales)
+        primer_libro = siguiente_id(session, modelo.Libro)
+        for inicio in range(0, libros, TAMANO_BLOQUE):
+            filas_libros, enlaces_autores, enlaces_categorias = [], [], []
+            for indice in range(inicio, min(inicio + TAMANO_BLOQUE, libros)):
+                libro_id = primer_libro + indice
+                filas_libros.append({
+                    "id": libro_id,
+                    "isbn": f"978{indice:010d}",
+                    "titulo": " ".join(rng.choices(PALABRAS_TITULO, k=rng.randint(2, 5))).capitalize(),
+                    "edicion": rng.choices(EDICIONES, weights=[70, 20, 7, 3])[0],
+                    "ano_publicacion": rng.randint(1950, 2025),
+                    "paginas": rng.randint(60, 1200),
+                    "precio": round(rng.lognormvariate(5.5, 0.6), 2),
+                    "formato": rng.choices(FORMATOS, weights=[70, 30])[0],
+                    "editorial_id": rng.choices(editoriales_ids, cum_weights=pesos_editoriales)[0],
+                    "publico_objetivo_id": rng.choices(publicos_ids, weights=[60, 15, 15, 10])[0],
+                    #Alrededor de un tercio de los libros pertenece a una serie.
+                    "serie_id": rng.choices(series_ids, cum_weights=pesos_series)[0] if rng.random() < 0.3 else None,
+                })
+                #1 a 3 autores y 1 a 3 categorias por libro (sin repetir dentro del mismo libro).
+                for autor_id in set(rng.choices(autores_ids, cum_weights=pesos_autores, k=rng.choices([1, 2, 3], weights=[80, 15, 5])[0])):
+                    enlaces_autores.append({"libro_id": libro_id, "autor_id": autor_id})
+                for categoria_id in set(rng.choices(categorias_ids, cum_weights=pesos_categorias, k=rng.choices([1, 2, 3], weights=[60, 30, 10])[0])):
+                    enlaces_categorias.append({"libro_id": libro_id, "categoria_id": categoria_id})
+            session.execute(insert(modelo.Libro), filas_libros)
+            session.execute(insert(modelo.LibroAutorLink), enlaces_autores)
+            session.execute(insert(modelo.LibroCategoriaLink), enlaces_categorias)
+            logger.info("Libros generados: %s de %s", min(inicio + TAMANO_BLOQUE, libros), libros)
+
+        # 3. Datos derivados: conteos por faceta y contadores de version (los ETag anteriores dejan de valer)
+        facetas.recalcular(session.connection())
+        versiones.incrementar(session, *versiones.ENTIDADES_LIBRO)
+        session.commit()
+
+    #Devuelve cuantas filas se generaron de cada entidad.
+    return {
+        "libros": libros,
+        "autores": total_autores,
+        "categorias": len(CATEGORIAS),
+        "series": total_series,
+        "editoriales": total_editoriales,
+        "publicos": len(PUBLICOS),
+    }
+
+#Define la funcion que crea (si hace falta) las tablas en 'url' y genera ahi el catalogo.
+def generar_en_url(url: str, libros: int, semilla: int = 42) -> Dict[str, int]:
+    motor = create_engine(url)
+    #Usa los mismos PRAGMA que la aplicacion (WAL, cache, mmap...).
+    event.listen(motor, "connect", aplicar_pragmas)
+    try:
+        preparar_base_de_datos(motor)
+        return generar_catalogo(motor, libros, semilla)
+    finally:
+        motor.dispose()
+
+#Punto de entrada por linea de comandos.
+def main():
+    parser = argparse.ArgumentParser(description="Genera un catalogo sintetico de libros.")
+    parser.add_argument("--libros", type=int, default=10000, help="Numero de libros (ej. 1000 a 1000000).")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla del generador aleatorio.")
+    parser.add_argument("--bd", default="sqlite:///./catalogo_sintetico.db", help="URL de la base de datos destino.")
+    argumentos = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    inicio = time.perf_counter()
+    totales = generar_en_url(argumentos.bd, argumentos.libros, argumentos.semilla)
+    logger.info("Catalogo generado en %.1f s: %s", time.perf_counter() - inicio, totales)
+
+if __name__ == "__main__":
+    main()
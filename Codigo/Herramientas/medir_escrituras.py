@@ -0,0 +1,79 @@
+#Medicion del rendimiento de escritura de la API
+
+#Envia N peticiones POST a cada ruta de creacion (a traves de la aplicacion completa, con sus
+#dependencias y su serializacion) sobre una base de datos nueva en un directorio temporal,
+#y reporta cuantas escrituras por segundo se lograron y cuantos COMMIT hizo cada peticion.
+
+#Uso (desde la carpeta 'Codigo'):
+#   python -m Herramientas.medir_escrituras --peticiones 500
+
+#Modulos y librerias necesarias
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+#Define la funcion que arma los casos a medir (nombre -> (ruta, funcion que genera el cuerpo de la peticion numero i)).
+def casos_de_escritura() -> Dict[str, tuple]:
+    return {
+        "autores": ("/Autores/", lambda i: {"nombre": f"Autor {i}"}),
+        "categorias": ("/Categorias/", lambda i: {"nombre": f"Categoria {i}", "descripcion": "Medicion"}),
+        "series": ("/Series/", lambda i: {"nombre": f"Serie {i}"}),
+        "publicos_objetivo": ("/PublicoObjetivo/", lambda i: {"tipo": f"Publico {i}"}),
+        "editoriales": ("/Editoriales/", lambda i: {
+            "nombre": f"Editorial {i}",
+            "direccion": {"calle": f"Calle {i}", "ciudad_pais": "Ciudad, Pais", "codigo_postal": "00000"},
+        }),
+        "libros": ("/Libros/", lambda i: {
+            "titulo": f"Libro {i}", "isbn": f"escritura-{i}", "precio": 199.0, "formato": "Físico",
+            "editorial_nombre": "Editorial 0", "publico_objetivo_tipo": "Publico 0", "serie_nombre": "Serie 0",
+            "autores_nombres": ["Autor 0", "Autor 1"], "categorias_nombres": ["Categoria 0"],
+        }),
+    }
+
+#Define la funcion que envia 'peticiones' POST a una ruta y devuelve (escrituras por segundo, commits por peticion).
+def medir_caso(cliente, contador_commits: Dict[str, int], ruta: str, cuerpo: Callable[[int], dict], peticiones: int):
+    contador_commits["total"] = 0
+    inicio = time.perf_counter()
+    for numero in range(peticiones):
+        respuesta = cliente.post(ruta, json=cuerpo(numero))
+        if respuesta.status_code != 200:
+            raise RuntimeError(f"POST {ruta} devolvio {respuesta.status_code}: {respuesta.text}")
+    transcurrido = time.perf_counter() - inicio
+    return peticiones / transcurrido, contador_commits["total"] / peticiones
+
+#Punto de entrada por linea de comandos.
+def main():
+    parser = argparse.ArgumentParser(description="Mide las escrituras por segundo de las rutas de creacion.")
+    parser.add_argument("--peticiones", type=int, default=500, help="Peticiones POST por ruta.")
+    argumentos = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        #La URL de la BD se lee al importar 'Servicios.database', asi que se fija antes de importar la aplicacion.
+        os.environ["LIBRERIA_BD_URL"] = f"sqlite:///{os.path.join(directorio, 'escrituras.db')}"
+        from fastapi.testclient import TestClient
+        from sqlalchemy import event
+        from Servicios.database import engine
+        import main as aplicacion
+
+        #Cuenta los COMMIT que llegan a la BD (los de cada peticion, no los del arranque).
+        contador_commits = {"total": 0}
+        def contar_commit(conexion):
+            contador_commits["total"] += 1
+        event.listen(engine, "commit", contar_commit)
+
+        #El bloque 'with' ejecuta el arranque de la aplicacion (crea las tablas).
+        with TestClient(aplicacion.app) as cliente:
+            print(f"{'ruta':22} {'escrituras/s':>14} {'commits/peticion':>18}")
+            #Los libros se miden al final: usan las entidades creadas por los casos anteriores.
+            for nombre, (ruta, cuerpo) in casos_de_escritura().items():
+                por_segundo, commits = medir_caso(cliente, contador_commits, ruta, cuerpo, argumentos.peticiones)
+                print(f"{'POST ' + ruta:22} {por_segundo:14.1f} {commits:18.2f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    #Permite importar 'main' y los paquetes de la aplicacion desde la carpeta 'Codigo'.
+    sys.path.insert(0, os.getcwd())
+    main()
@@ -3,30 +3,40 @@
 #Librerias y modulos necesarios.
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 #Importa la biblioteca 'uuid' para generar identificadores unicos (para el ISBN).
 import uuid
 
 # --- Tablas Link (Many-to-Many) ---
 #Define la tabla de enlace (asociativa) para la relacion Libro <-> Autor.
 class LibroAutorLink(SQLModel, table=True):
+    #Indice (autor_id, libro_id): permite buscar los libros de un autor sin recorrer toda la tabla
+    #(la clave primaria empieza por 'libro_id' y no sirve para buscar por 'autor_id').
+    __table_args__ = (Index("ix_libroautorlink_autor_id_libro_id", "autor_id", "libro_id"),)
     #Define el campo 'libro_id' como clave foranea a 'libro.id' y parte de la clave primaria.
+    #'ON DELETE CASCADE': al borrar el libro, la BD borra sus enlaces.
     libro_id: Optional[int] = Field(
-        default=None, foreign_key="libro.id", primary_key=True
+        default=None, foreign_key="libro.id", primary_key=True, ondelete="CASCADE"
     )
     #Define el campo 'autor_id' como clave foranea a 'autor.id' y parte de la clave primaria.
+    #'ON DELETE CASCADE': al borrar el autor, la BD borra sus enlaces (sin cargar sus libros en memoria).
     autor_id: Optional[int] = Field(
-        default=None, foreign_key="autor.id", primary_key=True
+        default=None, foreign_key="autor.id", primary_key=True, ondelete="CASCADE"
     )
 
 #Define la tabla de enlace (asociativa) para la relacion Libro <-> Categoria.
 class LibroCategoriaLink(SQLModel, table=True):
+    #Indice (categoria_id, libro_id): permite buscar los libros de una categoria sin recorrer toda la tabla.
+    __table_args__ = (Index("ix_librocategorialink_categoria_id_libro_id", "categoria_id", "libro_id"),)
     #Define el campo 'libro_id' como clave foranea a 'libro.id' y parte de la clave primaria.
+    #'ON DELETE CASCADE': al borrar el libro, la BD borra sus enlaces.
     libro_id: Optional[int] = Field(
-        default=None, foreign_key="libro.id", primary_key=True
+        default=None, foreign_key="libro.id", primary_key=True, ondelete="CASCADE"
     )
     #Define el campo 'categoria_id' como clave foranea a 'categoria.id' y parte de la clave primaria.
+    #'ON DELETE CASCADE': al borrar la categoria, la BD borra sus enlaces (sin cargar sus libros en memoria).
     categoria_id: Optional[int] = Field(
-        default=None, foreign_key="categoria.id", primary_key=True
+        default=None, foreign_key="categoria.id", primary_key=True, ondelete="CASCADE"
     )
 
 # --- Tablas de Entidad ---
@@ -48,8 +58,8 @@ class Direccion(SQLModel, table=True):
 class Editorial(SQLModel, table=True):
     #Define la clave primaria 'id'.
     id: Optional[int] = Field(default=None, primary_key=True)
-    #Define el campo 'nombre' como un string.
-    nombre: str
+    #Define el campo 'nombre' como un string, indexado (se busca por nombre al crear libros).
+    nombre: str = Field(index=True)
     
     #Define la clave foranea 'direccion_id' que apunta a 'direccion.id'.
     direccion_id: int = Field(foreign_key="direccion.id")
@@ -57,7 +67,8 @@ class Editorial(SQLModel, table=True):
     direccion: Direccion = Relationship(back_populates="editorial")
     
     #Define la relacion (uno-a-muchos) con 'Libro' (una editorial tiene muchos libros).
-    libros: List["Libro"] = Relationship(back_populates="editorial")
+    #'passive_deletes': al borrar no se cargan los libros; los servicios los desvinculan con un solo UPDATE.
+    libros: List["Libro"] = Relationship(back_populates="editorial", passive_deletes=True)
 
 #Define el modelo de la tabla 'categoria'.
 class Categoria(SQLModel, table=True):
@@ -71,16 +82,17 @@ class Categoria(SQLModel, table=True):
     descripcion: Optional[str] = None
     
     #Define la relacion muchos-a-muchos con 'Libro', usando 'LibroCategoriaLink' como tabla de enlace.
+    #'passive_deletes': al borrar no se cargan los libros; los enlaces los borra la BD (ON DELETE CASCADE).
     libros: List["Libro"] = Relationship(
-        back_populates="categorias", link_model=LibroCategoriaLink
+        back_populates="categorias", link_model=LibroCategoriaLink, passive_deletes=True
     )
 
 #Define el modelo de la tabla 'publicoobjetivo'.
 class PublicoObjetivo(SQLModel, table=True):
     #Define la clave primaria 'id'.
     id: Optional[int] = Field(default=None, primary_key=True)
-    #Define el campo 'tipo' (ej. +18, Publico en general), y lo marca como indexado.
-    tipo: str = Field(index=True) # +18, Publico en general, Dinámico
+    #Define el campo 'tipo' (ej. +18, Publico en general), indexado y con restriccion unica.
+    tipo: str = Field(index=True, unique=True) # +18, Publico en general, Dinámico
     
     #Define la relacion (uno-a-muchos) con 'Libro' (un publico tiene muchos libros).
     libros: List["Libro"] = Relationship(back_populates="publico_objetivo")
@@ -89,8 +101,8 @@ class PublicoObjetivo(SQLModel, table=True):
 class Serie(SQLModel, table=True):
     #Define la clave primaria 'id'.
     id: Optional[int] = Field(default=None, primary_key=True)
-    #Define el campo 'nombre' como string y lo marca como indexado.
-    nombre: str = Field(index=True)
+    #Define el campo 'nombre', indexado y con restriccion unica.
+    nombre: str = Field(index=True, unique=True)
     
     #Define la relacion (uno-a-muchos) con 'Libro' (una serie tiene muchos libros).
     libros: List["Libro"] = Relationship(back_populates="serie")
@@ -99,17 +111,24 @@ class Serie(SQLModel, table=True):
 class Autor(SQLModel, table=True):
     #Define la clave primaria 'id'.
     id: Optional[int] = Field(default=None, primary_key=True)
-    #Define el campo 'nombre' como string y lo marca como indexado.
-    nombre: str = Field(index=True)
+    #Define el campo 'nombre', indexado y con restriccion unica.
+    nombre: str = Field(index=True, unique=True)
     
     #Define la relacion muchos-a-muchos con 'Libro', usando 'LibroAutorLink' como tabla de enlace.
+    #'passive_deletes': al borrar no se cargan los libros; los enlaces los borra la BD (ON DELETE CASCADE).
     libros: List["Libro"] = Relationship(
-        back_populates="autores", link_model=LibroAutorLink
+        back_populates="autores", link_model=LibroAutorLink, passive_deletes=True
     )
 
 # --- Tabla Principal: Libro ---
 #Define el modelo de la tabla principal 'libro'.
 class Libro(SQLModel, table=True):
+    #Indices para los filtros por rango y formato de /Libros/filtrar.
+    __table_args__ = (
+        Index("ix_libro_precio", "precio"),
+        Index("ix_libro_ano_publicacion", "ano_publicacion"),
+        Index("ix_libro_formato_precio", "formato", "precio"),
+    )
     #Define la clave primaria 'id'.
     id: Optional[int] = Field(default=None, primary_key=True)
     
@@ -136,18 +155,18 @@ class Libro(SQLModel, table=True):
     formato: str
 
     # --- Relaciones (Foreign Keys) ---
-    #Define la clave foranea 'editorial_id' (opcional) que apunta a 'editorial.id'.
-    editorial_id: Optional[int] = Field(default=None, foreign_key="editorial.id")
+    #Define la clave foranea 'editorial_id' (opcional, indexada) que apunta a 'editorial.id'.
+    editorial_id: Optional[int] = Field(default=None, foreign_key="editorial.id", index=True)
     #Define la relacion (muchos-a-uno) con 'Editorial'.
     editorial: Optional[Editorial] = Relationship(back_populates="libros")
     
-    #Define la clave foranea 'publico_objetivo_id' (opcional).
-    publico_objetivo_id: Optional[int] = Field(default=None, foreign_key="publicoobjetivo.id")
+    #Define la clave foranea 'publico_objetivo_id' (opcional, indexada).
+    publico_objetivo_id: Optional[int] = Field(default=None, foreign_key="publicoobjetivo.id", index=True)
     #Define la relacion (muchos-a-uno) con 'PublicoObjetivo'.
     publico_objetivo: Optional[PublicoObjetivo] = Relationship(back_populates="libros")
     
-    #Define la clave foranea 'serie_id' (opcional).
-    serie_id: Optional[int] = Field(default=None, foreign_key="serie.id")
+    #Define la clave foranea 'serie_id' (opcional, indexada).
+    serie_id: Optional[int] = Field(default=None, foreign_key="serie.id", index=True)
     #Define la relacion (muchos-a-uno) con 'Serie'.
     serie: Optional[Serie] = Relationship(back_populates="libros")
 
@@ -159,4 +178,33 @@ class Libro(SQLModel, table=True):
     #Define la relacion muchos-a-muchos con 'Categoria', usando 'LibroCategoriaLink'.
     categorias: List[Categoria] = Relationship(
         back_populates="libros", link_model=LibroCategoriaLink
-    )
\ No newline at end of file
+    )
+# --- Tabla de versiones del catalogo ---
+#Define el modelo de la tabla 'versioncatalogo': un contador por tipo de entidad.
+#Cada escritura incrementa el contador de su entidad (en la misma transaccion),
+#asi las rutas GET pueden saber si algo cambio sin consultar las tablas del catalogo.
+class VersionCatalogo(SQLModel, table=True):
+    #Define el nombre de la entidad (ej. 'libros', 'autores') como clave primaria.
+    entidad: str = Field(primary_key=True)
+    #Define el contador de cambios de la entidad.
+    version: int = 0
+
+# --- Tabla de conteos por faceta ---
+#Define el modelo de la tabla 'conteofaceta': cuantos libros tiene cada autor, categoria, editorial, serie y publico.
+#Se mantiene al crear libros y al borrar entidades, asi los conteos sin filtro no recorren el catalogo.
+class ConteoFaceta(SQLModel, table=True):
+    #Define el tipo de faceta (ej. 'autores', 'categorias') como parte de la clave primaria.
+    faceta: str = Field(primary_key=True)
+    #Define el id de la entidad contada como parte de la clave primaria.
+    entidad_id: int = Field(primary_key=True)
+    #Define el numero de libros asociados a la entidad.
+    total: int = 0
+
+# --- Tabla con la huella del esquema ---
+#Define el modelo de la tabla 'huellaesquema': guarda un hash del esquema con el que se creo la base de datos.
+#Al arrancar, si el hash coincide con el del codigo actual, se omite 'create_all' (ver Servicios/database.py).
+class HuellaEsquema(SQLModel, table=True):
+    #Define la clave primaria 'id' (siempre hay una sola fila, con id 1).
+    id: int = Field(default=1, primary_key=True)
+    #Define el hash (SHA-256) del esquema.
+    huella: str
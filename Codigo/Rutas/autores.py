@@ -1,15 +1,16 @@
 #Auores: Rutas para gestionar autores en la aplicacion FastAPI.
 
 #Modulo y librerias
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session
-from typing import List
-from Servicios import servicios
+from typing import List, Optional, Union
+from Servicios import servicios, paginacion, versiones, serializacion
 from Esquemas import esquemas
-from Servicios.database import get_session
+from Servicios.metricas import RutaMedida
+from Servicios.database import UNIDAD_DE_TRABAJO, get_read_session
 
 
-router = APIRouter(prefix="/Autores", tags=["Autores"])
+router = APIRouter(prefix="/Autores", tags=["Autores"], route_class=RutaMedida)
 
 # --- Rutas para Autores ---
 #Define el endpoint POST en la raiz (/Autores/), especificando el modelo de respuesta.
@@ -19,27 +20,112 @@ def crear_autor(
     #Define que el cuerpo (body) de la peticion debe seguir el esquema 'AutorCreacion'.
     autor: esquemas.AutorCreacion, 
     #Inyecta la dependencia de la sesion de la base de datos.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
     #Delega la logica de creacion al modulo de 'servicios' y devuelve el resultado.
     return servicios.create_autor(session=session, autor_create=autor)
 
+#Define el endpoint POST en /bulk para crear muchos registros en una sola peticion.
+@router.post("/bulk", response_model=esquemas.ResultadoLoteEntidades)
+#Define la funcion para la carga masiva.
+def crear_autores_lote(
+    #Define que el cuerpo (body) debe ser una lista con el esquema 'AutorCreacion' (de 1 a MAX_ENTIDADES_LOTE).
+    autores: List[esquemas.AutorCreacion] = Body(..., min_length=1, max_length=servicios.MAX_ENTIDADES_LOTE),
+    #Inyecta la dependencia de la sesion de la base de datos.
+    session: Session = UNIDAD_DE_TRABAJO
+):
+    #Delega la carga (INSERT ... ON CONFLICT DO NOTHING por bloques) al modulo de 'servicios'.
+    #Los nombres que ya existian se reportan en 'existentes' sin modificarse.
+    return servicios.create_autores_lote(session=session, autores_create=autores)
+
 
 #Define el endpoint GET en la raiz (/Autores/), respondiendo con una lista de autores.
-@router.get("/", response_model=List[esquemas.AutorLeer])
+#Sin parametros responde List[AutorLeer]; con '?incluir_libros=true', List[AutorLeer_con_Libros] (los dos en el OpenAPI).
+@router.get("/", response_model=Union[List[esquemas.AutorLeer], List[esquemas.AutorLeer_con_Libros]])
 #Define la funcion para leer todos los autores.
 def leer_autores(
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' (para paginacion), con valor minimo 0.
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad), con valor minimo 0.
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' (para paginacion), con minimo 1 y maximo 100.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None),
+    #Define el parametro de consulta 'incluir_libros': agrega los libros de cada autor (cargados por lotes).
+    incluir_libros: bool = Query(False)
+):
+    #Con los libros incluidos, la respuesta tambien cambia cuando cambian los libros.
+    entidades = (versiones.AUTORES, versiones.LIBROS) if incluir_libros else (versiones.AUTORES,)
+    #Convierte cada autor al esquema pedido: sin 'incluir_libros' no se toca la relacion (no hay cargas perezosas).
+    esquema = esquemas.AutorLeer_con_Libros if incluir_libros else esquemas.AutorLeer
+    #Responde 304 si no cambio nada; si cambio, consulta la pagina, agrega el cursor siguiente y convierte los autores.
+    return serializacion.responder_lectura(
+        session, request, response, entidades,
+        #Llama al servicio para obtener la lista de autores, pasando la paginacion.
+        lambda session: servicios.get_autores_todos(
+            session, skip=skip, limit=limit, cursor=cursor, incluir_libros=incluir_libros
+        ),
+        limit=limit, salida=lambda autores, response: [esquema.model_validate(autor) for autor in autores],
+    )
+
+#Define el endpoint GET en /{autor_id}/libros, respondiendo con el autor y una pagina de sus libros.
+@router.get("/{autor_id}/libros", response_model=esquemas.AutorLeer_con_Libros)
+#Define la funcion para leer los libros de un autor.
+def leer_libros_de_autor(
+    #Recibe el 'autor_id' desde la ruta (path parameter).
+    autor_id: int,
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad), con valor minimo 0.
+    skip: int = Query(0, ge=0),
+    #Define el parametro de consulta 'limit' (para paginacion), con minimo 1 y maximo 100.
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None)
+):
+    #Define la consulta: el autor con una pagina de sus libros, y el cursor de esa pagina.
+    def consultar(session: Session):
+        #Llama al servicio para obtener el autor por su ID.
+        db_autor = servicios.get_autor(session, autor_id=autor_id)
+        #Si el autor no se encuentra (devuelve None).
+        if not db_autor:
+            #Lanza un error HTTP 404 (No Encontrado).
+            raise HTTPException(status_code=404, detail="Autor no encontrado")
+        #Llama al servicio para obtener la pagina de libros (recorre el indice de la tabla de enlace por 'autor_id').
+        libros = servicios.get_libros_de_autor(session, autor_id, skip=skip, limit=limit, cursor=cursor)
+        #Devuelve el autor con la pagina de libros (no con todos sus libros); el cursor sale de los libros.
+        autor = esquemas.AutorLeer_con_Libros(
+            id=db_autor.id,
+            nombre=db_autor.nombre,
+            libros=[esquemas.LibroLeer.model_validate(libro) for libro in libros],
+        )
+        return autor, paginacion.siguiente_cursor(libros, limit)
+    #Responde 304 si ni los autores ni los libros cambiaron; si cambiaron, consulta y agrega el cursor siguiente.
+    return serializacion.responder_lectura(
+        session, request, response, (versiones.AUTORES, versiones.LIBROS), consultar
+    )
+
+#Define el endpoint DELETE en la raiz (/Autores/) para borrar muchos registros en una sola peticion.
+@router.delete("/", response_model=esquemas.ResultadoEliminacionLote)
+#Define la funcion para la eliminacion masiva.
+def eliminar_autores_lote(
+    #Define que el cuerpo (body) debe ser una lista de IDs.
+    ids: List[int] = Body(..., min_length=1, max_length=servicios.MAX_IDS_LOTE),
+    #Inyecta la dependencia de la sesion de la base de datos.
+    session: Session = UNIDAD_DE_TRABAJO
 ):
-    #Llama al servicio para obtener la lista de autores, pasando la paginacion.
-    autores = servicios.get_autores_todos(session, skip=skip, limit=limit)
-    #Devuelve la lista de autores encontrada.
-    return autores
+    #Delega el borrado (DELETE ... IN por bloques; los enlaces con libros los borra la BD) al modulo de 'servicios'.
+    #Los IDs que no existian se reportan en 'no_encontrados'.
+    return servicios.eliminar_autores(session=session, ids=ids)
 
 #Define el endpoint DELETE para un autor especifico, esperando un codigo 204 (No Content) al exito.
 @router.delete("/{autor_id}", status_code=204)
@@ -48,18 +134,13 @@ def eliminar_autor(
     #Recibe el 'autor_id' desde la ruta (path parameter).
     autor_id: int,
     #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
-    #Llama al servicio para obtener el autor por su ID.
-    db_autor = servicios.get_autor(session, autor_id=autor_id)
-    #Si el autor no se encuentra (devuelve None).
-    if not db_autor:
+    #Borra con una sentencia DELETE (sin cargar el objeto ni sus libros); tambien actualiza conteos, version y cache.
+    resultado = servicios.eliminar_autores(session=session, ids=[autor_id])
+    #Si no se borro nada, el registro no existia.
+    if not resultado.eliminados:
         #Lanza un error HTTP 404 (No Encontrado).
         raise HTTPException(status_code=404, detail="Autor no encontrado")
-    
-    #Marca el objeto 'db_autor' para ser eliminado.
-    session.delete(db_autor)
-    #Confirma (guarda) la eliminacion en la base de datos.
-    session.commit()
-    #Devuelve la respuesta (automaticamente sera 204 No Content, como se definio).
+    #Devuelve la respuesta (automaticamente sera 204 No Content).
     return
\ No newline at end of file
@@ -1,15 +1,16 @@
 #Categorias: Rutas para gestionar categorias de libros
 
 #Modulos y librerias
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session
-from typing import List
-from Servicios import servicios
+from typing import List, Optional
+from Servicios import servicios, versiones, serializacion
 from Esquemas import esquemas
-from Servicios.database import get_session
+from Servicios.metricas import RutaMedida
+from Servicios.database import UNIDAD_DE_TRABAJO, get_read_session
 
 
-router = APIRouter(prefix="/Categorias", tags=["Categorias"])
+router = APIRouter(prefix="/Categorias", tags=["Categorias"], route_class=RutaMedida)
 
 #Define el endpoint POST en la raiz (/Categorias/), especificando el modelo de respuesta.
 @router.post("/", response_model=esquemas.CategoriaLeer)
@@ -18,26 +19,61 @@ def crear_categoria(
     #Define que el cuerpo (body) de la peticion debe seguir el esquema 'CategoriaCrear'.
     categoria: esquemas.CategoriaCrear, 
     #Inyecta la dependencia de la sesion de la base de datos.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
     #Delega la logica de creacion (incluyendo la validacion de nombre unico) al modulo de 'servicios'.
     return servicios.create_categoria(session=session, categoria_create=categoria)
 
+#Define el endpoint POST en /bulk para crear muchos registros en una sola peticion.
+@router.post("/bulk", response_model=esquemas.ResultadoLoteEntidades)
+#Define la funcion para la carga masiva.
+def crear_categorias_lote(
+    #Define que el cuerpo (body) debe ser una lista con el esquema 'CategoriaCrear' (de 1 a MAX_ENTIDADES_LOTE).
+    categorias: List[esquemas.CategoriaCrear] = Body(..., min_length=1, max_length=servicios.MAX_ENTIDADES_LOTE),
+    #Inyecta la dependencia de la sesion de la base de datos.
+    session: Session = UNIDAD_DE_TRABAJO
+):
+    #Delega la carga (INSERT ... ON CONFLICT DO NOTHING por bloques) al modulo de 'servicios'.
+    #Los nombres que ya existian se reportan en 'existentes' sin modificarse.
+    return servicios.create_categorias_lote(session=session, categorias_create=categorias)
+
 #Define el endpoint GET en la raiz (/Categorias/), respondiendo con una lista de categorias.
 @router.get("/", response_model=List[esquemas.CategoriaLeer])
 #Define la funcion para leer todas las categorias.
 def leer_categorias(
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' (para paginacion), con valor minimo 0.
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad), con valor minimo 0.
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' (para paginacion), con minimo 1 y maximo 100.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None)
+):
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina y agrega el cursor siguiente.
+    return serializacion.responder_lectura(
+        session, request, response, (versiones.CATEGORIAS,),
+        #Llama al servicio para obtener la lista de categorias, pasando la paginacion.
+        lambda session: servicios.get_categorias_todos(session, skip=skip, limit=limit, cursor=cursor),
+        limit=limit,
+    )
+
+#Define el endpoint DELETE en la raiz (/Categorias/) para borrar muchos registros en una sola peticion.
+@router.delete("/", response_model=esquemas.ResultadoEliminacionLote)
+#Define la funcion para la eliminacion masiva.
+def eliminar_categorias_lote(
+    #Define que el cuerpo (body) debe ser una lista de IDs.
+    ids: List[int] = Body(..., min_length=1, max_length=servicios.MAX_IDS_LOTE),
+    #Inyecta la dependencia de la sesion de la base de datos.
+    session: Session = UNIDAD_DE_TRABAJO
 ):
-    #Llama al servicio para obtener la lista de categorias, pasando la paginacion.
-    categorias = servicios.get_categorias_todos(session, skip=skip, limit=limit)
-    #Devuelve la lista de categorias encontrada.
-    return categorias
+    #Delega el borrado (DELETE ... IN por bloques; los enlaces con libros los borra la BD) al modulo de 'servicios'.
+    #Los IDs que no existian se reportan en 'no_encontrados'.
+    return servicios.eliminar_categorias(session=session, ids=ids)
 
 #Define el endpoint DELETE para una categoria especifica, esperando un codigo 204 (No Content) al exito.
 @router.delete("/{categoria_id}", status_code=204)
@@ -46,18 +82,13 @@ def eliminar_categoria(
     #Recibe el 'categoria_id' desde la ruta (path parameter).
     categoria_id: int,
     #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
-    #Llama al servicio para obtener la categoria por su ID.
-    db_categoria = servicios.get_categoria(session, categoria_id=categoria_id)
-    #Si la categoria no se encuentra (devuelve None).
-    if not db_categoria:
+    #Borra con una sentencia DELETE (sin cargar el objeto ni sus libros); tambien actualiza conteos, version y cache.
+    resultado = servicios.eliminar_categorias(session=session, ids=[categoria_id])
+    #Si no se borro nada, el registro no existia.
+    if not resultado.eliminados:
         #Lanza un error HTTP 404 (No Encontrado).
         raise HTTPException(status_code=404, detail="Categoria no encontrada")
-    
-    #Marca el objeto 'db_categoria' para ser eliminado.
-    session.delete(db_categoria)
-    #Confirma (guarda) la eliminacion en la base de datos.
-    session.commit()
     #Devuelve la respuesta (automaticamente sera 204 No Content).
     return
\ No newline at end of file
@@ -1,15 +1,16 @@
 #Editoriales
 
 #Librerias y modulos necesarios
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session
-from typing import List
-from Servicios import servicios
+from typing import List, Optional
+from Servicios import servicios, versiones, serializacion
 from Esquemas import esquemas
-from Servicios.database import get_session
+from Servicios.metricas import RutaMedida
+from Servicios.database import UNIDAD_DE_TRABAJO, get_read_session
 
 
-router = APIRouter(prefix="/Editoriales", tags=["Editoriales"])
+router = APIRouter(prefix="/Editoriales", tags=["Editoriales"], route_class=RutaMedida)
 
 #Define el endpoint POST en la raiz (/Editoriales/), especificando el modelo de respuesta.
 @router.post("/", response_model=esquemas.EditorialLeer)
@@ -18,7 +19,7 @@ def crear_editorial(
     #Define que el cuerpo (body) de la peticion debe seguir el esquema 'EditorialCrear'.
     editorial: esquemas.EditorialCrear, 
     #Inyecta la dependencia de la sesion de la base de datos.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
     #Delega la logica de creacion (incluyendo la creacion anidada de la direccion) al modulo de 'servicios'.
     return servicios.create_editorial(session=session, editorial_create=editorial)
@@ -27,17 +28,26 @@ def crear_editorial(
 @router.get("/", response_model=List[esquemas.EditorialLeer])
 #Define la funcion para leer todas las editoriales.
 def leer_editoriales_todas(
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' (para paginacion), con valor minimo 0.
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad), con valor minimo 0.
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' (para paginacion), con minimo 1 y maximo 100.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None)
 ):
-    #Llama al servicio para obtener la lista de editoriales, pasando la paginacion.
-    editoriales = servicios.get_editoriales_todas(session, skip=skip, limit=limit)
-    #Devuelve la lista de editoriales encontrada.
-    return editoriales
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina y agrega el cursor siguiente.
+    return serializacion.responder_lectura(
+        session, request, response, (versiones.EDITORIALES,),
+        #Llama al servicio para obtener la lista de editoriales, pasando la paginacion.
+        lambda session: servicios.get_editoriales_todas(session, skip=skip, limit=limit, cursor=cursor),
+        limit=limit,
+    )
 
 
 # (Añade esto en Rutas/editoriales.py, junto a tus otras rutas)
@@ -51,7 +61,7 @@ def actualizar_editorial_ruta(
     #Recibe los datos de actualizacion (del body) que coinciden con el esquema.
     editorial_update: esquemas.EditorialActualizar,
     #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
     # 1. Busca la editorial
     #Llama al servicio 'get_editorial' para encontrar la editorial por su ID.
@@ -72,6 +82,19 @@ def actualizar_editorial_ruta(
         editorial_update=editorial_update
     )
 
+#Define el endpoint DELETE en la raiz (/Editoriales/) para borrar muchos registros en una sola peticion.
+@router.delete("/", response_model=esquemas.ResultadoEliminacionLote)
+#Define la funcion para la eliminacion masiva.
+def eliminar_editoriales_lote(
+    #Define que el cuerpo (body) debe ser una lista de IDs.
+    ids: List[int] = Body(..., min_length=1, max_length=servicios.MAX_IDS_LOTE),
+    #Inyecta la dependencia de la sesion.
+    session: Session = UNIDAD_DE_TRABAJO
+):
+    #Delega el borrado (editoriales, sus direcciones y la desvinculacion de sus libros) al modulo de 'servicios'.
+    #Los IDs que no existian se reportan en 'no_encontrados'.
+    return servicios.eliminar_editoriales(session=session, ids=ids)
+
 #Define el endpoint DELETE para una editorial especifica, esperando un codigo 204 (No Content).
 @router.delete("/{editorial_id}", 
     #Define el codigo de estado HTTP para una eliminacion exitosa.
@@ -82,32 +105,17 @@ def eliminar_editorial(
     #Recibe el 'editorial_id' desde la ruta.
     editorial_id: int,
     #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
-    # 1. Obtenemos la editorial
-    #Llama al servicio para obtener la editorial por su ID.
-    db_editorial = servicios.get_editorial(session, editorial_id=editorial_id)
-    #Si no se encuentra.
-    if not db_editorial:
+    # 1. Borramos la editorial y su dirección
+    #El servicio desvincula sus libros con un UPDATE y borra la editorial y la direccion con DELETE
+    #(sin cargar objetos); tambien actualiza los conteos por faceta, la version y la cache.
+    resultado = servicios.eliminar_editoriales(session=session, ids=[editorial_id])
+    #Si no se borro nada, la editorial no existia.
+    if not resultado.eliminados:
         #Lanza un error 404.
         raise HTTPException(status_code=404, detail="Editorial no encontrada")
     
-    # 2. Obtenemos la dirección asociada ANTES de borrar
-    #Accede a la direccion asociada a la editorial (cargada por la relacion).
-    db_direccion = db_editorial.direccion
-
-    # 3. Borramos ambos
-    #Marca la editorial para ser eliminada (la BD deberia borrar en cascada las FK en Libro).
-    session.delete(db_editorial)
-    #Si la editorial tenia una direccion asociada.
-    if db_direccion:
-        #Marca tambien la direccion para ser eliminada (limpieza de la relacion 1-a-1).
-        session.delete(db_direccion)
-    
-    # 4. Guardamos
-    #Confirma (guarda) la eliminacion de ambos registros en la BD.
-    session.commit()
-    
-    # 5. Retornamos None (implícito)
+    # 2. Retornamos None (implícito)
     #Devuelve la respuesta (automaticamente sera 204 No Content).
     return
\ No newline at end of file
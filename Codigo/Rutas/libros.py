@@ -1,15 +1,42 @@
 #Libros
 
 #Modulos y librerias
-from fastapi import APIRouter, Depends, HTTPException, Query
+import os
+from threading import BoundedSemaphore
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
-from typing import List
-from Servicios import servicios
+from typing import List, Literal, Optional
+from Servicios import servicios, versiones, serializacion
+from Servicios.proyeccion import Proyeccion, leer_proyeccion
 from Esquemas import esquemas
-from Servicios.database import get_session
+from Servicios.metricas import RutaMedida
+from Servicios.database import read_engine, UNIDAD_DE_TRABAJO, get_read_session
 
 
-router = APIRouter(prefix="/Libros", tags=["Libros"])
+router = APIRouter(prefix="/Libros", tags=["Libros"], route_class=RutaMedida)
+
+#Define la dependencia que lee los filtros combinables de la URL (la comparten /filtrar y /facetas).
+def leer_filtros(
+    #Define los filtros opcionales por relacion (nombre exacto).
+    autor: Optional[str] = Query(None),
+    categoria: Optional[str] = Query(None),
+    serie: Optional[str] = Query(None),
+    publico: Optional[str] = Query(None),
+    editorial: Optional[str] = Query(None),
+    #Define los filtros opcionales por rango de precio y de ano.
+    precio_min: Optional[float] = Query(None, ge=0),
+    precio_max: Optional[float] = Query(None, ge=0),
+    ano_min: Optional[int] = Query(None),
+    ano_max: Optional[int] = Query(None),
+    #Define el filtro opcional por formato.
+    formato: Optional[str] = Query(None)
+) -> esquemas.FiltrosLibro:
+    #Agrupa los filtros recibidos en el esquema 'FiltrosLibro'.
+    return esquemas.FiltrosLibro(
+        autor=autor, categoria=categoria, serie=serie, publico=publico, editorial=editorial,
+        precio_min=precio_min, precio_max=precio_max, ano_min=ano_min, ano_max=ano_max, formato=formato
+    )
 
 # --- Rutas para Libros ---
 #Define el endpoint POST en la raiz (/Libros/), especificando el modelo de respuesta (completo).
@@ -19,112 +46,329 @@ def crear_libro(
     #Define que el cuerpo (body) de la peticion debe seguir el esquema 'LibroCreacion'.
     libro: esquemas.LibroCreacion, # Cambiado
     #Inyecta la dependencia de la sesion de la base de datos.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
     #Delega la logica de creacion (buscar/crear relaciones por nombre) al modulo de 'servicios'.
     return servicios.create_libro(session=session, libro_create=libro)
 
+#Define el endpoint POST en /bulk para crear muchos libros en una sola peticion.
+@router.post("/bulk", response_model=esquemas.ResultadoLoteLibros)
+#Define la funcion para la carga masiva de libros.
+def crear_libros_lote(
+    #Define que el cuerpo (body) debe ser una lista de libros con el esquema 'LibroCreacion' (de 1 a MAX_LIBROS_LOTE).
+    libros: List[esquemas.LibroCreacion] = Body(..., min_length=1, max_length=servicios.MAX_LIBROS_LOTE),
+    #Inyecta la dependencia de la sesion de la base de datos.
+    session: Session = UNIDAD_DE_TRABAJO
+):
+    #Delega la carga (resolucion de nombres por lotes e insercion por bloques) al modulo de 'servicios'.
+    #Los libros con errores se reportan en la respuesta sin detener el resto de la carga.
+    return servicios.create_libros_lote(session=session, libros_create=libros)
+
 # 1. Endpoint general con paginación
 #Define el endpoint GET en la raiz (/Libros/), respondiendo con una lista de libros completos.
 @router.get("/", response_model=List[esquemas.LibroLeerCompleto]) # Cambiado
 #Define la funcion para leer todos los libros.
 def leer_libros_todos(
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' (para paginacion), con valor minimo 0.
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad), con valor minimo 0.
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' (para paginacion), con minimo 1 y maximo 100.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion),
+    #Define el formato de la respuesta: 'completo' (relaciones anidadas) o 'normalizado' (ids + 'incluidos').
+    formato: Literal["completo", "normalizado"] = Query("completo")
 ):
-    #Llama al servicio para obtener la lista de libros, pasando la paginacion.
-    libros = servicios.get_libros_todos(session, skip=skip, limit=limit)
-    #Devuelve la lista de libros encontrada.
-    return libros
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina, agrega el cursor siguiente y la serializa.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        #Llama al servicio para obtener la lista de libros, pasando la paginacion.
+        lambda session: servicios.get_libros_todos(session, skip=skip, limit=limit, cursor=cursor, proyeccion=proyeccion),
+        limit=limit, salida=serializacion.salida_libros(proyeccion, formato),
+    )
 # 1. Consultar libros x autor
 #Define el endpoint GET en /por-autor, respondiendo con una lista de libros completos.
 @router.get("/por-autor", response_model=List[esquemas.LibroLeerCompleto]) # Cambiado
 #Define la funcion para leer libros filtrados por autor.
 def leer_libros_por_autor(
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
     #Recibe el 'nombre_autor' como parametro de consulta (query parameter).
     nombre_autor: str,
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' para paginacion.
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad).
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' para paginacion.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion),
+    #Define el formato de la respuesta: 'completo' (relaciones anidadas) o 'normalizado' (ids + 'incluidos').
+    formato: Literal["completo", "normalizado"] = Query("completo")
 ):
-    #Llama al servicio que contiene la logica de filtrado por autor.
-    libros = servicios.get_libros_por_autor(
-        session, nombre_autor=nombre_autor, skip=skip, limit=limit
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina, agrega el cursor siguiente y la serializa.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        #Llama al servicio que contiene la logica de filtrado por autor.
+        lambda session: servicios.get_libros_por_autor(
+            session, nombre_autor=nombre_autor, skip=skip, limit=limit, cursor=cursor, proyeccion=proyeccion
+        ),
+        limit=limit, salida=serializacion.salida_libros(proyeccion, formato),
     )
-    #Devuelve la lista de libros filtrada.
-    return libros
 
 # 2. Libros x categoria
 #Define el endpoint GET en /por-categoria.
 @router.get("/por-categoria", response_model=List[esquemas.LibroLeerCompleto]) # Cambiado
 #Define la funcion para leer libros filtrados por categoria.
 def leer_libros_por_categoria(
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
     #Recibe el 'genero' (nombre de la categoria) como parametro de consulta.
     genero: str, # Este 'genero' es ahora el 'nombre' de la categoría
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' para paginacion.
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad).
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' para paginacion.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion),
+    #Define el formato de la respuesta: 'completo' (relaciones anidadas) o 'normalizado' (ids + 'incluidos').
+    formato: Literal["completo", "normalizado"] = Query("completo")
 ):
-    #Llama al servicio que contiene la logica de filtrado por categoria.
-    libros = servicios.get_libros_por_categoria(
-        session, genero=genero, skip=skip, limit=limit
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina, agrega el cursor siguiente y la serializa.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        #Llama al servicio que contiene la logica de filtrado por categoria.
+        lambda session: servicios.get_libros_por_categoria(
+            session, genero=genero, skip=skip, limit=limit, cursor=cursor, proyeccion=proyeccion
+        ),
+        limit=limit, salida=serializacion.salida_libros(proyeccion, formato),
     )
-    #Devuelve la lista de libros filtrada.
-    return libros
 
 # 3. Libros x serie
 #Define el endpoint GET en /por-serie.
 @router.get("/por-serie", response_model=List[esquemas.LibroLeerCompleto]) 
 #Define la funcion para leer libros filtrados por serie.
 def leer_libros_por_serie(
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
     #Recibe el 'nombre_serie' como parametro de consulta.
     nombre_serie: str,
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' para paginacion.
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad).
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' para paginacion.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion),
+    #Define el formato de la respuesta: 'completo' (relaciones anidadas) o 'normalizado' (ids + 'incluidos').
+    formato: Literal["completo", "normalizado"] = Query("completo")
 ):
-    #Llama al servicio que contiene la logica de filtrado por serie.
-    libros = servicios.get_libros_por_serie(
-        session, nombre_serie=nombre_serie, skip=skip, limit=limit
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina, agrega el cursor siguiente y la serializa.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        #Llama al servicio que contiene la logica de filtrado por serie.
+        lambda session: servicios.get_libros_por_serie(
+            session, nombre_serie=nombre_serie, skip=skip, limit=limit, cursor=cursor, proyeccion=proyeccion
+        ),
+        limit=limit, salida=serializacion.salida_libros(proyeccion, formato),
     )
-    #Devuelve la lista de libros filtrada.
-    return libros
 
 
+#Define el endpoint GET en /filtrar, que combina varios filtros en una sola consulta.
+@router.get("/filtrar", response_model=List[esquemas.LibroLeerCompleto])
+#Define la funcion para leer libros con filtros combinados.
+def filtrar_libros(
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Recibe los filtros combinables (autor, categoria, serie, publico, editorial, precio, ano, formato).
+    filtros: esquemas.FiltrosLibro = Depends(leer_filtros),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad).
+    skip: int = Query(0, ge=0),
+    #Define el parametro de consulta 'limit' para paginacion.
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion),
+    #Define el formato de la respuesta ('formato' ya es el filtro por formato del libro).
+    formato_respuesta: Literal["completo", "normalizado"] = Query("completo")
+):
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina, agrega el cursor siguiente y la serializa.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        #Llama al servicio que arma la consulta con todos los filtros.
+        lambda session: servicios.filtrar_libros(session, filtros=filtros, skip=skip, limit=limit, cursor=cursor, proyeccion=proyeccion),
+        limit=limit, salida=serializacion.salida_libros(proyeccion, formato_respuesta),
+    )
+
+
+#Define el endpoint GET en /facetas con el numero de libros por categoria, autor, editorial, serie y publico.
+@router.get("/facetas", response_model=esquemas.Facetas)
+#Define la funcion para leer los conteos por faceta.
+def leer_facetas(
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el ETag).
+    response: Response,
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Recibe los mismos filtros que /filtrar; sin filtros se usan los conteos ya calculados.
+    filtros: esquemas.FiltrosLibro = Depends(leer_filtros),
+    #Define cuantos valores se devuelven como maximo por cada faceta.
+    limite: int = Query(50, ge=1, le=500)
+):
+    #Responde 304 si el catalogo no cambio; si cambio, llama al servicio que cuenta los libros por faceta.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        lambda session: servicios.get_facetas(session, filtros=filtros, limite=limite),
+    )
+
+
+#Define el endpoint GET en /buscar para buscar libros por titulo (texto completo).
+@router.get("/buscar", response_model=List[esquemas.LibroLeerCompleto])
+#Define la funcion para buscar libros.
+def buscar_libros(
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el ETag y el cursor de la siguiente pagina).
+    response: Response,
+    #Recibe el texto a buscar como parametro de consulta.
+    q: str = Query(..., min_length=1),
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'limit' para paginacion.
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset sobre la relevancia).
+    cursor: Optional[str] = Query(None),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion),
+    #Define el formato de la respuesta: 'completo' (relaciones anidadas) o 'normalizado' (ids + 'incluidos').
+    formato: Literal["completo", "normalizado"] = Query("completo")
+):
+    #Responde 304 si el catalogo no cambio; si cambio, busca (ordenado por relevancia BM25) y serializa la pagina.
+    #El servicio devuelve su propio cursor (sobre la relevancia), no el del ultimo 'id'.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        lambda session: servicios.buscar_libros(session, q=q, limit=limit, cursor=cursor, proyeccion=proyeccion),
+        salida=serializacion.salida_libros(proyeccion, formato),
+    )
+
+
+#Numero maximo de exportaciones simultaneas (LIBRERIA_MAX_EXPORTACIONES). Cada una pide una conexion del pool
+#de lectura por bloque, asi que pocas exportaciones no pueden dejar sin conexiones a las demas rutas GET.
+MAX_EXPORTACIONES = int(os.getenv("LIBRERIA_MAX_EXPORTACIONES", "2"))
+#Lugares libres para exportar (se toma uno al empezar y se devuelve al terminar o cortarse el envio).
+exportaciones = BoundedSemaphore(MAX_EXPORTACIONES)
+
+#Define el endpoint GET en /export para descargar todo el catalogo (sin paginacion).
+@router.get("/export")
+#Define la funcion para exportar el catalogo completo.
+def exportar_libros(
+    #Define el formato de salida: 'ndjson' (una linea JSON por libro) o 'csv'.
+    formato: Literal["ndjson", "csv"] = Query("ndjson", alias="format")
+):
+    #Elige el generador y el tipo de contenido segun el formato.
+    if formato == "csv":
+        generador, media_type = servicios.exportar_libros_csv, "text/csv"
+    else:
+        generador, media_type = servicios.exportar_libros_ndjson, "application/x-ndjson"
+
+    #Si ya hay MAX_EXPORTACIONES en curso, responde 503 en lugar de esperar.
+    if not exportaciones.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Hay demasiadas exportaciones en curso; intente de nuevo", headers={"Retry-After": "5"})
+
+    #La sesion se abre dentro del generador para que siga viva mientras se envia la respuesta.
+    def contenido():
+        try:
+            with Session(read_engine) as session:
+                for parte in generador(session):
+                    #Termina la transaccion de cada bloque: la conexion vuelve al pool mientras se envia el bloque
+                    #(el siguiente bloque la vuelve a pedir; el keyset por 'id' no depende de la transaccion).
+                    session.commit()
+                    yield parte
+        finally:
+            exportaciones.release()
+
+    #Envia el catalogo por partes (la memoria no crece con el tamano del catalogo).
+    return StreamingResponse(
+        contenido(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="catalogo.{formato}"'}
+    )
+
+
+#Numero maximo de ISBN por peticion en la busqueda por lote.
+MAX_ISBNS_LOTE = 5000
+
+#Define el endpoint POST en /isbn/lote para buscar muchos libros por ISBN en una sola peticion.
+@router.post("/isbn/lote", response_model=esquemas.ResultadoIsbnLote)
+#Define la funcion para buscar libros por lote de ISBN.
+def leer_libros_por_isbns(
+    #Inyecta la respuesta HTTP (para el camino rapido de serializacion).
+    response: Response,
+    #Define que el cuerpo (body) debe ser una lista de ISBN.
+    isbns: List[str] = Body(..., min_length=1, max_length=MAX_ISBNS_LOTE),
+    #Inyecta la dependencia de la sesion (de solo lectura: POST solo por el tamano del cuerpo).
+    session: Session = Depends(get_read_session),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion)
+):
+    #Llama al servicio que busca todos los ISBN con consultas 'IN' por bloques.
+    libros, no_encontrados = servicios.get_libros_por_isbns(session, isbns=isbns, proyeccion=proyeccion)
+    #Con proyeccion (o con el camino rapido) serializa las filas directamente, solo con los campos pedidos.
+    if proyeccion is not None or serializacion.USAR_JSON_RAPIDO:
+        return serializacion.respuesta_isbn_lote(libros, no_encontrados, response, proyeccion)
+    #Devuelve los libros encontrados y los ISBN que no existen.
+    return esquemas.ResultadoIsbnLote(libros=libros, no_encontrados=no_encontrados)
+
 #Define el endpoint GET para buscar un libro por su ISBN (parametro de ruta).
 @router.get("/isbn/{isbn}", response_model=esquemas.LibroLeerCompleto)
 #Define la funcion para leer un libro por ISBN.
 def leer_libro_por_isbn(
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el encabezado ETag).
+    response: Response,
     #Recibe el 'isbn' desde la ruta (path parameter).
     isbn: str,
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session)
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion)
 ):
     """Obtiene un libro específico por su ISBN."""
-    #Llama al servicio que busca el libro por ISBN.
-    db_libro = servicios.get_libro_por_isbn(session, isbn=isbn)
-    #Si el servicio devuelve None (no se encontro).
-    if not db_libro:
-        #Lanza un error HTTP 404 (No Encontrado).
-        raise HTTPException(
-            status_code=404, 
-            detail="Libro con ese ISBN no encontrado"
-        )
-    #Devuelve el libro encontrado.
-    return db_libro
+    #Responde 304 si el catalogo no cambio; si cambio, busca el libro (404 si no existe) y lo serializa.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        lambda session: servicios.get_libro_por_isbn(session, isbn=isbn, proyeccion=proyeccion),
+        salida=serializacion.salida_libro(proyeccion, "Libro con ese ISBN no encontrado"),
+    )
 
 
 # 4. Libros x público objetivo
@@ -132,18 +376,31 @@ def leer_libro_por_isbn(
 @router.get("/por-publico", response_model=List[esquemas.LibroLeerCompleto]) 
 #Define la funcion para leer libros filtrados por publico.
 def leer_libros_por_publico(
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
     #Recibe el 'tipo_publico' como parametro de consulta.
     tipo_publico: str,
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' para paginacion.
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad).
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' para paginacion.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None),
+    #Recibe las columnas ('fields') y relaciones ('expand') pedidas; sin ellas se devuelve el libro completo.
+    proyeccion: Optional[Proyeccion] = Depends(leer_proyeccion),
+    #Define el formato de la respuesta: 'completo' (relaciones anidadas) o 'normalizado' (ids + 'incluidos').
+    formato: Literal["completo", "normalizado"] = Query("completo")
 ):
-    #Llama al servicio que contiene la logica de filtrado por publico.
-    libros = servicios.get_libros_por_publico(
-        session, tipo_publico=tipo_publico, skip=skip, limit=limit
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina, agrega el cursor siguiente y la serializa.
+    return serializacion.responder_lectura(
+        session, request, response, versiones.ENTIDADES_LIBRO,
+        #Llama al servicio que contiene la logica de filtrado por publico.
+        lambda session: servicios.get_libros_por_publico(
+            session, tipo_publico=tipo_publico, skip=skip, limit=limit, cursor=cursor, proyeccion=proyeccion
+        ),
+        limit=limit, salida=serializacion.salida_libros(proyeccion, formato),
     )
-    #Devuelve la lista de libros filtrada.
-    return libros
\ No newline at end of file
@@ -1,14 +1,15 @@
 #Publico objetivo
 
 #Modulos y librerias
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session
-from typing import List
-from Servicios import servicios
+from typing import List, Optional
+from Servicios import servicios, versiones, serializacion
 from Esquemas import esquemas
-from Servicios.database import get_session
+from Servicios.metricas import RutaMedida
+from Servicios.database import UNIDAD_DE_TRABAJO, get_read_session
 
-router = APIRouter(prefix="/PublicoObjetivo", tags=["Publico Objetivo"])
+router = APIRouter(prefix="/PublicoObjetivo", tags=["Publico Objetivo"], route_class=RutaMedida)
 
 #Define el endpoint POST en la raiz (/PublicoObjetivo/), especificando el modelo de respuesta.
 @router.post("/", response_model=esquemas.PublicoObjetivoLeer)
@@ -17,23 +18,45 @@ def crear_publico_objetivo(
     #Define que el cuerpo (body) de la peticion debe seguir el esquema 'PublicoObjetivoCrear'.
     publico: esquemas.PublicoObjetivoCrear, 
     #Inyecta la dependencia de la sesion de la base de datos.
-    session: Session = Depends(get_session)
+    session: Session = UNIDAD_DE_TRABAJO
 ):
     #Delega la logica de creacion al modulo de 'servicios'.
     return servicios.create_publico_objetivo(session=session, publico_create=publico)
 
+#Define el endpoint POST en /bulk para crear muchos registros en una sola peticion.
+@router.post("/bulk", response_model=esquemas.ResultadoLoteEntidades)
+#Define la funcion para la carga masiva.
+def crear_publicos_lote(
+    #Define que el cuerpo (body) debe ser una lista con el esquema 'PublicoObjetivoCrear' (de 1 a MAX_ENTIDADES_LOTE).
+    publicos: List[esquemas.PublicoObjetivoCrear] = Body(..., min_length=1, max_length=servicios.MAX_ENTIDADES_LOTE),
+    #Inyecta la dependencia de la sesion de la base de datos.
+    session: Session = UNIDAD_DE_TRABAJO
+):
+    #Delega la carga (INSERT ... ON CONFLICT DO NOTHING por bloques) al modulo de 'servicios'.
+    #Los nombres que ya existian se reportan en 'existentes' sin modificarse.
+    return servicios.create_publicos_objetivo_lote(session=session, publicos_create=publicos)
+
 #Define el endpoint GET en la raiz (/PublicoObjetivo/), respondiendo con una lista.
 @router.get("/", response_model=List[esquemas.PublicoObjetivoLeer])
 #Define la funcion para leer todos los tipos de publico.
 def leer_publicos_objetivo_todos(
-    #Inyecta la dependencia de la sesion.
-    session: Session = Depends(get_session),
-    #Define el parametro de consulta 'skip' (para paginacion), con valor minimo 0.
+    #Recibe la peticion HTTP (para leer el encabezado If-None-Match).
+    request: Request,
+    #Inyecta la respuesta HTTP (para devolver el cursor de la siguiente pagina).
+    response: Response,
+    #Inyecta la dependencia de la sesion (de solo lectura).
+    session: Session = Depends(get_read_session),
+    #Define el parametro de consulta 'skip' (paginacion por offset, se mantiene por compatibilidad), con valor minimo 0.
     skip: int = Query(0, ge=0),
     #Define el parametro de consulta 'limit' (para paginacion), con minimo 1 y maximo 100.
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    #Define el parametro de consulta 'cursor' (paginacion por keyset); si se envia, 'skip' se ignora.
+    cursor: Optional[str] = Query(None)
 ):
-    #Llama al servicio para obtener la lista de publicos, pasando la paginacion.
-    publicos = servicios.get_publicos_objetivo_todos(session, skip=skip, limit=limit)
-    #Devuelve la lista de publicos encontrada.
-    return publicos
\ No newline at end of file
+    #Responde 304 si el catalogo no cambio; si cambio, consulta la pagina y agrega el cursor siguiente.
+    return serializacion.responder_lectura(
+        session, request, response, (versiones.PUBLICOS,),
+        #Llama al servicio para obtener la lista de publicos, pasando la paginacion.
+        lambda session: servicios.get_publicos_objetivo_todos(session, skip=skip, limit=limit, cursor=cursor),
+        limit=limit,
+    )
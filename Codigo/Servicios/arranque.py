@@ -0,0 +1,30 @@
+#Arranque: Reporte de tiempos por fase del arranque de la aplicacion
+
+#Modulos y librerias necesarias
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+#Segundos de cada fase, en el orden en que se registraron.
+fases: Dict[str, float] = {}
+
+#Define la funcion que guarda la duracion de una fase.
+def registrar(fase: str, segundos: float) -> None:
+    fases[fase] = segundos
+
+#Define un bloque 'with' que mide la fase que contiene.
+@contextmanager
+def medir(fase: str):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(fase, time.perf_counter() - inicio)
+
+#Define la funcion que escribe el reporte en el log (una linea por fase, en milisegundos).
+def reportar() -> None:
+    detalle = ", ".join(f"{fase}={segundos * 1000:.1f} ms" for fase, segundos in fases.items())
+    logger.info("Tiempos de arranque: %s", detalle)
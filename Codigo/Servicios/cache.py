@@ -0,0 +1,120 @@
+#Cache: Cache en memoria (LRU) para resolver nombres a IDs
+
+#Modulos y librerias necesarias
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+#Numero maximo de nombres que se guardan por cada tipo de entidad.
+TAMANO_CACHE_NOMBRES = 1024
+
+#Si LIBRERIA_PRECALENTAR_CACHE=1, al arrancar se cargan los nombres mas usados (ver servicios.precalentar_caches).
+PRECALENTAR = os.getenv("LIBRERIA_PRECALENTAR_CACHE", "0") == "1"
+
+#Define una cache acotada con desalojo LRU (se elimina lo usado hace mas tiempo).
+class CacheLRU:
+    def __init__(self, tamano_maximo: int = TAMANO_CACHE_NOMBRES):
+        #Guarda el tamano maximo de la cache.
+        self.tamano_maximo = tamano_maximo
+        #Diccionario ordenado: el final es lo usado mas recientemente.
+        self.datos: "OrderedDict[str, int]" = OrderedDict()
+        #Candado para que varios hilos (threadpool de FastAPI) no la corrompan.
+        self.candado = Lock()
+        #Contadores de aciertos y fallos.
+        self.aciertos = 0
+        self.fallos = 0
+
+    #Devuelve el id guardado para una clave (o None) y actualiza los contadores.
+    def obtener(self, clave: str) -> Optional[int]:
+        with self.candado:
+            valor = self.datos.get(clave)
+            if valor is None:
+                self.fallos += 1
+                return None
+            #Marca la clave como usada recientemente.
+            self.datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    #Guarda (o actualiza) una clave y desaloja la menos usada si se rebasa el tamano.
+    def guardar(self, clave: str, valor: int) -> None:
+        with self.candado:
+            self.datos[clave] = valor
+            self.datos.move_to_end(clave)
+            if len(self.datos) > self.tamano_maximo:
+                self.datos.popitem(last=False)
+
+    #Elimina una clave de la cache (si existe).
+    def invalidar(self, clave: str) -> None:
+        with self.candado:
+            self.datos.pop(clave, None)
+
+    #Elimina todas las claves que apuntan a un id (se usa al borrar por id).
+    def invalidar_id(self, valor: int) -> None:
+        with self.candado:
+            for clave in [clave for clave, guardado in self.datos.items() if guardado == valor]:
+                del self.datos[clave]
+
+    #Vacia la cache y reinicia los contadores.
+    def limpiar(self) -> None:
+        with self.candado:
+            self.datos.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+    #Devuelve un resumen con el tamano y los contadores de la cache.
+    def estadisticas(self) -> Dict[str, float]:
+        with self.candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "tamano": len(self.datos),
+                "tamano_maximo": self.tamano_maximo,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+#Una cache por cada tipo de entidad que se busca por nombre.
+autores = CacheLRU()
+categorias = CacheLRU()
+editoriales = CacheLRU()
+series = CacheLRU()
+publicos_objetivo = CacheLRU()
+
+#Clave de 'session.info' con los nombres que la transaccion de la sesion escribio o leyo y aun no confirma.
+PENDIENTES = "nombres_pendientes"
+
+#Define la funcion que guarda un nombre en la cache cuando la transaccion de la sesion se confirme.
+#Un id que solo existe dentro de una transaccion (flush sin COMMIT) no debe llegar a la cache: si la transaccion
+#se deshace, SQLite puede reutilizar ese id para otra fila y la cache lo daria por bueno.
+def guardar_al_confirmar(session: Session, cache_nombres: CacheLRU, clave: str, valor: int) -> None:
+    session.info.setdefault(PENDIENTES, []).append((cache_nombres, clave, valor))
+
+#Despues del COMMIT (de la transaccion externa, no de un SAVEPOINT) pasa los nombres pendientes a sus caches.
+@event.listens_for(Session, "after_commit")
+def guardar_pendientes(session: Session) -> None:
+    for cache_nombres, clave, valor in session.info.pop(PENDIENTES, ()):
+        cache_nombres.guardar(clave, valor)
+
+#Despues de un ROLLBACK los nombres pendientes se descartan.
+@event.listens_for(Session, "after_rollback")
+def descartar_pendientes(session: Session) -> None:
+    session.info.pop(PENDIENTES, None)
+
+#Define la funcion que devuelve las estadisticas de todas las caches.
+def estadisticas() -> Dict[str, Dict[str, float]]:
+    return {
+        "autores": autores.estadisticas(),
+        "categorias": categorias.estadisticas(),
+        "editoriales": editoriales.estadisticas(),
+        "series": series.estadisticas(),
+        "publicos_objetivo": publicos_objetivo.estadisticas(),
+    }
+
+#Define la funcion que vacia todas las caches y reinicia sus contadores.
+def limpiar_todas() -> None:
+    for cache_nombres in (autores, categorias, editoriales, series, publicos_objetivo):
+        cache_nombres.limpiar()
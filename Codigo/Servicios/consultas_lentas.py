@@ -0,0 +1,124 @@
+#Consultas lentas: Registro de las sentencias SQL que superan un umbral, con su plan de ejecucion
+
+#Con LIBRERIA_CONSULTAS_LENTAS=1 cada sentencia que tarde mas de LIBRERIA_CONSULTA_LENTA_MS milisegundos
+#se guarda (con sus parametros, la ruta que la origino y el resultado de EXPLAIN QUERY PLAN) en un buffer
+#circular acotado, que se consulta en GET /debug/consultas-lentas. A diferencia de 'echo=True', solo se
+#registra lo que es lento, y el plan dice si la consulta recorrio una tabla completa (SCAN) o uso un indice.
+
+#Modulos y librerias necesarias
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from threading import Lock
+from typing import List, Optional
+from sqlalchemy import event
+
+#Indica si el registro esta activo (apagado por defecto).
+USAR_CONSULTAS_LENTAS = os.getenv("LIBRERIA_CONSULTAS_LENTAS", "0") == "1"
+#Milisegundos a partir de los cuales una sentencia se considera lenta.
+UMBRAL_MS = float(os.getenv("LIBRERIA_CONSULTA_LENTA_MS", "100"))
+#Numero maximo de entradas que se conservan (las mas viejas se descartan).
+TAMANO_REGISTRO = int(os.getenv("LIBRERIA_CONSULTAS_LENTAS_MAX", "200"))
+
+#Ruta donde se consulta el registro.
+RUTA_CONSULTAS_LENTAS = "/debug/consultas-lentas"
+
+#'scope' ASGI de la peticion en curso; la plantilla de la ruta se lee de ahi al momento de registrar.
+alcance_actual: ContextVar[Optional[dict]] = ContextVar("alcance_actual", default=None)
+
+#Buffer circular con las entradas (el final es lo mas reciente).
+registro: deque = deque(maxlen=TAMANO_REGISTRO)
+candado = Lock()
+
+#Define una funcion de ayuda que convierte un valor a algo que se pueda devolver en JSON.
+def valor_json(valor):
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    return repr(valor)
+
+#Define una funcion de ayuda que convierte los parametros (tupla o diccionario, segun el driver) a JSON.
+def parametros_json(parametros):
+    if isinstance(parametros, dict):
+        return {clave: valor_json(valor) for clave, valor in parametros.items()}
+    return [valor_json(valor) for valor in (parametros or ())]
+
+#Define una funcion de ayuda que describe la ruta de la peticion en curso (o None fuera de una peticion).
+def ruta_actual() -> Optional[str]:
+    alcance = alcance_actual.get()
+    if alcance is None:
+        return None
+    #Usa la plantilla (ej. /Autores/{autor_id}); si la peticion no coincidio con ninguna ruta, usa la URL.
+    ruta = getattr(alcance.get("route"), "path", alcance.get("path"))
+    return f"{alcance.get('method')} {ruta}"
+
+#Define la funcion que obtiene el plan de una sentencia con EXPLAIN QUERY PLAN (en la misma conexion).
+def plan_de_consulta(conn, statement: str, parameters) -> List[str]:
+    #Los PRAGMA y las sentencias que no son consultas no tienen plan.
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")):
+        return []
+    try:
+        #Se usa el cursor del driver directamente, para no disparar de nuevo los eventos de SQLAlchemy.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            #Cada fila es (id, padre, no usado, detalle); el detalle dice "SCAN libro" o "SEARCH libro USING INDEX ...".
+            return [fila[3] for fila in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as error:
+        return [f"No se pudo obtener el plan: {error}"]
+
+# --- Eventos de SQLAlchemy ---
+#Guarda el inicio de cada sentencia (pila propia, independiente de la de 'metricas').
+def antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicios_consulta_lenta", []).append(time.perf_counter())
+
+#Si la sentencia supero el umbral, la agrega al registro con su plan.
+def despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    duracion_ms = (time.perf_counter() - conn.info["inicios_consulta_lenta"].pop()) * 1000
+    if duracion_ms < UMBRAL_MS:
+        return
+    #En 'executemany' se guarda (y se explica) solo el primer conjunto de parametros.
+    filas = len(parameters) if executemany else 1
+    parametros = parameters[0] if executemany and parameters else parameters
+    entrada = {
+        "momento": datetime.now(timezone.utc).isoformat(),
+        "duracion_ms": round(duracion_ms, 3),
+        "ruta": ruta_actual(),
+        "sentencia": statement,
+        "parametros": parametros_json(parametros),
+        "filas_executemany": filas,
+        "plan": plan_de_consulta(conn, statement, parametros or ()),
+    }
+    with candado:
+        registro.append(entrada)
+
+#Define la funcion que instrumenta un engine sincrono (no hace nada si el registro esta apagado).
+def instrumentar(motor) -> None:
+    if not USAR_CONSULTAS_LENTAS:
+        return
+    event.listen(motor, "before_cursor_execute", antes_de_ejecutar)
+    event.listen(motor, "after_cursor_execute", despues_de_ejecutar)
+
+#Define la funcion que devuelve el registro (lo mas reciente primero).
+def consultar() -> dict:
+    with candado:
+        entradas = list(reversed(registro))
+    return {"umbral_ms": UMBRAL_MS, "tamano_maximo": TAMANO_REGISTRO, "consultas": entradas}
+
+#Define el middleware ASGI que deja el 'scope' de la peticion al alcance de los eventos de SQLAlchemy.
+class MiddlewareConsultasLentas:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = alcance_actual.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            alcance_actual.reset(token)
@@ -1,18 +1,249 @@
 #Base de datos configuración y conexión
 
+import hashlib
+import os
+from typing import Any, Dict, Optional
+from fastapi import Depends
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from Servicios.migraciones import MIGRACIONES, aplicar_migraciones
+from Servicios import metricas, consultas_lentas
 
 #Usaremos un archivo de base de datos SQLite
-DATABASE_URL = "sqlite:///./libreria.db"
+DATABASE_URL = os.getenv("LIBRERIA_BD_URL", "sqlite:///./libreria.db")
+
+# --- Perfil del engine (configurable por variables de entorno) ---
+#Cada valor se puede cambiar con la variable LIBRERIA_BD_<NOMBRE> (ej. LIBRERIA_BD_ECHO=1).
+PERFIL_BD = {
+    #Registrar cada sentencia SQL en la consola (apagado por defecto, es muy costoso).
+    "ECHO": os.getenv("LIBRERIA_BD_ECHO", "0") == "1",
+    #WAL permite que los lectores no se bloqueen mientras alguien escribe.
+    "JOURNAL_MODE": os.getenv("LIBRERIA_BD_JOURNAL_MODE", "WAL"),
+    #Con WAL, NORMAL es seguro ante caidas de la aplicacion y hace menos fsync que FULL.
+    "SYNCHRONOUS": os.getenv("LIBRERIA_BD_SYNCHRONOUS", "NORMAL"),
+    #Bytes del archivo que se leen con mmap (256 MB).
+    "MMAP_SIZE": int(os.getenv("LIBRERIA_BD_MMAP_SIZE", str(256 * 1024 * 1024))),
+    #Cache de paginas por conexion; negativo significa KiB (64 MB).
+    "CACHE_SIZE": int(os.getenv("LIBRERIA_BD_CACHE_SIZE", "-64000")),
+    #Milisegundos que una conexion espera el candado antes de fallar con "database is locked".
+    "BUSY_TIMEOUT": int(os.getenv("LIBRERIA_BD_BUSY_TIMEOUT", "5000")),
+    #Revisa las llaves foraneas y aplica sus reglas ON DELETE (SQLite las trae apagadas por defecto).
+    "FOREIGN_KEYS": os.getenv("LIBRERIA_BD_FOREIGN_KEYS", "ON"),
+    #Las tablas e indices temporales se guardan en memoria.
+    "TEMP_STORE": os.getenv("LIBRERIA_BD_TEMP_STORE", "MEMORY"),
+    #Conexiones que el pool mantiene abiertas y cuantas extra puede abrir en picos.
+    "POOL_SIZE": int(os.getenv("LIBRERIA_BD_POOL_SIZE", "5")),
+    "MAX_OVERFLOW": int(os.getenv("LIBRERIA_BD_MAX_OVERFLOW", "10")),
+    #Segundos que una peticion espera una conexion libre del pool antes de fallar (la API responde 503).
+    "POOL_TIMEOUT": float(os.getenv("LIBRERIA_BD_POOL_TIMEOUT", "5")),
+}
+
+#Aplica los PRAGMA del perfil a cada conexion nueva que abre el pool.
+def aplicar_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={PERFIL_BD['JOURNAL_MODE']}")
+    cursor.close()
+    aplicar_pragmas_comunes(dbapi_connection)
+
+#Aplica los PRAGMA de lectura; estas conexiones no pueden cambiar el journal ni escribir.
+def aplicar_pragmas_lectura(dbapi_connection, connection_record):
+    aplicar_pragmas_comunes(dbapi_connection)
+    cursor = dbapi_connection.cursor()
+    #Cualquier intento de escritura falla en lugar de pedir el candado de escritura.
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+#Aplica los PRAGMA que comparten las conexiones de escritura y de lectura.
+def aplicar_pragmas_comunes(dbapi_connection):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA synchronous={PERFIL_BD['SYNCHRONOUS']}")
+    cursor.execute(f"PRAGMA mmap_size={PERFIL_BD['MMAP_SIZE']}")
+    cursor.execute(f"PRAGMA cache_size={PERFIL_BD['CACHE_SIZE']}")
+    cursor.execute(f"PRAGMA busy_timeout={PERFIL_BD['BUSY_TIMEOUT']}")
+    cursor.execute(f"PRAGMA temp_store={PERFIL_BD['TEMP_STORE']}")
+    cursor.execute(f"PRAGMA foreign_keys={PERFIL_BD['FOREIGN_KEYS']}")
+    cursor.close()
+
+#Define la funcion que indica si la URL es una base de datos en memoria ('sqlite://' o 'sqlite:///:memory:').
+def es_memoria(url: str) -> bool:
+    base = make_url(url).database
+    return not base or base == ":memory:" or "mode=memory" in base
+
+#Define la funcion que arma los argumentos del pool; una base de datos en memoria usa un pool de una
+#conexion por hilo que no acepta 'pool_size', 'max_overflow' ni 'pool_timeout'.
+def argumentos_pool(url: str) -> Dict[str, Any]:
+    if es_memoria(url):
+        return {}
+    return {
+        "pool_size": PERFIL_BD["POOL_SIZE"],
+        "max_overflow": PERFIL_BD["MAX_OVERFLOW"],
+        "pool_timeout": PERFIL_BD["POOL_TIMEOUT"],
+    }
+
+#Define la funcion que arma la URL de solo lectura: el mismo archivo abierto como URI con 'mode=ro'
+#(SQLite nunca pedira el candado de escritura). Conserva los parametros que ya traia la URL.
+#Devuelve None para una base de datos en memoria: otro engine abriria otra base de datos vacia.
+def url_solo_lectura(url: str) -> Optional[str]:
+    if es_memoria(url):
+        return None
+    url_bd = make_url(url)
+    base = url_bd.database if url_bd.database.startswith("file:") else "file:" + url_bd.database
+    url_lectura = url_bd.set(database=base, query={**url_bd.query, "mode": "ro", "uri": "true"})
+    return url_lectura.render_as_string(hide_password=False)
 
 #El "engine" es el punto de conexión central
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(
+    DATABASE_URL,
+    echo=PERFIL_BD["ECHO"],
+    **argumentos_pool(DATABASE_URL),
+)
+#Registra los PRAGMA para cada conexion del engine sincrono
+event.listen(engine, "connect", aplicar_pragmas)
+#Mide las consultas de cada peticion (solo si LIBRERIA_METRICAS=1)
+metricas.instrumentar(engine)
+#Registra las consultas lentas con su plan (solo si LIBRERIA_CONSULTAS_LENTAS=1)
+consultas_lentas.instrumentar(engine)
+
+#URL de solo lectura (se puede fijar con LIBRERIA_BD_URL_LECTURA; None si la base de datos esta en memoria)
+READ_DATABASE_URL = os.getenv("LIBRERIA_BD_URL_LECTURA") or url_solo_lectura(DATABASE_URL)
+
+if READ_DATABASE_URL:
+    #Engine de solo lectura con su propio pool, para que las rutas GET no compitan con las escrituras
+    read_engine = create_engine(
+        READ_DATABASE_URL,
+        echo=PERFIL_BD["ECHO"],
+        **argumentos_pool(READ_DATABASE_URL),
+    )
+    #Registra los PRAGMA de lectura para cada conexion del engine de lectura
+    event.listen(read_engine, "connect", aplicar_pragmas_lectura)
+    metricas.instrumentar(read_engine)
+    consultas_lentas.instrumentar(read_engine)
+else:
+    #En memoria las lecturas usan el mismo engine (y la misma base de datos) que las escrituras
+    read_engine = engine
 
-def create_db_and_tables():
+#Sentencias que crean el indice de texto completo (FTS5) sobre los titulos y lo mantienen sincronizado.
+#Es una tabla "external content": no duplica los titulos, solo guarda el indice invertido.
+SQL_INDICE_BUSQUEDA = [
+    "CREATE VIRTUAL TABLE libro_fts USING fts5(titulo, content='libro', content_rowid='id')",
+    #Al insertar un libro se indexa su titulo.
+    """CREATE TRIGGER IF NOT EXISTS libro_fts_ai AFTER INSERT ON libro BEGIN
+        INSERT INTO libro_fts(rowid, titulo) VALUES (new.id, new.titulo);
+    END""",
+    #Al borrar un libro se quita del indice.
+    """CREATE TRIGGER IF NOT EXISTS libro_fts_ad AFTER DELETE ON libro BEGIN
+        INSERT INTO libro_fts(libro_fts, rowid, titulo) VALUES ('delete', old.id, old.titulo);
+    END""",
+    #Al cambiar el titulo se reemplaza la entrada del indice.
+    """CREATE TRIGGER IF NOT EXISTS libro_fts_au AFTER UPDATE OF titulo ON libro BEGIN
+        INSERT INTO libro_fts(libro_fts, rowid, titulo) VALUES ('delete', old.id, old.titulo);
+        INSERT INTO libro_fts(rowid, titulo) VALUES (new.id, new.titulo);
+    END""",
+    #Indexa los libros que ya existian antes de crear la tabla.
+    "INSERT INTO libro_fts(libro_fts) VALUES ('rebuild')",
+]
+
+#Crea el indice de busqueda de titulos si todavia no existe.
+def crear_indice_busqueda(motor=engine):
+    with motor.begin() as conexion:
+        #Revisa si la tabla virtual ya fue creada en un arranque anterior.
+        existe = conexion.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'libro_fts'")
+        ).first()
+        if not existe:
+            for sentencia in SQL_INDICE_BUSQUEDA:
+                conexion.execute(text(sentencia))
+
+#Recibe opcionalmente otro engine (ej. el generador de catalogos sinteticos crea su propia base de datos)
+def create_db_and_tables(motor=engine):
     #Esto crea todas las tablas definidas con SQLModel
-    SQLModel.metadata.create_all(engine)
+    SQLModel.metadata.create_all(motor)
+    #Crea el indice de texto completo para la busqueda de libros
+    crear_indice_busqueda(motor)
+    #Aplica las migraciones pendientes (ej. indices nuevos en bases de datos existentes)
+    aplicar_migraciones(motor)
+
+# --- Huella del esquema (arranque rapido) ---
+#Define la funcion que calcula un hash del esquema que espera el codigo: tablas, columnas, indices,
+#indice de texto completo y migraciones. No consulta la base de datos.
+def calcular_huella_esquema() -> str:
+    partes = []
+    for tabla in SQLModel.metadata.sorted_tables:
+        partes.append(f"tabla {tabla.name}")
+        for columna in tabla.columns:
+            llaves = sorted(f"{llave.target_fullname} {llave.ondelete}" for llave in columna.foreign_keys)
+            partes.append(f"{columna.name} {columna.type!r} {columna.nullable} {columna.primary_key} {columna.unique} {llaves}")
+        for indice in sorted(tabla.indexes, key=lambda indice: indice.name):
+            partes.append(f"indice {indice.name} {[columna.name for columna in indice.columns]} {indice.unique}")
+    partes.extend(SQL_INDICE_BUSQUEDA)
+    for numero, _, sentencias in MIGRACIONES:
+        partes.append(f"migracion {numero}")
+        partes.extend(sentencias)
+    return hashlib.sha256("\n".join(partes).encode()).hexdigest()
+
+#Define la funcion que lee la huella guardada en la base de datos (None si no hay, ej. una base de datos nueva).
+def leer_huella_esquema(motor=engine) -> Optional[str]:
+    try:
+        with motor.connect() as conexion:
+            return conexion.execute(text("SELECT huella FROM huellaesquema WHERE id = 1")).scalar()
+    except OperationalError:
+        #La tabla todavia no existe.
+        return None
+
+#Define la funcion que prepara la base de datos al arrancar; devuelve True si tuvo que crear/migrar el esquema.
+#Si la huella guardada coincide con la del codigo, se omite 'create_all' (que inspecciona cada tabla).
+#Para forzar la revision completa basta con borrar la fila de 'huellaesquema'.
+def preparar_base_de_datos(motor=engine) -> bool:
+    huella = calcular_huella_esquema()
+    if leer_huella_esquema(motor) == huella:
+        return False
+    create_db_and_tables(motor)
+    #Guarda la huella solo despues de crear y migrar todo sin errores.
+    with motor.begin() as conexion:
+        conexion.execute(
+            text(
+                "INSERT INTO huellaesquema (id, huella) VALUES (1, :huella) "
+                "ON CONFLICT (id) DO UPDATE SET huella = excluded.huella"
+            ),
+            {"huella": huella},
+        )
+    return True
+
+# --- Limite de sesiones abiertas ---
+#El limite de peticiones que usan la BD a la vez es el pool de cada engine: 'POOL_SIZE' + 'MAX_OVERFLOW'
+#conexiones; las demas esperan su conexion (en un hilo del threadpool de AnyIO) hasta 'POOL_TIMEOUT' segundos
+#y despues reciben 503 (ver main.py).
+#Para que esa espera siempre avance, las rutas GET devuelven su conexion dentro de la funcion de la ruta, en
+#el mismo hilo ('serializacion.responder_lectura'). Si la devolvieran al cerrar la sesion (despues de validar
+#y enviar la respuesta, que tambien piden un hilo), todos los hilos podrian quedar esperando conexiones de
+#peticiones que esperan un hilo.
 
 #Función "Dependency" para obtener una sesión de BD por cada petición
+#'expire_on_commit=False': despues del COMMIT la respuesta se serializa con los objetos que ya estan en memoria,
+#sin un SELECT de recarga por cada objeto (los IDs ya los asigno el INSERT al hacer 'flush').
 def get_session():
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+#Función "Dependency" de la unidad de trabajo: los servicios solo hacen 'flush' y aqui se hace un solo COMMIT por peticion.
+#Si la ruta lanza cualquier excepcion (incluida una HTTPException), se deshace todo lo que la peticion escribio.
+def get_unidad_de_trabajo(session: Session = Depends(get_session)):
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+#Dependencia que usan las rutas que escriben. Con scope="function" el COMMIT se hace al terminar la funcion
+#de la ruta y ANTES de enviar la respuesta: si el COMMIT falla, el cliente recibe el error (y no un 200).
+#La sesion (de 'get_session') sigue abierta hasta despues de la respuesta, por si la serializacion carga relaciones.
+UNIDAD_DE_TRABAJO = Depends(get_unidad_de_trabajo, scope="function")
+
+#Función "Dependency" para obtener una sesión de SOLO LECTURA (para las rutas GET)
+#'expire_on_commit=False': el COMMIT que devuelve la conexion no invalida los objetos que se van a serializar.
+def get_read_session():
+    with Session(read_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,83 @@
+#Facetas: Mantenimiento de los conteos agregados de libros por faceta
+
+#Modulos y librerias necesarias
+from collections import Counter
+from typing import Iterable, Optional
+from sqlalchemy import text
+from sqlmodel import Session
+
+#Nombres de las facetas (mismos nombres que usa la respuesta de /Libros/facetas).
+AUTORES = "autores"
+CATEGORIAS = "categorias"
+EDITORIALES = "editoriales"
+SERIES = "series"
+PUBLICOS = "publicos"
+
+#Sentencia que suma (o resta) al conteo de una entidad, creando la fila si no existe.
+SQL_SUMAR = text(
+    "INSERT INTO conteofaceta (faceta, entidad_id, total) VALUES (:faceta, :entidad_id, :delta) "
+    "ON CONFLICT (faceta, entidad_id) DO UPDATE SET total = total + excluded.total"
+)
+
+#Sentencias que recalculan todos los conteos desde las tablas de enlace y las llaves foraneas de 'libro'.
+#Las usa la migracion que llena la tabla y las cargas que insertan libros sin pasar por los servicios.
+SQL_RECALCULAR = [
+    "DELETE FROM conteofaceta",
+    "INSERT INTO conteofaceta (faceta, entidad_id, total) "
+    "SELECT 'autores', autor_id, COUNT(*) FROM libroautorlink GROUP BY autor_id",
+    "INSERT INTO conteofaceta (faceta, entidad_id, total) "
+    "SELECT 'categorias', categoria_id, COUNT(*) FROM librocategorialink GROUP BY categoria_id",
+    "INSERT INTO conteofaceta (faceta, entidad_id, total) "
+    "SELECT 'editoriales', editorial_id, COUNT(*) FROM libro WHERE editorial_id IS NOT NULL GROUP BY editorial_id",
+    "INSERT INTO conteofaceta (faceta, entidad_id, total) "
+    "SELECT 'series', serie_id, COUNT(*) FROM libro WHERE serie_id IS NOT NULL GROUP BY serie_id",
+    "INSERT INTO conteofaceta (faceta, entidad_id, total) "
+    "SELECT 'publicos', publico_objetivo_id, COUNT(*) FROM libro WHERE publico_objetivo_id IS NOT NULL GROUP BY publico_objetivo_id",
+]
+
+#Define la funcion que acumula los conteos de un libro en un 'Counter' (sin tocar la BD).
+def contar_libro(
+    conteos: Counter,
+    editorial_id: Optional[int],
+    publico_objetivo_id: Optional[int],
+    serie_id: Optional[int],
+    autores_ids: Iterable[int],
+    categorias_ids: Iterable[int],
+) -> Counter:
+    if editorial_id is not None:
+        conteos[(EDITORIALES, editorial_id)] += 1
+    if publico_objetivo_id is not None:
+        conteos[(PUBLICOS, publico_objetivo_id)] += 1
+    if serie_id is not None:
+        conteos[(SERIES, serie_id)] += 1
+    #Se usan conjuntos para no contar dos veces el mismo autor o categoria.
+    for autor_id in set(autores_ids):
+        conteos[(AUTORES, autor_id)] += 1
+    for categoria_id in set(categorias_ids):
+        conteos[(CATEGORIAS, categoria_id)] += 1
+    return conteos
+
+#Define la funcion que guarda los conteos acumulados (una sola sentencia 'executemany').
+#No confirma (commit): viaja en la misma transaccion que la escritura del libro.
+def sumar(session: Session, conteos: Counter) -> None:
+    if not conteos:
+        return
+    session.connection().execute(SQL_SUMAR, [
+        {"faceta": faceta, "entidad_id": entidad_id, "delta": delta}
+        for (faceta, entidad_id), delta in conteos.items()
+    ])
+
+#Define la funcion que recalcula todos los conteos (recibe una conexion o una sesion).
+def recalcular(conexion) -> None:
+    for sentencia in SQL_RECALCULAR:
+        conexion.execute(text(sentencia))
+
+#Define la funcion que elimina los conteos de las entidades borradas (una sola sentencia 'executemany').
+def eliminar(session: Session, faceta: str, entidades_ids: Iterable[int]) -> None:
+    parametros = [{"faceta": faceta, "entidad_id": entidad_id} for entidad_id in entidades_ids]
+    if not parametros:
+        return
+    session.connection().execute(
+        text("DELETE FROM conteofaceta WHERE faceta = :faceta AND entidad_id = :entidad_id"),
+        parametros,
+    )
@@ -0,0 +1,213 @@
+#Metricas: Instrumentacion por peticion (consultas SQL, tiempo de BD, serializacion y latencia)
+
+#Con LIBRERIA_METRICAS=1 cada peticion HTTP registra, por ruta:
+#  - cuantas consultas SQL ejecuto y cuanto tiempo pasaron en la BD (eventos 'before/after_cursor_execute'),
+#  - cuanto tardo la serializacion (desde que termina la funcion de la ruta hasta que empieza la respuesta),
+#  - la latencia total.
+#Los valores se acumulan en histogramas y se exponen en GET /metrics con el formato de texto de Prometheus.
+#Apagado (por defecto) no se registra ningun evento, middleware ni envoltura: el costo es cero.
+
+#Modulos y librerias necesarias
+import functools
+import inspect
+import os
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+#Indica si la instrumentacion esta activa (apagada por defecto).
+USAR_METRICAS = os.getenv("LIBRERIA_METRICAS", "0") == "1"
+
+#Ruta donde se exponen las metricas (sus propias peticiones no se miden).
+RUTA_METRICAS = "/metrics"
+
+#Limites superiores de las cubetas de los histogramas.
+CUBETAS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CUBETAS_CONSULTAS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+# --- Medicion de la peticion en curso ---
+#Define los contadores de una sola peticion.
+class MedicionPeticion:
+    __slots__ = ("consultas", "tiempo_bd", "fin_endpoint")
+
+    def __init__(self):
+        #Numero de sentencias SQL ejecutadas.
+        self.consultas = 0
+        #Segundos acumulados dentro del driver de la BD.
+        self.tiempo_bd = 0.0
+        #Momento en que termino la funcion de la ruta (None si no llego a ejecutarse).
+        self.fin_endpoint: Optional[float] = None
+
+#Peticion en curso; FastAPI copia el contexto al threadpool, asi las rutas sincronas ven el mismo objeto.
+medicion_actual: ContextVar[Optional[MedicionPeticion]] = ContextVar("medicion_actual", default=None)
+
+# --- Histogramas ---
+#Define un histograma acumulativo con el formato de Prometheus.
+class Histograma:
+    def __init__(self, cubetas: Sequence[float]):
+        self.cubetas = tuple(cubetas)
+        #Un contador por cubeta (no acumulados; se acumulan al exportar).
+        self.conteos = [0] * len(self.cubetas)
+        self.suma = 0.0
+        self.cuenta = 0
+
+    #Registra un valor en la primera cubeta que lo contiene.
+    def observar(self, valor: float) -> None:
+        for posicion, limite in enumerate(self.cubetas):
+            if valor <= limite:
+                self.conteos[posicion] += 1
+                break
+        self.suma += valor
+        self.cuenta += 1
+
+    #Devuelve las lineas de texto del histograma para un conjunto de etiquetas.
+    def lineas(self, nombre: str, etiquetas: str) -> List[str]:
+        salida = []
+        acumulado = 0
+        for limite, conteo in zip(self.cubetas, self.conteos):
+            acumulado += conteo
+            salida.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+        salida.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {self.cuenta}')
+        salida.append(f"{nombre}_sum{{{etiquetas}}} {self.suma}")
+        salida.append(f"{nombre}_count{{{etiquetas}}} {self.cuenta}")
+        return salida
+
+#Definicion de cada metrica: (nombre, descripcion, cubetas).
+METRICAS = (
+    ("libreria_peticion_duracion_segundos", "Latencia total de la peticion.", CUBETAS_SEGUNDOS),
+    ("libreria_bd_duracion_segundos", "Tiempo dentro de la base de datos por peticion.", CUBETAS_SEGUNDOS),
+    ("libreria_serializacion_duracion_segundos", "Tiempo de validacion y serializacion de la respuesta.", CUBETAS_SEGUNDOS),
+    ("libreria_bd_consultas", "Numero de consultas SQL por peticion.", CUBETAS_CONSULTAS),
+)
+
+#Define el registro con todos los histogramas, por metrica y por (metodo, ruta).
+class RegistroMetricas:
+    def __init__(self):
+        self.candado = Lock()
+        self.histogramas: Dict[str, Dict[Tuple[str, str], Histograma]] = {nombre: {} for nombre, _, _ in METRICAS}
+
+    #Registra los valores de una peticion terminada.
+    def observar(self, metodo: str, ruta: str, valores: Sequence[float]) -> None:
+        with self.candado:
+            for (nombre, _, cubetas), valor in zip(METRICAS, valores):
+                histograma = self.histogramas[nombre].get((metodo, ruta))
+                if histograma is None:
+                    histograma = self.histogramas[nombre][(metodo, ruta)] = Histograma(cubetas)
+                histograma.observar(valor)
+
+    #Devuelve todas las metricas en el formato de texto de Prometheus.
+    def exportar(self) -> str:
+        lineas = []
+        with self.candado:
+            for nombre, descripcion, _ in METRICAS:
+                lineas.append(f"# HELP {nombre} {descripcion}")
+                lineas.append(f"# TYPE {nombre} histogram")
+                for (metodo, ruta), histograma in sorted(self.histogramas[nombre].items()):
+                    etiquetas = f'metodo="{metodo}",ruta="{escapar_etiqueta(ruta)}"'
+                    lineas.extend(histograma.lineas(nombre, etiquetas))
+        return "\n".join(lineas) + "\n"
+
+    #Vacia todos los histogramas.
+    def limpiar(self) -> None:
+        with self.candado:
+            for histogramas in self.histogramas.values():
+                histogramas.clear()
+
+#Define una funcion de ayuda que escapa un valor de etiqueta de Prometheus.
+def escapar_etiqueta(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+#Registro global de la aplicacion.
+registro = RegistroMetricas()
+
+# --- Eventos de SQLAlchemy ---
+#Guarda el inicio de cada sentencia (una pila por conexion, como en la receta de SQLAlchemy).
+def antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicios_consulta", []).append(time.perf_counter())
+
+#Suma la duracion de la sentencia a la peticion en curso (si la hay).
+def despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["inicios_consulta"].pop()
+    medicion = medicion_actual.get()
+    if medicion is not None:
+        medicion.consultas += 1
+        medicion.tiempo_bd += time.perf_counter() - inicio
+
+#Define la funcion que instrumenta un engine sincrono (no hace nada si las metricas estan apagadas).
+def instrumentar(motor) -> None:
+    if not USAR_METRICAS:
+        return
+    event.listen(motor, "before_cursor_execute", antes_de_ejecutar)
+    event.listen(motor, "after_cursor_execute", despues_de_ejecutar)
+
+# --- Rutas y middleware ---
+#Define una funcion de ayuda que envuelve la funcion de una ruta para anotar cuando termina.
+def medir_endpoint(endpoint):
+    #Se conserva el tipo (sincrona o 'async def') para que FastAPI la ejecute igual que antes.
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def envoltura(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                marcar_fin_endpoint()
+    else:
+        @functools.wraps(endpoint)
+        def envoltura(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                marcar_fin_endpoint()
+    return envoltura
+
+#Anota en la peticion en curso el momento en que termino la funcion de la ruta.
+def marcar_fin_endpoint() -> None:
+    medicion = medicion_actual.get()
+    if medicion is not None:
+        medicion.fin_endpoint = time.perf_counter()
+
+#Define la clase de ruta que usan los routers: con las metricas activas, mide donde termina la funcion de la ruta.
+class RutaMedida(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs):
+        if USAR_METRICAS:
+            endpoint = medir_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+#Define el middleware ASGI que mide cada peticion y la registra en los histogramas.
+#Se escribe como ASGI puro (y no con 'BaseHTTPMiddleware') para medir tambien las respuestas en streaming.
+class MiddlewareMetricas:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        #Solo se miden peticiones HTTP.
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        medicion = MedicionPeticion()
+        token = medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        inicio_respuesta = None
+
+        #Anota cuando se empiezan a enviar los encabezados (la respuesta ya esta serializada).
+        async def enviar(mensaje):
+            nonlocal inicio_respuesta
+            if mensaje["type"] == "http.response.start":
+                inicio_respuesta = time.perf_counter()
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            medicion_actual.reset(token)
+            total = time.perf_counter() - inicio
+            #Usa la plantilla de la ruta (ej. /Autores/{autor_id}) para no crear una serie por cada id.
+            ruta = getattr(scope.get("route"), "path", "sin_ruta")
+            if ruta != RUTA_METRICAS:
+                serializacion = 0.0
+                if inicio_respuesta is not None and medicion.fin_endpoint is not None:
+                    serializacion = max(0.0, inicio_respuesta - medicion.fin_endpoint)
+                registro.observar(scope["method"], ruta, (total, medicion.tiempo_bd, serializacion, medicion.consultas))
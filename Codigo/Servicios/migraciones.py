@@ -0,0 +1,117 @@
+#Migraciones: Cambios de esquema versionados para bases de datos existentes
+
+#'create_all' solo crea tablas que no existen; nunca agrega indices a tablas que ya estaban.
+#Cada migracion tiene un numero de version y se aplica una sola vez; la version actual
+#de la base de datos se guarda en 'PRAGMA user_version'.
+
+#Modulos y librerias necesarias
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from Servicios.facetas import SQL_RECALCULAR
+
+logger = logging.getLogger(__name__)
+
+#Lista ordenada de migraciones: (version, descripcion, sentencias SQL).
+#Las sentencias usan 'IF NOT EXISTS' y los mismos nombres que genera el modelo,
+#asi una base de datos nueva (creada ya con los indices) no falla al migrar.
+MIGRACIONES = [
+    (1, "Indices de claves foraneas de libro, tablas de enlace y editorial.nombre", [
+        "CREATE INDEX IF NOT EXISTS ix_libro_editorial_id ON libro (editorial_id)",
+        "CREATE INDEX IF NOT EXISTS ix_libro_serie_id ON libro (serie_id)",
+        "CREATE INDEX IF NOT EXISTS ix_libro_publico_objetivo_id ON libro (publico_objetivo_id)",
+        "CREATE INDEX IF NOT EXISTS ix_libroautorlink_autor_id_libro_id ON libroautorlink (autor_id, libro_id)",
+        "CREATE INDEX IF NOT EXISTS ix_librocategorialink_categoria_id_libro_id ON librocategorialink (categoria_id, libro_id)",
+        "CREATE INDEX IF NOT EXISTS ix_editorial_nombre ON editorial (nombre)",
+    ]),
+    (2, "Indices de precio, ano de publicacion y formato para /Libros/filtrar", [
+        "CREATE INDEX IF NOT EXISTS ix_libro_precio ON libro (precio)",
+        "CREATE INDEX IF NOT EXISTS ix_libro_ano_publicacion ON libro (ano_publicacion)",
+        "CREATE INDEX IF NOT EXISTS ix_libro_formato_precio ON libro (formato, precio)",
+    ]),
+    (3, "Llenar los conteos por faceta con los libros que ya existian", SQL_RECALCULAR),
+    #Antes de crear los indices unicos se fusionan los nombres repetidos en la fila de menor id
+    #(la misma que ya devolvia la busqueda por nombre), moviendo sus libros a esa fila.
+    #Esta migracion reescribe datos y no se puede deshacer: las filas repetidas se borran (respaldar la BD antes).
+    (4, "Nombres unicos en autor, serie y publicoobjetivo (para las cargas masivas con ON CONFLICT)", [
+        "UPDATE OR IGNORE libroautorlink SET autor_id = "
+        "(SELECT MIN(otro.id) FROM autor AS otro JOIN autor AS actual ON otro.nombre = actual.nombre "
+        "WHERE actual.id = libroautorlink.autor_id) "
+        "WHERE autor_id NOT IN (SELECT MIN(id) FROM autor GROUP BY nombre)",
+        "DELETE FROM libroautorlink WHERE autor_id NOT IN (SELECT MIN(id) FROM autor GROUP BY nombre)",
+        "DELETE FROM autor WHERE id NOT IN (SELECT MIN(id) FROM autor GROUP BY nombre)",
+        "UPDATE libro SET serie_id = "
+        "(SELECT MIN(otra.id) FROM serie AS otra JOIN serie AS actual ON otra.nombre = actual.nombre "
+        "WHERE actual.id = libro.serie_id) "
+        "WHERE serie_id NOT IN (SELECT MIN(id) FROM serie GROUP BY nombre)",
+        "DELETE FROM serie WHERE id NOT IN (SELECT MIN(id) FROM serie GROUP BY nombre)",
+        "UPDATE libro SET publico_objetivo_id = "
+        "(SELECT MIN(otro.id) FROM publicoobjetivo AS otro JOIN publicoobjetivo AS actual ON otro.tipo = actual.tipo "
+        "WHERE actual.id = libro.publico_objetivo_id) "
+        "WHERE publico_objetivo_id NOT IN (SELECT MIN(id) FROM publicoobjetivo GROUP BY tipo)",
+        "DELETE FROM publicoobjetivo WHERE id NOT IN (SELECT MIN(id) FROM publicoobjetivo GROUP BY tipo)",
+        "DROP INDEX IF EXISTS ix_autor_nombre",
+        "CREATE UNIQUE INDEX ix_autor_nombre ON autor (nombre)",
+        "DROP INDEX IF EXISTS ix_serie_nombre",
+        "CREATE UNIQUE INDEX ix_serie_nombre ON serie (nombre)",
+        "DROP INDEX IF EXISTS ix_publicoobjetivo_tipo",
+        "CREATE UNIQUE INDEX ix_publicoobjetivo_tipo ON publicoobjetivo (tipo)",
+    ] + SQL_RECALCULAR),
+    #SQLite no puede cambiar las llaves foraneas de una tabla existente: las tablas de enlace se reconstruyen
+    #(nueva tabla, copia, borrado y cambio de nombre). Antes se quitan los enlaces que apuntan a filas inexistentes,
+    #que con las llaves foraneas activas ya no se podrian guardar.
+    (5, "ON DELETE CASCADE en las tablas de enlace (libroautorlink y librocategorialink)", [
+        "DELETE FROM libroautorlink WHERE libro_id NOT IN (SELECT id FROM libro) OR autor_id NOT IN (SELECT id FROM autor)",
+        "CREATE TABLE libroautorlink_nueva ("
+        "libro_id INTEGER NOT NULL, autor_id INTEGER NOT NULL, PRIMARY KEY (libro_id, autor_id), "
+        "FOREIGN KEY(libro_id) REFERENCES libro (id) ON DELETE CASCADE, "
+        "FOREIGN KEY(autor_id) REFERENCES autor (id) ON DELETE CASCADE)",
+        "INSERT INTO libroautorlink_nueva (libro_id, autor_id) SELECT libro_id, autor_id FROM libroautorlink",
+        "DROP TABLE libroautorlink",
+        "ALTER TABLE libroautorlink_nueva RENAME TO libroautorlink",
+        "CREATE INDEX IF NOT EXISTS ix_libroautorlink_autor_id_libro_id ON libroautorlink (autor_id, libro_id)",
+        "DELETE FROM librocategorialink WHERE libro_id NOT IN (SELECT id FROM libro) OR categoria_id NOT IN (SELECT id FROM categoria)",
+        "CREATE TABLE librocategorialink_nueva ("
+        "libro_id INTEGER NOT NULL, categoria_id INTEGER NOT NULL, PRIMARY KEY (libro_id, categoria_id), "
+        "FOREIGN KEY(libro_id) REFERENCES libro (id) ON DELETE CASCADE, "
+        "FOREIGN KEY(categoria_id) REFERENCES categoria (id) ON DELETE CASCADE)",
+        "INSERT INTO librocategorialink_nueva (libro_id, categoria_id) SELECT libro_id, categoria_id FROM librocategorialink",
+        "DROP TABLE librocategorialink",
+        "ALTER TABLE librocategorialink_nueva RENAME TO librocategorialink",
+        "CREATE INDEX IF NOT EXISTS ix_librocategorialink_categoria_id_libro_id ON librocategorialink (categoria_id, libro_id)",
+    ] + SQL_RECALCULAR),
+]
+
+#Define la funcion que devuelve la version de esquema de la base de datos.
+def version_actual(conexion) -> int:
+    return conexion.execute(text("PRAGMA user_version")).scalar()
+
+#Define la funcion que aplica las migraciones pendientes (cada una en su propia transaccion).
+def aplicar_migraciones(engine: Engine) -> int:
+    with engine.connect() as conexion:
+        version = version_actual(conexion)
+        #Las llaves foraneas se desactivan mientras se migra (como recomienda SQLite para reconstruir tablas):
+        #borrar la tabla vieja no debe disparar sus ON DELETE. El PRAGMA no tiene efecto dentro de una
+        #transaccion, asi que se cambia antes de la primera migracion y se restaura despues de la ultima.
+        llaves_foraneas = conexion.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        conexion.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        conexion.commit()
+        try:
+            for numero, descripcion, sentencias in MIGRACIONES:
+                #Salta las migraciones que ya se aplicaron.
+                if numero <= version:
+                    continue
+                logger.info("Aplicando migracion %s: %s", numero, descripcion)
+                for sentencia in sentencias:
+                    conexion.execute(text(sentencia))
+                #Guarda la nueva version en la misma transaccion que los cambios.
+                conexion.execute(text(f"PRAGMA user_version = {numero}"))
+                conexion.commit()
+                version = numero
+        finally:
+            #Deshace una migracion a medias y deja la conexion como estaba antes de devolverla al pool.
+            conexion.rollback()
+            conexion.exec_driver_sql(f"PRAGMA foreign_keys = {llaves_foraneas}")
+            conexion.commit()
+    #Devuelve la version final de la base de datos.
+    return version
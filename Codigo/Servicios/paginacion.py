@@ -0,0 +1,72 @@
+#Paginacion: Paginacion por cursor (keyset) para los listados
+
+#Modulos y librerias necesarias
+import base64
+from typing import Optional, Sequence
+from fastapi import HTTPException, Response
+
+#Nombre del encabezado HTTP donde se devuelve el cursor de la siguiente pagina.
+ENCABEZADO_SIGUIENTE_CURSOR = "X-Next-Cursor"
+
+#Define la funcion que convierte el ultimo 'id' de una pagina en un cursor opaco.
+def codificar_cursor(ultimo_id: int) -> str:
+    #Codifica el id en base64 (URL-safe) para que el cliente lo trate como un valor opaco.
+    return base64.urlsafe_b64encode(f"id:{ultimo_id}".encode()).decode().rstrip("=")
+
+#Define la funcion que recupera el 'id' guardado dentro de un cursor.
+def decodificar_cursor(cursor: str) -> int:
+    try:
+        #Restaura el relleno '=' que se quito al codificar.
+        relleno = "=" * (-len(cursor) % 4)
+        #Decodifica el texto y separa el prefijo del valor.
+        prefijo, valor = base64.urlsafe_b64decode(cursor + relleno).decode().split(":", 1)
+        #Solo se aceptan cursores generados por 'codificar_cursor'.
+        if prefijo != "id":
+            raise ValueError(prefijo)
+        return int(valor)
+    except (ValueError, UnicodeDecodeError):
+        #Si el cursor esta corrupto, lanza un error 400 (Peticion incorrecta).
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+#Define la funcion que crea un cursor para resultados ordenados por relevancia (rango, id).
+def codificar_cursor_rango(rango: float, ultimo_id: int) -> str:
+    #'repr' conserva el valor exacto del flotante para que la comparacion sea estable.
+    return base64.urlsafe_b64encode(f"rango:{rango!r}:{ultimo_id}".encode()).decode().rstrip("=")
+
+#Define la funcion que recupera el (rango, id) guardado dentro de un cursor de relevancia.
+def decodificar_cursor_rango(cursor: str):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        prefijo, rango, valor = base64.urlsafe_b64decode(cursor + relleno).decode().split(":", 2)
+        if prefijo != "rango":
+            raise ValueError(prefijo)
+        return float(rango), int(valor)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+#Define la funcion que aplica la paginacion a una consulta, por cursor o por 'offset'.
+def paginar(statement, columna_id, skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
+    #Ordena siempre por id para que las paginas sean estables.
+    statement = statement.order_by(columna_id)
+    #Si se recibio un cursor, busca directamente despues del ultimo id visto (usa el indice de la PK).
+    if cursor:
+        #El costo de la pagina ya no depende de su profundidad.
+        return statement.where(columna_id > decodificar_cursor(cursor)).limit(limit)
+    #Sin cursor, mantiene el 'offset' clasico por compatibilidad.
+    return statement.offset(skip).limit(limit)
+
+#Define la funcion que calcula el cursor de la siguiente pagina (o None si ya no hay mas).
+def siguiente_cursor(resultados: Sequence, limit: int) -> Optional[str]:
+    #Si la pagina vino incompleta, ya no quedan mas resultados.
+    if len(resultados) < limit:
+        return None
+    #El cursor apunta al ultimo elemento de la pagina actual.
+    return codificar_cursor(resultados[-1].id)
+
+#Define la funcion que agrega el cursor de la siguiente pagina a la respuesta HTTP.
+def agregar_siguiente_cursor(response: Response, resultados: Sequence, limit: int) -> None:
+    #Calcula el cursor de la siguiente pagina.
+    cursor = siguiente_cursor(resultados, limit)
+    #Solo agrega el encabezado si hay mas paginas.
+    if cursor:
+        response.headers[ENCABEZADO_SIGUIENTE_CURSOR] = cursor
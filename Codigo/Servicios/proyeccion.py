@@ -0,0 +1,65 @@
+#Proyeccion: Columnas y relaciones que se cargan y se devuelven en las rutas de libros
+
+#Con '?fields=isbn,titulo,precio' solo se seleccionan esas columnas del libro (load_only) y con
+#'?expand=autores,editorial' solo se cargan esas relaciones. Lo que no se pide no viaja en el SELECT,
+#no genera JOIN ni SELECT ... IN y no se serializa. Sin ninguno de los dos parametros las rutas
+#devuelven el 'LibroLeerCompleto' de siempre.
+#  - Solo 'fields': esas columnas, sin relaciones.
+#  - Solo 'expand': todas las columnas y solo esas relaciones ('expand=' vacio: ninguna relacion).
+#El 'id' se devuelve siempre (lo usa el cursor de la siguiente pagina).
+
+#Modulos y librerias necesarias
+from typing import Optional, Sequence, Tuple
+from fastapi import HTTPException, Query
+
+#Columnas del libro que se pueden pedir, en el mismo orden que 'LibroLeer'.
+CAMPOS_LIBRO = ("isbn", "titulo", "edicion", "ano_publicacion", "paginas", "precio", "formato", "id")
+#Relaciones del libro que se pueden expandir, en el mismo orden que 'LibroLeerCompleto'.
+RELACIONES_LIBRO = ("editorial", "publico_objetivo", "serie", "autores", "categorias")
+
+#Define los campos y relaciones que pidio el cliente.
+class Proyeccion:
+    __slots__ = ("campos", "relaciones")
+
+    def __init__(self, campos: Tuple[str, ...], relaciones: Tuple[str, ...]):
+        #Columnas del libro a cargar y devolver (siempre incluye 'id').
+        self.campos = campos
+        #Relaciones a cargar y devolver anidadas.
+        self.relaciones = relaciones
+
+#Define una funcion de ayuda que separa una lista por comas y valida cada nombre contra los permitidos.
+def leer_nombres(valor: str, permitidos: Sequence[str], parametro: str) -> Tuple[str, ...]:
+    #Ignora espacios y elementos vacios (ej. 'isbn, titulo,').
+    nombres = {nombre.strip() for nombre in valor.split(",") if nombre.strip()}
+    #Un nombre desconocido es un error del cliente (400), no se ignora en silencio.
+    desconocidos = sorted(nombres.difference(permitidos))
+    if desconocidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Valores no validos en '{parametro}': {', '.join(desconocidos)}. Permitidos: {', '.join(permitidos)}"
+        )
+    #Conserva el orden canonico (el de los esquemas), no el de la URL.
+    return tuple(nombre for nombre in permitidos if nombre in nombres)
+
+#Define la funcion que arma la proyeccion a partir de los parametros (None si no se pidio ninguna).
+def crear(campos: Optional[str], relaciones: Optional[str]) -> Optional[Proyeccion]:
+    #Sin parametros se conserva la respuesta completa.
+    if campos is None and relaciones is None:
+        return None
+    #Sin 'fields' se devuelven todas las columnas; con 'fields' se agrega siempre el 'id'.
+    if campos is None:
+        campos_pedidos = CAMPOS_LIBRO
+    else:
+        campos_pedidos = leer_nombres(campos + ",id", CAMPOS_LIBRO, "fields")
+    #Sin 'expand' (pero con 'fields') no se carga ninguna relacion.
+    relaciones_pedidas = leer_nombres(relaciones or "", RELACIONES_LIBRO, "expand")
+    return Proyeccion(campos_pedidos, relaciones_pedidas)
+
+#Define la dependencia que lee '?fields=' y '?expand=' (la comparten las rutas de libros).
+def leer_proyeccion(
+    #Define las columnas del libro a devolver, separadas por comas (ej. isbn,titulo,precio).
+    campos: Optional[str] = Query(None, alias="fields"),
+    #Define las relaciones a cargar y devolver, separadas por comas (ej. autores,editorial).
+    relaciones: Optional[str] = Query(None, alias="expand")
+) -> Optional[Proyeccion]:
+    return crear(campos, relaciones)
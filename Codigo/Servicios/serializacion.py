@@ -0,0 +1,233 @@
+#Serializacion: Camino rapido para convertir listas de libros completos a JSON
+
+#Con LIBRERIA_JSON_RAPIDO=1 las rutas que devuelven List[LibroLeerCompleto] construyen
+#las filas directamente desde los objetos ya cargados (con sus relaciones por lotes)
+#y las codifican con el serializador nativo de pydantic-core, sin la doble pasada de
+#validacion + 'jsonable_encoder'. El 'response_model' de cada ruta no cambia, asi que
+#el esquema OpenAPI es exactamente el mismo.
+#Las respuestas con proyeccion ('?fields=' / '?expand=', ver 'proyeccion') siempre usan este camino,
+#porque solo llevan un subconjunto de los campos de 'LibroLeerCompleto'.
+
+#Con '?formato=normalizado' las listas de libros se devuelven "side-loaded":
+#  {"libros": [{..., "editorial_id": 1, "autores_ids": [1, 2], ...}],
+#   "incluidos": {"editoriales": {"1": {...}}, "autores": {"1": {...}, "2": {...}}, ...}}
+#Cada entidad relacionada aparece una sola vez en 'incluidos' aunque la compartan todos los libros de la pagina.
+
+#Todas las rutas GET responden con 'responder_lectura': GET condicional (304),
+#servicio, cursor de la siguiente pagina y salida ('salida_libros' elige entre normalizado, proyeccion,
+#camino rapido u objetos del ORM).
+
+#Modulos y librerias necesarias
+import os
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+from fastapi import HTTPException, Request, Response
+from pydantic_core import to_json
+from sqlmodel import Session
+from Modelo import modelo
+from Servicios import paginacion, versiones
+from Servicios.proyeccion import CAMPOS_LIBRO, RELACIONES_LIBRO, Proyeccion
+
+#Indica si el camino rapido esta activo (apagado por defecto).
+USAR_JSON_RAPIDO = os.getenv("LIBRERIA_JSON_RAPIDO", "0") == "1"
+
+#Define la funcion que convierte una Editorial (con su direccion) al formato de 'EditorialLeer'.
+def editorial_a_dict(editorial: Optional[modelo.Editorial]) -> Optional[dict]:
+    if editorial is None:
+        return None
+    direccion = editorial.direccion
+    return {
+        "nombre": editorial.nombre,
+        "id": editorial.id,
+        "direccion": {
+            "calle": direccion.calle,
+            "ciudad_pais": direccion.ciudad_pais,
+            "codigo_postal": direccion.codigo_postal,
+            "id": direccion.id,
+        },
+    }
+
+#Define las funciones que convierten las demas relaciones de un Libro al formato de su esquema de lectura.
+def publico_a_dict(publico: Optional[modelo.PublicoObjetivo]) -> Optional[dict]:
+    return {"tipo": publico.tipo, "id": publico.id} if publico else None
+
+def serie_a_dict(serie: Optional[modelo.Serie]) -> Optional[dict]:
+    return {"nombre": serie.nombre, "id": serie.id} if serie else None
+
+def autor_a_dict(autor: modelo.Autor) -> dict:
+    return {"nombre": autor.nombre, "id": autor.id}
+
+def categoria_a_dict(categoria: modelo.Categoria) -> dict:
+    return {"nombre": categoria.nombre, "descripcion": categoria.descripcion, "id": categoria.id}
+
+def autores_a_lista(autores: Iterable[modelo.Autor]) -> List[dict]:
+    return [autor_a_dict(autor) for autor in autores]
+
+def categorias_a_lista(categorias: Iterable[modelo.Categoria]) -> List[dict]:
+    return [categoria_a_dict(categoria) for categoria in categorias]
+
+#Define la funcion que convierte un Libro al formato de 'LibroLeerCompleto' (mismo orden de campos).
+def libro_completo_a_dict(libro: modelo.Libro) -> dict:
+    return {
+        "isbn": libro.isbn,
+        "titulo": libro.titulo,
+        "edicion": libro.edicion,
+        "ano_publicacion": libro.ano_publicacion,
+        "paginas": libro.paginas,
+        "precio": float(libro.precio),
+        "formato": libro.formato,
+        "id": libro.id,
+        "editorial": editorial_a_dict(libro.editorial),
+        "publico_objetivo": publico_a_dict(libro.publico_objetivo),
+        "serie": serie_a_dict(libro.serie),
+        "autores": autores_a_lista(libro.autores),
+        "categorias": categorias_a_lista(libro.categorias),
+    }
+
+#Funciones que convierten cada relacion expandible de un Libro (por nombre, como en '?expand=').
+CONVERTIR_RELACION = {
+    "editorial": lambda libro: editorial_a_dict(libro.editorial),
+    "publico_objetivo": lambda libro: publico_a_dict(libro.publico_objetivo),
+    "serie": lambda libro: serie_a_dict(libro.serie),
+    "autores": lambda libro: autores_a_lista(libro.autores),
+    "categorias": lambda libro: categorias_a_lista(libro.categorias),
+}
+
+#Define la funcion que convierte un Libro con solo las columnas y relaciones de la proyeccion (o completo si no hay).
+def libro_a_dict(libro: modelo.Libro, proyeccion: Optional[Proyeccion] = None) -> dict:
+    if proyeccion is None:
+        return libro_completo_a_dict(libro)
+    fila = columnas_a_dict(libro, proyeccion.campos)
+    for relacion in proyeccion.relaciones:
+        fila[relacion] = CONVERTIR_RELACION[relacion](libro)
+    return fila
+
+#Define una funcion de ayuda que copia las columnas pedidas de un Libro.
+def columnas_a_dict(libro: modelo.Libro, campos: Iterable[str]) -> dict:
+    #Solo se leen los atributos cargados por 'servicios.opciones_libro' (los demas lanzarian un error).
+    fila = {campo: getattr(libro, campo) for campo in campos}
+    #SQLite puede devolver el precio como entero; se devuelve como float, igual que en 'LibroLeer'.
+    if "precio" in fila:
+        fila["precio"] = float(fila["precio"])
+    return fila
+
+#Relaciones en el formato normalizado: nombre -> (clave en 'incluidos', campo con el id o los ids, conversion, es lista).
+RELACIONES_NORMALIZADAS = {
+    "editorial": ("editoriales", "editorial_id", editorial_a_dict, False),
+    "publico_objetivo": ("publicos_objetivo", "publico_objetivo_id", publico_a_dict, False),
+    "serie": ("series", "serie_id", serie_a_dict, False),
+    "autores": ("autores", "autores_ids", autor_a_dict, True),
+    "categorias": ("categorias", "categorias_ids", categoria_a_dict, True),
+}
+
+#Define la funcion que arma la respuesta normalizada: libros con ids y cada entidad relacionada una sola vez.
+def respuesta_libros_normalizada(libros: Iterable[modelo.Libro], response: Response, proyeccion: Optional[Proyeccion] = None) -> Response:
+    #Sin proyeccion se incluyen todas las columnas y relaciones; con proyeccion, solo las pedidas.
+    campos = CAMPOS_LIBRO if proyeccion is None else proyeccion.campos
+    relaciones = RELACIONES_LIBRO if proyeccion is None else proyeccion.relaciones
+    #Un mapa id -> entidad por cada relacion incluida.
+    incluidos = {RELACIONES_NORMALIZADAS[relacion][0]: {} for relacion in relaciones}
+    filas = []
+    for libro in libros:
+        fila = columnas_a_dict(libro, campos)
+        for relacion in relaciones:
+            clave, campo_id, convertir, es_lista = RELACIONES_NORMALIZADAS[relacion]
+            mapa = incluidos[clave]
+            #Las entidades que ya se vieron en la pagina no se vuelven a convertir.
+            if es_lista:
+                ids = []
+                for entidad in getattr(libro, relacion):
+                    if entidad.id not in mapa:
+                        mapa[entidad.id] = convertir(entidad)
+                    ids.append(entidad.id)
+                fila[campo_id] = ids
+            else:
+                entidad = getattr(libro, relacion)
+                if entidad is not None and entidad.id not in mapa:
+                    mapa[entidad.id] = convertir(entidad)
+                fila[campo_id] = entidad.id if entidad is not None else None
+        filas.append(fila)
+    return respuesta_json({"libros": filas, "incluidos": incluidos}, response)
+
+#Define la funcion que arma la respuesta JSON de una lista de libros (completos o segun la proyeccion).
+def respuesta_libros(libros: Iterable[modelo.Libro], response: Response, proyeccion: Optional[Proyeccion] = None) -> Response:
+    #Codifica todas las filas en una sola llamada al serializador nativo.
+    return respuesta_json([libro_a_dict(libro, proyeccion) for libro in libros], response)
+
+#Define la funcion que arma la respuesta JSON de la busqueda por lote de ISBN (formato de 'ResultadoIsbnLote').
+def respuesta_isbn_lote(libros: Iterable[modelo.Libro], no_encontrados: List[str], response: Response, proyeccion: Optional[Proyeccion] = None) -> Response:
+    return respuesta_json({
+        "libros": [libro_a_dict(libro, proyeccion) for libro in libros],
+        "no_encontrados": no_encontrados,
+    }, response)
+
+#Define una funcion de ayuda que codifica un contenido con el serializador nativo y arma la respuesta.
+def respuesta_json(contenido, response: Response) -> Response:
+    #Conserva los encabezados que la ruta ya agrego (ETag, X-Next-Cursor).
+    encabezados = {clave: valor for clave, valor in response.headers.items() if clave != "content-length"}
+    return Response(content=to_json(contenido), media_type="application/json", headers=encabezados)
+
+# --- Respuesta de las rutas de lectura ---
+
+#Define la funcion que responde una ruta GET:
+#  1. Si el cliente ya tiene la version actual (If-None-Match), responde 304 sin consultar ni serializar.
+#  2. Llama a 'consultar(session)'. Si devuelve (resultados, siguiente) el servicio ya calculo su cursor
+#     (ej. la busqueda por relevancia); si no, con 'limit' el cursor se calcula con el 'id' del ultimo elemento.
+#  3. Devuelve 'salida(resultado, response)', o el resultado tal cual para que lo valide el 'response_model'.
+#En cualquier caso termina la transaccion de lectura en el hilo de la ruta: la conexion vuelve al pool antes de
+#validar y enviar la respuesta (ver 'Limite de sesiones abiertas' en database.py).
+def responder_lectura(
+    session: Session,
+    request: Request,
+    response: Response,
+    entidades: Sequence[str],
+    consultar: Callable[[Session], Any],
+    limit: Optional[int] = None,
+    salida: Optional[Callable[[Any, Response], Any]] = None,
+):
+    try:
+        #Si las 'entidades' no cambiaron desde la ultima peticion del cliente, responde 304 sin consultar ni serializar.
+        no_modificado = versiones.condicional(session, request, response, entidades)
+        if no_modificado:
+            return no_modificado
+        #Llama al servicio con la sesion de la ruta.
+        resultado = consultar(session)
+    finally:
+        #Devuelve la conexion al pool (los objetos cargados siguen disponibles: 'expire_on_commit=False').
+        session.commit()
+    #Un servicio que calcula su propio cursor (ej. la busqueda por relevancia) devuelve (resultado, cursor).
+    siguiente = None
+    if isinstance(resultado, tuple):
+        resultado, siguiente = resultado
+    #Si no, con 'limit' el cursor sale del 'id' de la ultima fila de la pagina.
+    elif limit is not None:
+        siguiente = paginacion.siguiente_cursor(resultado, limit)
+    #Agrega el encabezado con el cursor de la siguiente pagina (si la hay).
+    if siguiente:
+        response.headers[paginacion.ENCABEZADO_SIGUIENTE_CURSOR] = siguiente
+    return salida(resultado, response) if salida else resultado
+
+#Define la salida de una lista de libros segun lo que pidio el cliente.
+def salida_libros(proyeccion: Optional[Proyeccion], formato: str = "completo"):
+    def salida(libros, response: Response):
+        #Formato normalizado: cada editorial, autor, etc. de la pagina se envia una sola vez en 'incluidos'.
+        if formato == "normalizado":
+            return respuesta_libros_normalizada(libros, response, proyeccion)
+        #Con proyeccion (o con el camino rapido) serializa las filas directamente, solo con los campos pedidos.
+        if proyeccion is not None or USAR_JSON_RAPIDO:
+            return respuesta_libros(libros, response, proyeccion)
+        #Si no, FastAPI valida los objetos con el 'response_model' de la ruta.
+        return libros
+    #Devuelve la funcion que usara 'responder_lectura'.
+    return salida
+
+#Define la salida de un solo libro: 404 con 'detalle' si no existe; con proyeccion, solo los campos pedidos.
+def salida_libro(proyeccion: Optional[Proyeccion], detalle: str):
+    def salida(libro, response: Response):
+        #Si el libro no se encuentra, lanza un error HTTP 404 (No Encontrado).
+        if libro is None:
+            raise HTTPException(status_code=404, detail=detalle)
+        #Con proyeccion serializa solo los campos pedidos.
+        if proyeccion is not None:
+            return respuesta_json(libro_a_dict(libro, proyeccion), response)
+        return libro
+    return salida
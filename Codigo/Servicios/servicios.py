@@ -2,47 +2,99 @@
 
 #Modulos y librerias necesarias
 from sqlmodel import Session, select
-from typing import List, Optional
+from sqlalchemy import delete, func, insert, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence
+import csv
+import io
+import json
+import uuid
 from Modelo import modelo
 from Esquemas import esquemas
+from Servicios.paginacion import paginar, codificar_cursor_rango, decodificar_cursor_rango
+from Servicios import cache, versiones, facetas
+from Servicios.proyeccion import Proyeccion
 from fastapi import HTTPException
 
 # --- Funciones Helper "Get by Name" ---
 
-#Define una funcion de ayuda para buscar un Autor por su nombre.
-def get_autor_por_nombre(session: Session, nombre: str) -> Optional[modelo.Autor]:
-    #Crea una consulta para seleccionar un Autor donde el nombre coincida.
-    statement = select(modelo.Autor).where(modelo.Autor.nombre == nombre)
-    #Ejecuta la consulta en la sesion y devuelve el primer resultado (o None).
-    return session.exec(statement).first()
-
-#Define una funcion de ayuda para buscar una Categoria por su nombre.
-def get_categoria_por_nombre(session: Session, nombre: str) -> Optional[modelo.Categoria]:
-    #Crea una consulta para seleccionar una Categoria donde el nombre coincida.
-    statement = select(modelo.Categoria).where(modelo.Categoria.nombre == nombre)
-    #Ejecuta la consulta y devuelve el primer resultado.
-    return session.exec(statement).first()
-
-#Define una funcion de ayuda para buscar una Editorial por su nombre.
-def get_editorial_por_nombre(session: Session, nombre: str) -> Optional[modelo.Editorial]:
-    #Crea una consulta para seleccionar una Editorial donde el nombre coincida.
-    statement = select(modelo.Editorial).where(modelo.Editorial.nombre == nombre)
-    #Ejecuta la consulta y devuelve el primer resultado.
-    return session.exec(statement).first()
-
-#Define una funcion de ayuda para buscar un PublicoObjetivo por su tipo.
-def get_publico_objetivo_por_tipo(session: Session, tipo: str) -> Optional[modelo.PublicoObjetivo]:
-    #Crea una consulta para seleccionar un PublicoObjetivo donde el tipo coincida.
-    statement = select(modelo.PublicoObjetivo).where(modelo.PublicoObjetivo.tipo == tipo)
-    #Ejecuta la consulta y devuelve el primer resultado.
-    return session.exec(statement).first()
-
-#Define una funcion de ayuda para buscar una Serie por su nombre.
-def get_serie_por_nombre(session: Session, nombre: str) -> Optional[modelo.Serie]:
-    #Crea una consulta para seleccionar una Serie donde el nombre coincida.
-    statement = select(modelo.Serie).where(modelo.Serie.nombre == nombre)
-    #Ejecuta la consulta y devuelve el primer resultado.
-    return session.exec(statement).first()
+#Define una funcion de ayuda que resuelve un nombre a su id pasando primero por la cache nombre -> id.
+#Un acierto se comprueba con 'WHERE id = ? AND nombre = ?' (una consulta por clave primaria): SQLite reutiliza
+#los ids de las filas borradas, asi que la llave foranea no detecta un id viejo que ahora es de otra fila.
+#Si la comprobacion falla, el nombre sale de la cache y se busca en la BD como en un fallo.
+def buscar_id_por_nombre(session: Session, cache_nombres: cache.CacheLRU, columna_nombre, columna_id, nombre: str) -> Optional[int]:
+    #Intenta resolver el id desde la cache.
+    entidad_id = cache_nombres.obtener(nombre)
+    if entidad_id is not None:
+        #Confirma que el id sigue siendo de una fila con ese nombre.
+        statement = select(columna_id).where(columna_id == entidad_id, columna_nombre == nombre)
+        if session.exec(statement).first() is not None:
+            return entidad_id
+        cache_nombres.invalidar(nombre)
+    #Crea una consulta que selecciona solo el id de la entidad donde el nombre coincida.
+    statement = select(columna_id).where(columna_nombre == nombre)
+    #Ejecuta la consulta en la sesion y toma el primer resultado (o None).
+    entidad_id = session.exec(statement).first()
+    #Si se encontro, lo guarda en la cache cuando la transaccion se confirme.
+    if entidad_id is not None:
+        cache.guardar_al_confirmar(session, cache_nombres, nombre, entidad_id)
+    #Devuelve el id encontrado.
+    return entidad_id
+
+#Define una funcion de ayuda para buscar el id de un Autor por su nombre.
+def get_autor_id_por_nombre(session: Session, nombre: str) -> Optional[int]:
+    #Busca el Autor por nombre usando la cache de autores.
+    return buscar_id_por_nombre(session, cache.autores, modelo.Autor.nombre, modelo.Autor.id, nombre)
+
+#Define una funcion de ayuda para buscar el id de una Categoria por su nombre.
+def get_categoria_id_por_nombre(session: Session, nombre: str) -> Optional[int]:
+    #Busca la Categoria por nombre usando la cache de categorias.
+    return buscar_id_por_nombre(session, cache.categorias, modelo.Categoria.nombre, modelo.Categoria.id, nombre)
+
+#Define una funcion de ayuda para buscar el id de una Editorial por su nombre.
+def get_editorial_id_por_nombre(session: Session, nombre: str) -> Optional[int]:
+    #Busca la Editorial por nombre usando la cache de editoriales.
+    return buscar_id_por_nombre(session, cache.editoriales, modelo.Editorial.nombre, modelo.Editorial.id, nombre)
+
+#Define una funcion de ayuda para buscar el id de un PublicoObjetivo por su tipo.
+def get_publico_objetivo_id_por_tipo(session: Session, tipo: str) -> Optional[int]:
+    #Busca el PublicoObjetivo por tipo usando la cache de publicos.
+    return buscar_id_por_nombre(session, cache.publicos_objetivo, modelo.PublicoObjetivo.tipo, modelo.PublicoObjetivo.id, tipo)
+
+#Define una funcion de ayuda para buscar el id de una Serie por su nombre.
+def get_serie_id_por_nombre(session: Session, nombre: str) -> Optional[int]:
+    #Busca la Serie por nombre usando la cache de series.
+    return buscar_id_por_nombre(session, cache.series, modelo.Serie.nombre, modelo.Serie.id, nombre)
+
+#Define la funcion que llena las caches de nombres con las entidades que tienen mas libros (se usa al arrancar).
+def precalentar_caches(session: Session) -> Dict[str, int]:
+    resultado = {}
+    for faceta, cache_nombres, modelo_cls, columna in (
+        (facetas.AUTORES, cache.autores, modelo.Autor, modelo.Autor.nombre),
+        (facetas.CATEGORIAS, cache.categorias, modelo.Categoria, modelo.Categoria.nombre),
+        (facetas.EDITORIALES, cache.editoriales, modelo.Editorial, modelo.Editorial.nombre),
+        (facetas.SERIES, cache.series, modelo.Serie, modelo.Serie.nombre),
+        (facetas.PUBLICOS, cache.publicos_objetivo, modelo.PublicoObjetivo, modelo.PublicoObjetivo.tipo),
+    ):
+        #Nombres de las entidades con mas libros (segun los conteos por faceta), hasta llenar la cache.
+        statement = (
+            select(columna)
+            .join(modelo.ConteoFaceta, modelo.ConteoFaceta.entidad_id == modelo_cls.id)
+            .where(modelo.ConteoFaceta.faceta == faceta)
+            .order_by(modelo.ConteoFaceta.total.desc())
+            .limit(cache_nombres.tamano_maximo)
+        )
+        nombres = list(dict.fromkeys(session.exec(statement).all()))
+        #Resuelve los ids igual que la busqueda normal (con nombres repetidos, el primero).
+        ids = get_ids_por_nombres(session, columna, modelo_cls.id, nombres)
+        #Se guardan de menos a mas usado, asi los mas usados quedan como los mas recientes de la LRU.
+        for nombre in reversed(nombres):
+            cache_nombres.guardar(nombre, ids[nombre])
+        resultado[faceta] = len(nombres)
+    return resultado
 
 # --- Servicios de Creación (Nuevos) ---
 
@@ -52,10 +104,10 @@ def create_direccion(session: Session, direccion_create: esquemas.DireccionCrear
     db_direccion = modelo.Direccion.model_validate(direccion_create)
     #Anade el nuevo objeto a la sesion.
     session.add(db_direccion)
-    #Guarda los cambios en la BD.
-    session.commit()
-    #Refresca el objeto para obtener el ID asignado por la BD.
-    session.refresh(db_direccion)
+    #Incrementa la version de la entidad (invalida los ETag de las rutas GET).
+    versiones.incrementar(session, versiones.EDITORIALES)
+    #Envia el INSERT a la BD (sin confirmar); el ID asignado queda en el objeto sin un SELECT extra.
+    session.flush()
     #Devuelve la direccion recien creada.
     return db_direccion
 
@@ -63,26 +115,29 @@ def create_direccion(session: Session, direccion_create: esquemas.DireccionCrear
 def create_editorial(session: Session, editorial_create: esquemas.EditorialCrear) -> modelo.Editorial:
     # 1. Validar que no exista
     #Usa la funcion de ayuda para verificar si la editorial ya existe.
-    if get_editorial_por_nombre(session, editorial_create.nombre):
+    if get_editorial_id_por_nombre(session, editorial_create.nombre) is not None:
         #Si existe, lanza un error 409 (Conflicto).
         raise HTTPException(status_code=409, detail="La editorial ya existe")
     
     # 2. Crear la Dirección primero
-    #Llama al servicio de crear direccion con los datos anidados de la solicitud.
-    db_direccion = create_direccion(session, editorial_create.direccion)
+    #Convierte los datos anidados de la solicitud al modelo de la direccion.
+    db_direccion = modelo.Direccion.model_validate(editorial_create.direccion)
     
-    # 3. Crear la Editorial y asignarle el ID de la dirección
+    # 3. Crear la Editorial y asignarle la dirección
     #Convierte los datos de la editorial a un diccionario, excluyendo la direccion anidada.
     editorial_data = editorial_create.model_dump(exclude={"direccion"})
-    #Crea la instancia del modelo Editorial, pasando los datos y el 'direccion_id' obtenido.
-    db_editorial = modelo.Editorial(**editorial_data, direccion_id=db_direccion.id)
+    #Crea la instancia del modelo Editorial y le asigna la direccion por la relacion:
+    #al hacer 'flush' se inserta primero la direccion y su ID pasa solo a 'direccion_id'.
+    db_editorial = modelo.Editorial(**editorial_data, direccion=db_direccion)
     
-    #Anade la nueva editorial a la sesion.
+    #Anade la nueva editorial (y con ella su direccion) a la sesion.
     session.add(db_editorial)
-    #Guarda los cambios.
-    session.commit()
-    #Refresca el objeto para obtener su ID.
-    session.refresh(db_editorial)
+    #Incrementa la version de la entidad (invalida los ETag de las rutas GET).
+    versiones.incrementar(session, versiones.EDITORIALES)
+    #Envia ambos INSERT a la BD en la misma transaccion (el COMMIT lo hace la unidad de trabajo).
+    session.flush()
+    #Registra el nuevo nombre en la cache de busqueda (al confirmar la transaccion).
+    cache.guardar_al_confirmar(session, cache.editoriales, db_editorial.nombre, db_editorial.id)
     #Devuelve la editorial recien creada.
     return db_editorial
 
@@ -93,10 +148,10 @@ def get_editorial(session: Session, editorial_id: int) -> modelo.Editorial | Non
     return session.get(modelo.Editorial, editorial_id)
 
 #Define el servicio para obtener una lista paginada de todas las Editoriales.
-def get_editoriales_todas(session: Session, skip: int = 0, limit: int = 10) -> List[modelo.Editorial]:
+def get_editoriales_todas(session: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[modelo.Editorial]:
     """Obtiene una lista de todas las editoriales, con paginación."""
-    #Crea una consulta para seleccionar Editoriales, aplicando 'offset' (skip) y 'limit'.
-    statement = select(modelo.Editorial).offset(skip).limit(limit)
+    #Crea una consulta para seleccionar Editoriales, paginada por cursor o por 'offset' (skip) y 'limit'.
+    statement = paginar(select(modelo.Editorial), modelo.Editorial.id, skip, limit, cursor)
     #Ejecuta la consulta y devuelve todos los resultados.
     return session.exec(statement).all()
 
@@ -132,6 +187,9 @@ def actualizar_editorial(
             session.add(db_direccion)
 
     # 3. Actualiza los campos restantes de la editorial (ej. "nombre")
+    #Si cambia el nombre, el nombre anterior deja de ser valido en la cache.
+    if "nombre" in update_data:
+        cache.editoriales.invalidar(db_editorial.nombre)
     #Itera sobre los datos restantes en 'update_data' (solo 'nombre', si se envio).
     for key, value in update_data.items():
         setattr(db_editorial, key, value)
@@ -139,10 +197,12 @@ def actualizar_editorial(
     # 4. Guarda todo en la base de datos
     #Anade la editorial modificada a la sesion.
     session.add(db_editorial)
-    #Guarda los cambios (tanto en editorial como en direccion).
-    session.commit()
-    #Refresca el objeto editorial.
-    session.refresh(db_editorial)
+    #Incrementa la version de la entidad (invalida los ETag de las rutas GET).
+    versiones.incrementar(session, versiones.EDITORIALES)
+    #Envia los cambios (tanto de la editorial como de la direccion) a la BD, sin confirmar.
+    session.flush()
+    #Registra el nombre (posiblemente nuevo) en la cache de busqueda (al confirmar la transaccion).
+    cache.guardar_al_confirmar(session, cache.editoriales, db_editorial.nombre, db_editorial.id)
     
     #Devuelve la editorial actualizada.
     return db_editorial
@@ -150,7 +210,7 @@ def actualizar_editorial(
 #Define el servicio para crear un PublicoObjetivo.
 def create_publico_objetivo(session: Session, publico_create: esquemas.PublicoObjetivoCrear) -> modelo.PublicoObjetivo:
     #Usa la funcion de ayuda para verificar si el 'tipo' de publico ya existe.
-    if get_publico_objetivo_por_tipo(session, publico_create.tipo):
+    if get_publico_objetivo_id_por_tipo(session, publico_create.tipo) is not None:
         #Si existe, lanza un error 409 (Conflicto).
         raise HTTPException(status_code=409, detail="El tipo de público ya existe")
     
@@ -158,24 +218,30 @@ def create_publico_objetivo(session: Session, publico_create: esquemas.PublicoOb
     db_publico = modelo.PublicoObjetivo.model_validate(publico_create)
     #Anade el objeto a la sesion.
     session.add(db_publico)
-    #Guarda los cambios.
-    session.commit()
-    #Refresca el objeto para obtener su ID.
-    session.refresh(db_publico)
+    #Incrementa la version de la entidad (invalida los ETag de las rutas GET).
+    versiones.incrementar(session, versiones.PUBLICOS)
+    #Envia el INSERT (el ID queda en el objeto); si otra peticion creo el mismo nombre despues de la verificacion,
+    #la restriccion unica lo detiene y la unidad de trabajo deshace la transaccion.
+    try:
+        session.flush()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="El tipo de público ya existe")
+    #Registra el nuevo nombre en la cache de busqueda (al confirmar la transaccion).
+    cache.guardar_al_confirmar(session, cache.publicos_objetivo, db_publico.tipo, db_publico.id)
     #Devuelve el objeto recien creado.
     return db_publico
 
 #Define el servicio para obtener una lista paginada de PublicoObjetivo.
-def get_publicos_objetivo_todos(session: Session, skip: int = 0, limit: int = 10) -> List[modelo.PublicoObjetivo]:
-    #Crea una consulta seleccionando PublicoObjetivo, aplicando 'offset' y 'limit'.
-    statement = select(modelo.PublicoObjetivo).offset(skip).limit(limit)
+def get_publicos_objetivo_todos(session: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[modelo.PublicoObjetivo]:
+    #Crea una consulta seleccionando PublicoObjetivo, paginada por cursor o por 'offset' y 'limit'.
+    statement = paginar(select(modelo.PublicoObjetivo), modelo.PublicoObjetivo.id, skip, limit, cursor)
     #Ejecuta la consulta y devuelve todos los resultados.
     return session.exec(statement).all()
 
 #Define el servicio para crear una Serie.
 def create_serie(session: Session, serie_create: esquemas.SerieCrear) -> modelo.Serie:
     #Usa la funcion de ayuda para verificar si la serie ya existe por nombre.
-    if get_serie_por_nombre(session, serie_create.nombre):
+    if get_serie_id_por_nombre(session, serie_create.nombre) is not None:
         #Si existe, lanza un error 409 (Conflicto).
         raise HTTPException(status_code=409, detail="La serie ya existe")
     
@@ -183,17 +249,23 @@ def create_serie(session: Session, serie_create: esquemas.SerieCrear) -> modelo.
     db_serie = modelo.Serie.model_validate(serie_create)
     #Anade el objeto a la sesion.
     session.add(db_serie)
-    #Guarda los cambios.
-    session.commit()
-    #Refresca el objeto para obtener su ID.
-    session.refresh(db_serie)
+    #Incrementa la version de la entidad (invalida los ETag de las rutas GET).
+    versiones.incrementar(session, versiones.SERIES)
+    #Envia el INSERT (el ID queda en el objeto); si otra peticion creo el mismo nombre despues de la verificacion,
+    #la restriccion unica lo detiene y la unidad de trabajo deshace la transaccion.
+    try:
+        session.flush()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="La serie ya existe")
+    #Registra el nuevo nombre en la cache de busqueda (al confirmar la transaccion).
+    cache.guardar_al_confirmar(session, cache.series, db_serie.nombre, db_serie.id)
     #Devuelve el objeto recien creado.
     return db_serie
 
 #Define el servicio para obtener una lista paginada de Series.
-def get_series_todas(session: Session, skip: int = 0, limit: int = 10) -> List[modelo.Serie]:
-    #Crea una consulta seleccionando Serie, aplicando 'offset' y 'limit'.
-    statement = select(modelo.Serie).offset(skip).limit(limit)
+def get_series_todas(session: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[modelo.Serie]:
+    #Crea una consulta seleccionando Serie, paginada por cursor o por 'offset' y 'limit'.
+    statement = paginar(select(modelo.Serie), modelo.Serie.id, skip, limit, cursor)
     #Ejecuta la consulta y devuelve todos los resultados.
     return session.exec(statement).all()
 
@@ -202,7 +274,7 @@ def get_series_todas(session: Session, skip: int = 0, limit: int = 10) -> List[m
 #Define el servicio para crear un Autor.
 def create_autor(session: Session, autor_create: esquemas.AutorCreacion) -> modelo.Autor:
     #Usa la funcion de ayuda para verificar si el autor ya existe por nombre.
-    if get_autor_por_nombre(session, autor_create.nombre):
+    if get_autor_id_por_nombre(session, autor_create.nombre) is not None:
         #Si existe, lanza un error 409 (Conflicto).
         raise HTTPException(status_code=409, detail="El autor ya existe")
         
@@ -210,10 +282,16 @@ def create_autor(session: Session, autor_create: esquemas.AutorCreacion) -> mode
     db_autor = modelo.Autor.model_validate(autor_create)
     #Anade el objeto a la sesion.
     session.add(db_autor)
-    #Guarda los cambios.
-    session.commit()
-    #Refresca el objeto para obtener su ID.
-    session.refresh(db_autor)
+    #Incrementa la version de la entidad (invalida los ETag de las rutas GET).
+    versiones.incrementar(session, versiones.AUTORES)
+    #Envia el INSERT (el ID queda en el objeto); si otra peticion creo el mismo nombre despues de la verificacion,
+    #la restriccion unica lo detiene y la unidad de trabajo deshace la transaccion.
+    try:
+        session.flush()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="El autor ya existe")
+    #Registra el nuevo nombre en la cache de busqueda (al confirmar la transaccion).
+    cache.guardar_al_confirmar(session, cache.autores, db_autor.nombre, db_autor.id)
     #Devuelve el objeto recien creado.
     return db_autor
 
@@ -222,17 +300,35 @@ def get_autor(session: Session, autor_id: int) -> modelo.Autor | None:
     #Usa el metodo .get() de la sesion para buscar por clave primaria.
     return session.get(modelo.Autor, autor_id)
 
-#Define el servicio para obtener una lista paginada de Autores.
-def get_autores_todos(session: Session, skip: int = 0, limit: int = 10) -> List[modelo.Autor]:
-    #Crea una consulta seleccionando Autor, aplicando 'offset' y 'limit'.
-    statement = select(modelo.Autor).offset(skip).limit(limit)
+#Define el servicio para obtener una lista paginada de Autores (opcionalmente con sus libros).
+def get_autores_todos(session: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, incluir_libros: bool = False) -> List[modelo.Autor]:
+    #Crea una consulta seleccionando Autor, paginada por cursor o por 'offset' y 'limit'.
+    statement = paginar(select(modelo.Autor), modelo.Autor.id, skip, limit, cursor)
+    #Si se piden los libros, se cargan los de toda la pagina con una sola consulta adicional (SELECT ... IN),
+    #en lugar de una carga perezosa por cada autor al serializar.
+    if incluir_libros:
+        statement = statement.options(selectinload(modelo.Autor.libros))
+    #Ejecuta la consulta y devuelve todos los resultados.
+    return session.exec(statement).all()
+
+#Define el servicio para obtener una pagina de los libros de un Autor (por su ID).
+def get_libros_de_autor(session: Session, autor_id: int, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[modelo.Libro]:
+    #Recorre la tabla de enlace por 'autor_id': el indice (autor_id, libro_id) da los libros del autor ya ordenados,
+    #asi la pagina se lee directamente en el indice y solo se une con 'libro' por su clave primaria.
+    statement = (
+        select(modelo.Libro)
+        .join(modelo.LibroAutorLink, modelo.LibroAutorLink.libro_id == modelo.Libro.id)
+        .where(modelo.LibroAutorLink.autor_id == autor_id)
+    )
+    #Pagina por el 'libro_id' del enlace (la misma columna del indice) con cursor o con 'offset'.
+    statement = paginar(statement, modelo.LibroAutorLink.libro_id, skip, limit, cursor)
     #Ejecuta la consulta y devuelve todos los resultados.
     return session.exec(statement).all()
 
 #Define el servicio para crear una Categoria.
 def create_categoria(session: Session, categoria_create: esquemas.CategoriaCrear) -> modelo.Categoria:
     #Usa la funcion de ayuda para verificar si la categoria ya existe por nombre.
-    if get_categoria_por_nombre(session, categoria_create.nombre):
+    if get_categoria_id_por_nombre(session, categoria_create.nombre) is not None:
         #Si existe, lanza un error 409 (Conflicto).
         raise HTTPException(status_code=409, detail="La categoría ya existe")
     
@@ -240,10 +336,16 @@ def create_categoria(session: Session, categoria_create: esquemas.CategoriaCrear
     db_categoria = modelo.Categoria.model_validate(categoria_create)
     #Anade el objeto a la sesion.
     session.add(db_categoria)
-    #Guarda los cambios.
-    session.commit()
-    #Refresca el objeto para obtener su ID.
-    session.refresh(db_categoria)
+    #Incrementa la version de la entidad (invalida los ETag de las rutas GET).
+    versiones.incrementar(session, versiones.CATEGORIAS)
+    #Envia el INSERT (el ID queda en el objeto); si otra peticion creo el mismo nombre despues de la verificacion,
+    #la restriccion unica lo detiene y la unidad de trabajo deshace la transaccion.
+    try:
+        session.flush()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="La categoría ya existe")
+    #Registra el nuevo nombre en la cache de busqueda (al confirmar la transaccion).
+    cache.guardar_al_confirmar(session, cache.categorias, db_categoria.nombre, db_categoria.id)
     #Devuelve el objeto recien creado.
     return db_categoria
 
@@ -253,13 +355,138 @@ def get_categoria(session: Session, categoria_id: int) -> modelo.Categoria | Non
     return session.get(modelo.Categoria, categoria_id)
 
 #Define el servicio para obtener una lista paginada de Categorias.
-def get_categorias_todos(session: Session, skip: int = 0, limit: int = 10) -> List[modelo.Categoria]:
-    #Crea una consulta seleccionando Categoria, aplicando 'offset' y 'limit'.
-    statement = select(modelo.Categoria).offset(skip).limit(limit)
+def get_categorias_todos(session: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[modelo.Categoria]:
+    #Crea una consulta seleccionando Categoria, paginada por cursor o por 'offset' y 'limit'.
+    statement = paginar(select(modelo.Categoria), modelo.Categoria.id, skip, limit, cursor)
     #Ejecuta la consulta y devuelve todos los resultados.
     return session.exec(statement).all()
 
 
+# --- Servicios de carga masiva de Autores, Categorias, Series y Publicos ---
+
+#Numero maximo de registros por peticion en la carga masiva de autores, categorias, series y publicos.
+MAX_ENTIDADES_LOTE = 5000
+
+#Define el servicio generico que crea muchas entidades con nombre unico en pocas sentencias.
+#Usa INSERT ... ON CONFLICT DO NOTHING RETURNING: la BD decide que filas son nuevas (sin SELECT previo
+#y sin carreras entre peticiones) y devuelve solo los ids de las filas que si inserto.
+def create_entidades_lote(session: Session, modelo_cls, columna, filas: List[dict], cache_nombres: cache.CacheLRU, entidad: str) -> esquemas.ResultadoLoteEntidades:
+    #Quita nombres repetidos dentro de la misma peticion (se conserva la primera aparicion).
+    por_nombre: Dict[str, dict] = {}
+    for fila in filas:
+        por_nombre.setdefault(fila[columna.key], fila)
+    unicas = list(por_nombre.values())
+    creados: Dict[str, int] = {}
+    #Inserta por bloques para no rebasar el limite de parametros de SQLite.
+    for inicio in range(0, len(unicas), TAMANO_LOTE_NOMBRES):
+        bloque = unicas[inicio:inicio + TAMANO_LOTE_NOMBRES]
+        statement = (
+            sqlite_insert(modelo_cls)
+            .values(bloque)
+            .on_conflict_do_nothing(index_elements=[columna.key])
+            .returning(modelo_cls.id, columna)
+        )
+        for entidad_id, nombre in session.exec(statement).all():
+            creados[nombre] = entidad_id
+    #Los nombres que no se insertaron ya existian: se leen sus ids con una consulta 'IN' por bloque.
+    existentes = get_ids_por_nombres(session, columna, modelo_cls.id, [
+        fila[columna.key] for fila in unicas if fila[columna.key] not in creados
+    ])
+    #Incrementa la version solo si hubo cambios (invalida los ETag de las rutas GET).
+    if creados:
+        versiones.incrementar(session, entidad)
+    #Registra todos los nombres en la cache de busqueda (al confirmar la transaccion).
+    for nombre, entidad_id in {**existentes, **creados}.items():
+        cache.guardar_al_confirmar(session, cache_nombres, nombre, entidad_id)
+    #Devuelve las entidades creadas y las existentes, en el orden en que se recibieron.
+    nombres = [fila[columna.key] for fila in unicas]
+    return esquemas.ResultadoLoteEntidades(
+        creados=[esquemas.EntidadLote(id=creados[nombre], nombre=nombre) for nombre in nombres if nombre in creados],
+        existentes=[esquemas.EntidadLote(id=existentes[nombre], nombre=nombre) for nombre in nombres if nombre in existentes],
+    )
+
+#Define el servicio para crear muchos Autores.
+def create_autores_lote(session: Session, autores_create: List[esquemas.AutorCreacion]) -> esquemas.ResultadoLoteEntidades:
+    filas = [autor.model_dump() for autor in autores_create]
+    return create_entidades_lote(session, modelo.Autor, modelo.Autor.nombre, filas, cache.autores, versiones.AUTORES)
+
+#Define el servicio para crear muchas Categorias (la descripcion de las existentes no se modifica).
+def create_categorias_lote(session: Session, categorias_create: List[esquemas.CategoriaCrear]) -> esquemas.ResultadoLoteEntidades:
+    filas = [categoria.model_dump() for categoria in categorias_create]
+    return create_entidades_lote(session, modelo.Categoria, modelo.Categoria.nombre, filas, cache.categorias, versiones.CATEGORIAS)
+
+#Define el servicio para crear muchas Series.
+def create_series_lote(session: Session, series_create: List[esquemas.SerieCrear]) -> esquemas.ResultadoLoteEntidades:
+    filas = [serie.model_dump() for serie in series_create]
+    return create_entidades_lote(session, modelo.Serie, modelo.Serie.nombre, filas, cache.series, versiones.SERIES)
+
+#Define el servicio para crear muchos PublicoObjetivo.
+def create_publicos_objetivo_lote(session: Session, publicos_create: List[esquemas.PublicoObjetivoCrear]) -> esquemas.ResultadoLoteEntidades:
+    filas = [publico.model_dump() for publico in publicos_create]
+    return create_entidades_lote(session, modelo.PublicoObjetivo, modelo.PublicoObjetivo.tipo, filas, cache.publicos_objetivo, versiones.PUBLICOS)
+
+# --- Servicios de eliminacion por conjuntos (Autores, Categorias y Editoriales) ---
+
+#Numero maximo de IDs por peticion en las eliminaciones masivas.
+MAX_IDS_LOTE = 5000
+
+#Define una funcion de ayuda que borra filas por ID con 'DELETE ... WHERE id IN (...) RETURNING' (por bloques).
+#No carga objetos del ORM: los enlaces con libros los borra la BD (ON DELETE CASCADE).
+def borrar_por_ids(session: Session, modelo_cls, ids: List[int], *columnas) -> List[tuple]:
+    filas = []
+    #Borra por bloques para no rebasar el limite de parametros de SQLite.
+    for inicio in range(0, len(ids), TAMANO_LOTE_NOMBRES):
+        bloque = ids[inicio:inicio + TAMANO_LOTE_NOMBRES]
+        statement = delete(modelo_cls).where(modelo_cls.id.in_(bloque)).returning(modelo_cls.id, *columnas)
+        filas.extend(session.exec(statement).all())
+    #Devuelve una fila (id, columnas pedidas...) por cada registro que si existia.
+    return filas
+
+#Define una funcion de ayuda que deja consistentes los conteos, la version y la cache despues de borrar.
+def terminar_eliminacion(session: Session, ids: List[int], eliminados: List[int], faceta: str, entidad: str, cache_nombres: cache.CacheLRU) -> esquemas.ResultadoEliminacionLote:
+    if eliminados:
+        #Quita sus filas de los conteos por faceta (en la misma transaccion).
+        facetas.eliminar(session, faceta, eliminados)
+        #Incrementa la version de la entidad (invalida los ETag de las rutas GET, incluidas las de libros).
+        versiones.incrementar(session, entidad)
+    #Quita los nombres eliminados de la cache de busqueda.
+    for entidad_id in eliminados:
+        cache_nombres.invalidar_id(entidad_id)
+    #Devuelve los IDs borrados y los que no existian, en el orden en que se recibieron.
+    borrados = set(eliminados)
+    return esquemas.ResultadoEliminacionLote(
+        eliminados=[entidad_id for entidad_id in ids if entidad_id in borrados],
+        no_encontrados=[entidad_id for entidad_id in ids if entidad_id not in borrados],
+    )
+
+#Define el servicio para borrar Autores por ID (sus enlaces con libros se borran en cascada).
+def eliminar_autores(session: Session, ids: List[int]) -> esquemas.ResultadoEliminacionLote:
+    ids = list(dict.fromkeys(ids))
+    eliminados = [fila[0] for fila in borrar_por_ids(session, modelo.Autor, ids)]
+    return terminar_eliminacion(session, ids, eliminados, facetas.AUTORES, versiones.AUTORES, cache.autores)
+
+#Define el servicio para borrar Categorias por ID (sus enlaces con libros se borran en cascada).
+def eliminar_categorias(session: Session, ids: List[int]) -> esquemas.ResultadoEliminacionLote:
+    ids = list(dict.fromkeys(ids))
+    eliminados = [fila[0] for fila in borrar_por_ids(session, modelo.Categoria, ids)]
+    return terminar_eliminacion(session, ids, eliminados, facetas.CATEGORIAS, versiones.CATEGORIAS, cache.categorias)
+
+#Define el servicio para borrar Editoriales por ID, junto con sus direcciones.
+def eliminar_editoriales(session: Session, ids: List[int]) -> esquemas.ResultadoEliminacionLote:
+    ids = list(dict.fromkeys(ids))
+    #Los libros de esas editoriales se conservan sin editorial: un UPDATE por bloque en lugar de cargarlos
+    #(con las llaves foraneas activas, la BD no permite borrar una editorial que un libro todavia usa).
+    for inicio in range(0, len(ids), TAMANO_LOTE_NOMBRES):
+        bloque = ids[inicio:inicio + TAMANO_LOTE_NOMBRES]
+        session.exec(update(modelo.Libro).where(modelo.Libro.editorial_id.in_(bloque)).values(editorial_id=None))
+    #Borra las editoriales y recupera sus direcciones en la misma sentencia.
+    filas = borrar_por_ids(session, modelo.Editorial, ids, modelo.Editorial.direccion_id)
+    #Borra las direcciones (cada una pertenece a una sola editorial).
+    borrar_por_ids(session, modelo.Direccion, [direccion_id for _, direccion_id in filas])
+    eliminados = [editorial_id for editorial_id, _ in filas]
+    return terminar_eliminacion(session, ids, eliminados, facetas.EDITORIALES, versiones.EDITORIALES, cache.editoriales)
+
+
 # --- Servicio create_libro (ACTUALIZADO) ---
 
 #Define el servicio para crear un Libro (logica compleja de relaciones).
@@ -277,158 +504,655 @@ def create_libro(session: Session, libro_create: esquemas.LibroCreacion) -> mode
     # 2. Asignar Editorial por NOMBRE
     #Si se proporciono un nombre de editorial.
     if libro_create.editorial_nombre:
-        #Usa la funcion de ayuda para buscar la editorial por su nombre.
-        editorial = get_editorial_por_nombre(session, libro_create.editorial_nombre)
+        #Usa la funcion de ayuda para buscar el id de la editorial por su nombre (sin SELECT si esta en cache).
+        db_libro.editorial_id = get_editorial_id_por_nombre(session, libro_create.editorial_nombre)
         #Si la editorial no se encuentra.
-        if not editorial:
+        if db_libro.editorial_id is None:
             #Lanza un error 404.
             raise HTTPException(status_code=404, detail=f"Editorial '{libro_create.editorial_nombre}' no encontrada")
-        #Asigna el objeto 'editorial' completo a la relacion del libro.
-        db_libro.editorial = editorial # Asignamos el objeto, no el ID
 
     # 3. Asignar Publico Objetivo por TIPO
     #Si se proporciono un tipo de publico.
     if libro_create.publico_objetivo_tipo:
-        #Usa la funcion de ayuda para buscar el publico por su tipo.
-        publico = get_publico_objetivo_por_tipo(session, libro_create.publico_objetivo_tipo)
+        #Usa la funcion de ayuda para buscar el id del publico por su tipo.
+        db_libro.publico_objetivo_id = get_publico_objetivo_id_por_tipo(session, libro_create.publico_objetivo_tipo)
         #Si no se encuentra.
-        if not publico:
+        if db_libro.publico_objetivo_id is None:
             #Lanza un error 404.
             raise HTTPException(status_code=404, detail=f"Público '{libro_create.publico_objetivo_tipo}' no encontrado")
-        #Asigna el objeto 'publico' completo a la relacion del libro.
-        db_libro.publico_objetivo = publico
 
     # 4. Asignar Serie por NOMBRE
     #Si se proporciono un nombre de serie.
     if libro_create.serie_nombre:
-        #Usa la funcion de ayuda para buscar la serie por su nombre.
-        serie = get_serie_por_nombre(session, libro_create.serie_nombre)
+        #Usa la funcion de ayuda para buscar el id de la serie por su nombre.
+        db_libro.serie_id = get_serie_id_por_nombre(session, libro_create.serie_nombre)
         #Si no se encuentra.
-        if not serie:
+        if db_libro.serie_id is None:
             #Lanza un error 404.
             raise HTTPException(status_code=404, detail=f"Serie '{libro_create.serie_nombre}' no encontrada")
-        #Asigna el objeto 'serie' completo a la relacion del libro.
-        db_libro.serie = serie
 
-    # 5. Asignar Autores por NOMBRE
+    # 5. Resolver Autores por NOMBRE
+    #Guarda los ids de los autores (sin repetidos, para no violar la clave primaria de la tabla de enlace).
+    autores_ids: Dict[int, None] = {}
     #Itera sobre la lista de nombres de autores proporcionada.
     for autor_nombre in libro_create.autores_nombres:
-        #Usa la funcion de ayuda para buscar cada autor por su nombre.
-        autor = get_autor_por_nombre(session, autor_nombre)
+        #Usa la funcion de ayuda para buscar el id de cada autor por su nombre.
+        autor_id = get_autor_id_por_nombre(session, autor_nombre)
         #Si el autor no se encuentra.
-        if not autor:
+        if autor_id is None:
             #Lanza un error 404.
             raise HTTPException(status_code=404, detail=f"Autor '{autor_nombre}' no encontrado")
-        #Anade el objeto 'autor' encontrado a la lista 'autores' del libro (M2M).
-        db_libro.autores.append(autor)
-            
-    # 6. Asignar Categorías por NOMBRE
+        autores_ids[autor_id] = None
+
+    # 6. Resolver Categorías por NOMBRE
+    #Guarda los ids de las categorias (sin repetidos).
+    categorias_ids: Dict[int, None] = {}
     #Itera sobre la lista de nombres de categorias proporcionada.
     for categoria_nombre in libro_create.categorias_nombres:
-        #Usa la funcion de ayuda para buscar cada categoria por su nombre.
-        categoria = get_categoria_por_nombre(session, categoria_nombre)
+        #Usa la funcion de ayuda para buscar el id de cada categoria por su nombre.
+        categoria_id = get_categoria_id_por_nombre(session, categoria_nombre)
         #Si la categoria no se encuentra.
-        if not categoria:
+        if categoria_id is None:
             #Lanza un error 404.
             raise HTTPException(status_code=404, detail=f"Categoría '{categoria_nombre}' no encontrada")
-        #Anade el objeto 'categoria' encontrado a la lista 'categorias' del libro (M2M).
-        db_libro.categorias.append(categoria)
-            
+        categorias_ids[categoria_id] = None
+
     # 7. Guardar en la BD
-    #Anade el objeto 'db_libro' (con todas sus relaciones) a la sesion.
+    #Anade el objeto 'db_libro' (solo con las llaves foraneas, sin objetos relacionados) a la sesion.
     session.add(db_libro)
-    #Guarda los cambios (SQLModel/SQLAlchemy se encarga de las tablas de enlace).
-    session.commit()
-    #Refresca el objeto para obtener su ID.
-    session.refresh(db_libro)
-    #Devuelve el libro recien creado.
-    return db_libro
+    #Incrementa la version de la entidad (invalida los ETag de las rutas GET).
+    versiones.incrementar(session, versiones.LIBROS)
+    try:
+        #Envia el INSERT del libro (el ID queda en el objeto sin un SELECT extra).
+        session.flush()
+        #Inserta los enlaces por id con 'executemany' (una sentencia por tabla).
+        if autores_ids:
+            session.exec(insert(modelo.LibroAutorLink), params=[
+                {"libro_id": db_libro.id, "autor_id": autor_id} for autor_id in autores_ids])
+        if categorias_ids:
+            session.exec(insert(modelo.LibroCategoriaLink), params=[
+                {"libro_id": db_libro.id, "categoria_id": categoria_id} for categoria_id in categorias_ids])
+    except IntegrityError as error:
+        detalle = detalle_error_libro(error, db_libro.isbn)
+        if detalle is None:
+            raise
+        #Si otra peticion borro una entidad despues de que se comprobo su id, se olvidan los nombres usados (el
+        #siguiente intento los busca en la BD). En ambos casos la unidad de trabajo deshace la transaccion.
+        if "FOREIGN KEY" in str(error.orig):
+            invalidar_nombres_libro(libro_create)
+        raise HTTPException(status_code=409, detail=detalle)
+    #Suma el libro a los conteos por faceta (en la misma transaccion).
+    facetas.sumar(session, facetas.contar_libro(
+        Counter(), db_libro.editorial_id, db_libro.publico_objetivo_id, db_libro.serie_id, autores_ids, categorias_ids,
+    ))
+    #Carga el libro con sus relaciones para la respuesta en una consulta por lista (como 'get_libro_por_isbn').
+    statement = (
+        select(modelo.Libro).where(modelo.Libro.id == db_libro.id)
+        .options(*opciones_libro_completo()).execution_options(populate_existing=True)
+    )
+    #Devuelve el libro recien creado. El COMMIT lo hace la unidad de trabajo.
+    return session.exec(statement).one()
+
+#Define una funcion de ayuda que traduce el error de integridad al guardar un libro a un mensaje para el cliente
+#(sin el texto de SQLite). Devuelve None si no es un error conocido.
+def detalle_error_libro(error: IntegrityError, isbn: Optional[str]) -> Optional[str]:
+    mensaje = str(error.orig)
+    if "UNIQUE" in mensaje and "libro.isbn" in mensaje:
+        return f"El ISBN '{isbn}' ya existe"
+    if "FOREIGN KEY" in mensaje:
+        return "Una entidad relacionada con el libro ya no existe; intente de nuevo"
+    return None
+
+#Define una funcion de ayuda que quita de las caches los nombres que uso un libro.
+def invalidar_nombres_libro(libro_create: esquemas.LibroCreacion) -> None:
+    for cache_nombres, nombre in (
+        (cache.editoriales, libro_create.editorial_nombre),
+        (cache.publicos_objetivo, libro_create.publico_objetivo_tipo),
+        (cache.series, libro_create.serie_nombre),
+    ):
+        if nombre:
+            cache_nombres.invalidar(nombre)
+    for nombre in libro_create.autores_nombres:
+        cache.autores.invalidar(nombre)
+    for nombre in libro_create.categorias_nombres:
+        cache.categorias.invalidar(nombre)
+
+# --- Servicio de carga masiva de Libros ---
+
+#Numero de libros que se insertan por sentencia (cada bloque con su propio SAVEPOINT) en la carga masiva.
+TAMANO_LOTE_LIBROS = 500
+#Numero maximo de valores por cada consulta 'IN (...)' (SQLite limita los parametros por sentencia).
+TAMANO_LOTE_NOMBRES = 500
+
+#Define una funcion de ayuda que resuelve muchos nombres a IDs con consultas 'IN (...)'.
+def get_ids_por_nombres(session: Session, columna_nombre, columna_id, nombres) -> Dict[str, int]:
+    #Quita repetidos y valores vacios.
+    pendientes = sorted({nombre for nombre in nombres if nombre})
+    #Diccionario nombre -> id con lo que se encuentre en la BD.
+    ids: Dict[str, int] = {}
+    #Consulta los nombres por bloques para no rebasar el limite de parametros de SQLite.
+    for inicio in range(0, len(pendientes), TAMANO_LOTE_NOMBRES):
+        bloque = pendientes[inicio:inicio + TAMANO_LOTE_NOMBRES]
+        #Selecciona solo (nombre, id); no hace falta construir objetos del ORM.
+        statement = select(columna_nombre, columna_id).where(columna_nombre.in_(bloque))
+        for nombre, id_ in session.exec(statement).all():
+            #Si hay nombres repetidos en la BD, conserva el primero (igual que '.first()').
+            ids.setdefault(nombre, id_)
+    #Devuelve el diccionario de nombres encontrados.
+    return ids
+
+#Numero maximo de libros por peticion en la carga masiva (el cuerpo completo se valida en memoria).
+MAX_LIBROS_LOTE = 5000
+
+#Define el servicio para crear muchos libros en una sola peticion.
+def create_libros_lote(session: Session, libros_create: List[esquemas.LibroCreacion]) -> esquemas.ResultadoLoteLibros:
+    # 1. Resolver TODOS los nombres referenciados (una consulta IN por tipo de entidad)
+    editoriales = get_ids_por_nombres(
+        session, modelo.Editorial.nombre, modelo.Editorial.id,
+        [libro.editorial_nombre for libro in libros_create])
+    publicos = get_ids_por_nombres(
+        session, modelo.PublicoObjetivo.tipo, modelo.PublicoObjetivo.id,
+        [libro.publico_objetivo_tipo for libro in libros_create])
+    series = get_ids_por_nombres(
+        session, modelo.Serie.nombre, modelo.Serie.id,
+        [libro.serie_nombre for libro in libros_create])
+    autores = get_ids_por_nombres(
+        session, modelo.Autor.nombre, modelo.Autor.id,
+        [nombre for libro in libros_create for nombre in libro.autores_nombres])
+    categorias = get_ids_por_nombres(
+        session, modelo.Categoria.nombre, modelo.Categoria.id,
+        [nombre for libro in libros_create for nombre in libro.categorias_nombres])
+    #Busca que ISBNs enviados ya existen en la BD (tambien con IN).
+    isbns_existentes = set(get_ids_por_nombres(
+        session, modelo.Libro.isbn, modelo.Libro.id,
+        [libro.isbn for libro in libros_create]))
+
+    # 2. Validar cada libro y preparar sus filas (sin tocar la BD)
+    errores: List[esquemas.ErrorLoteLibro] = []
+    #Lista de (indice, fila del libro, ids de autores, ids de categorias) listos para insertar.
+    validos = []
+    #ISBNs ya usados dentro de este mismo lote.
+    isbns_lote = set()
+    for indice, libro_create in enumerate(libros_create):
+        #Acumula el primer problema encontrado para este libro.
+        detalle = None
+        if libro_create.editorial_nombre and libro_create.editorial_nombre not in editoriales:
+            detalle = f"Editorial '{libro_create.editorial_nombre}' no encontrada"
+        elif libro_create.publico_objetivo_tipo and libro_create.publico_objetivo_tipo not in publicos:
+            detalle = f"Público '{libro_create.publico_objetivo_tipo}' no encontrado"
+        elif libro_create.serie_nombre and libro_create.serie_nombre not in series:
+            detalle = f"Serie '{libro_create.serie_nombre}' no encontrada"
+        else:
+            #Busca el primer autor o categoria que no exista.
+            faltante_autor = next((n for n in libro_create.autores_nombres if n not in autores), None)
+            faltante_categoria = next((n for n in libro_create.categorias_nombres if n not in categorias), None)
+            if faltante_autor is not None:
+                detalle = f"Autor '{faltante_autor}' no encontrado"
+            elif faltante_categoria is not None:
+                detalle = f"Categoría '{faltante_categoria}' no encontrada"
+            elif libro_create.isbn and (libro_create.isbn in isbns_existentes or libro_create.isbn in isbns_lote):
+                detalle = f"El ISBN '{libro_create.isbn}' ya existe"
+        #Si hubo un problema, se reporta y se continua con el siguiente libro.
+        if detalle:
+            errores.append(esquemas.ErrorLoteLibro(indice=indice, isbn=libro_create.isbn, detalle=detalle))
+            continue
+
+        #Convierte el libro a la fila de la tabla 'libro' (mismos campos que en 'create_libro').
+        fila = libro_create.model_dump(exclude={
+            "autores_nombres", "categorias_nombres",
+            "editorial_nombre", "publico_objetivo_tipo", "serie_nombre"
+        })
+        #Genera el ISBN por defecto (como lo hace el modelo) si no se envio.
+        fila["isbn"] = fila["isbn"] or str(uuid.uuid4())
+        isbns_lote.add(fila["isbn"])
+        fila["editorial_id"] = editoriales.get(libro_create.editorial_nombre)
+        fila["publico_objetivo_id"] = publicos.get(libro_create.publico_objetivo_tipo)
+        fila["serie_id"] = series.get(libro_create.serie_nombre)
+        #Quita nombres repetidos para no violar la clave primaria de las tablas de enlace.
+        ids_autores = list(dict.fromkeys(autores[n] for n in libro_create.autores_nombres))
+        ids_categorias = list(dict.fromkeys(categorias[n] for n in libro_create.categorias_nombres))
+        validos.append((indice, fila, ids_autores, ids_categorias))
+
+    # 3. Insertar por bloques, un SAVEPOINT por bloque dentro de la transaccion de la peticion
+    ids: Dict[int, int] = {}
+    if validos:
+        #Incrementa la version de la entidad (invalida los ETag de las rutas GET). Al ser la primera escritura,
+        #tambien abre la transaccion de la peticion, asi los SAVEPOINT quedan anidados dentro de ella.
+        versiones.incrementar(session, versiones.LIBROS)
+    for inicio in range(0, len(validos), TAMANO_LOTE_LIBROS):
+        bloque = validos[inicio:inicio + TAMANO_LOTE_LIBROS]
+        try:
+            with session.begin_nested():
+                ids.update(insertar_bloque_libros(session, bloque))
+        except IntegrityError:
+            #Si el bloque falla completo, se deshace hasta su SAVEPOINT y se reintenta libro por libro para aislar el error.
+            for elemento in bloque:
+                try:
+                    with session.begin_nested():
+                        ids.update(insertar_bloque_libros(session, [elemento]))
+                except IntegrityError as error:
+                    #El mismo mensaje que la creacion de un solo libro (nunca el texto de SQLite).
+                    detalle = detalle_error_libro(error, elemento[1]["isbn"]) or "El libro no cumple las restricciones de la base de datos"
+                    errores.append(esquemas.ErrorLoteLibro(indice=elemento[0], isbn=elemento[1]["isbn"], detalle=detalle))
+
+    #Ordena los errores segun la posicion del libro en la peticion.
+    errores.sort(key=lambda error: error.indice)
+    #Devuelve el resumen de la carga.
+    return esquemas.ResultadoLoteLibros(
+        creados=len(ids), ids=[ids[indice] for indice in sorted(ids)], errores=errores)
+
+#Define una funcion de ayuda que inserta un bloque de libros y sus enlaces (sin confirmar).
+def insertar_bloque_libros(session: Session, bloque) -> Dict[int, int]:
+    #Inserta todos los libros del bloque con una sola sentencia y recupera sus IDs en el mismo orden.
+    statement = insert(modelo.Libro).returning(modelo.Libro.id, sort_by_parameter_order=True)
+    nuevos_ids = session.exec(statement, params=[fila for _, fila, _, _ in bloque]).scalars().all()
+    #Prepara las filas de las tablas de enlace con los IDs recien generados.
+    enlaces_autores = []
+    enlaces_categorias = []
+    for (_, _, ids_autores, ids_categorias), libro_id in zip(bloque, nuevos_ids):
+        enlaces_autores.extend({"libro_id": libro_id, "autor_id": autor_id} for autor_id in ids_autores)
+        enlaces_categorias.extend({"libro_id": libro_id, "categoria_id": categoria_id} for categoria_id in ids_categorias)
+    #Inserta los enlaces con 'executemany' (una sentencia por tabla).
+    if enlaces_autores:
+        session.exec(insert(modelo.LibroAutorLink), params=enlaces_autores)
+    if enlaces_categorias:
+        session.exec(insert(modelo.LibroCategoriaLink), params=enlaces_categorias)
+    #Suma los libros del bloque a los conteos por faceta (una sola sentencia para todo el bloque).
+    conteos = Counter()
+    for _, fila, ids_autores, ids_categorias in bloque:
+        facetas.contar_libro(
+            conteos, fila["editorial_id"], fila["publico_objetivo_id"], fila["serie_id"], ids_autores, ids_categorias
+        )
+    facetas.sumar(session, conteos)
+    #Devuelve el diccionario indice -> id del libro creado.
+    return {indice: libro_id for (indice, _, _, _), libro_id in zip(bloque, nuevos_ids)}
 
 # --- Servicios "Get Libros" ---
 
-#Define el servicio para obtener una lista paginada de todos los Libros.
-def get_libros_todos(session: Session, skip: int = 0, limit: int = 10) -> List[modelo.Libro]:
-    #Crea una consulta seleccionando Libro, aplicando 'offset' y 'limit'.
-    statement = select(modelo.Libro).offset(skip).limit(limit)
-    #Ejecuta la consulta y devuelve todos los resultados.
-    return session.exec(statement).all()
+#Define las opciones de carga para devolver un 'LibroLeerCompleto' sin consultas "N+1".
+#Las relaciones muchos-a-uno viajan en el mismo SELECT (JOIN) y las listas en un SELECT ... IN por relacion,
+#asi el numero de consultas por pagina es fijo sin importar cuantos libros se devuelvan.
+def opciones_libro_completo():
+    return (
+        #Carga la editorial y su direccion en la misma consulta del libro.
+        joinedload(modelo.Libro.editorial).joinedload(modelo.Editorial.direccion),
+        #Carga el publico objetivo en la misma consulta.
+        joinedload(modelo.Libro.publico_objetivo),
+        #Carga la serie en la misma consulta.
+        joinedload(modelo.Libro.serie),
+        #Carga los autores de toda la pagina con una sola consulta adicional.
+        selectinload(modelo.Libro.autores),
+        #Carga las categorias de toda la pagina con una sola consulta adicional.
+        selectinload(modelo.Libro.categorias),
+    )
 
-#Define el servicio para obtener libros filtrados por autor (con JOIN).
-def get_libros_por_autor(session: Session, nombre_autor: str, skip: int = 0, limit: int = 10) -> List[modelo.Libro]:
-    #Crea una consulta compleja con JOINs.
-    statement = (
-        #Selecciona 'Libro'
-        select(modelo.Libro)
+#Define las opciones de carga para una proyeccion ('?fields=' / '?expand='); sin proyeccion, el libro completo.
+#Solo se seleccionan las columnas pedidas y solo se agregan los JOIN y SELECT ... IN de las relaciones pedidas.
+#'requeridas' son columnas que el propio servicio necesita leer aunque el cliente no las haya pedido.
+def opciones_libro(proyeccion: Optional[Proyeccion] = None, requeridas: Sequence[str] = ()):
+    if proyeccion is None:
+        return opciones_libro_completo()
+    #Cargas por relacion (las mismas estrategias que 'opciones_libro_completo').
+    cargas = {
+        "editorial": joinedload(modelo.Libro.editorial).joinedload(modelo.Editorial.direccion),
+        "publico_objetivo": joinedload(modelo.Libro.publico_objetivo),
+        "serie": joinedload(modelo.Libro.serie),
+        "autores": selectinload(modelo.Libro.autores),
+        "categorias": selectinload(modelo.Libro.categorias),
+    }
+    return (
+        #Selecciona solo las columnas pedidas; leer otra columna lanza un error en vez de hacer otra consulta.
+        load_only(*(getattr(modelo.Libro, campo) for campo in (*proyeccion.campos, *requeridas)), raiseload=True),
+        #Agrega solo las relaciones pedidas.
+        *(cargas[relacion] for relacion in proyeccion.relaciones),
+        #Las relaciones no pedidas tampoco se cargan de forma perezosa.
+        raiseload("*"),
+    )
+
+# --- Filtros de libros (reutilizados por los servicios 'get_libros_por_*' y 'filtrar_libros') ---
+
+#Agrega a la consulta el filtro por nombre de autor (JOIN con la tabla de enlace).
+def filtro_autor(statement, nombre_autor: str):
+    return (
+        statement
         #Une con la tabla de enlace 'LibroAutorLink'.
-        .join(modelo.LibroAutorLink)
+        .join(modelo.LibroAutorLink, modelo.LibroAutorLink.libro_id == modelo.Libro.id)
         #Une con la tabla 'Autor'.
-        .join(modelo.Autor)
+        .join(modelo.Autor, modelo.Autor.id == modelo.LibroAutorLink.autor_id)
         #Filtra donde el nombre del Autor coincida.
         .where(modelo.Autor.nombre == nombre_autor)
-        #Aplica paginacion.
-        .offset(skip).limit(limit)
     )
-    #Ejecuta la consulta y devuelve todos los resultados.
-    return session.exec(statement).all()
 
-#Define el servicio para obtener libros filtrados por categoria (con JOIN).
-def get_libros_por_categoria(session: Session, genero: str, skip: int = 0, limit: int = 10) -> List[modelo.Libro]:
-    #Crea una consulta compleja con JOINs.
-    statement = (
-        #Selecciona 'Libro'
-        select(modelo.Libro)
+#Agrega a la consulta el filtro por nombre de categoria (JOIN con la tabla de enlace).
+def filtro_categoria(statement, genero: str):
+    return (
+        statement
         #Une con la tabla de enlace 'LibroCategoriaLink'.
-        .join(modelo.LibroCategoriaLink)
+        .join(modelo.LibroCategoriaLink, modelo.LibroCategoriaLink.libro_id == modelo.Libro.id)
         #Une con la tabla 'Categoria'.
-        .join(modelo.Categoria)
-        #Filtra donde el nombre de la Categoria coincida (variable 'genero').
+        .join(modelo.Categoria, modelo.Categoria.id == modelo.LibroCategoriaLink.categoria_id)
+        #Filtra donde el nombre de la Categoria coincida.
         .where(modelo.Categoria.nombre == genero)
-        #Aplica paginacion.
-        .offset(skip).limit(limit)
     )
+
+#Agrega a la consulta el filtro por nombre de serie (JOIN por la FK 'serie_id').
+def filtro_serie(statement, nombre_serie: str):
+    return (
+        statement
+        .join(modelo.Serie, modelo.Serie.id == modelo.Libro.serie_id)
+        .where(modelo.Serie.nombre == nombre_serie)
+    )
+
+#Agrega a la consulta el filtro por tipo de publico (JOIN por la FK 'publico_objetivo_id').
+def filtro_publico(statement, tipo_publico: str):
+    return (
+        statement
+        .join(modelo.PublicoObjetivo, modelo.PublicoObjetivo.id == modelo.Libro.publico_objetivo_id)
+        .where(modelo.PublicoObjetivo.tipo == tipo_publico)
+    )
+
+#Agrega a la consulta el filtro por nombre de editorial (JOIN por la FK 'editorial_id').
+def filtro_editorial(statement, nombre_editorial: str):
+    return (
+        statement
+        .join(modelo.Editorial, modelo.Editorial.id == modelo.Libro.editorial_id)
+        .where(modelo.Editorial.nombre == nombre_editorial)
+    )
+
+#Agrega a la consulta todos los filtros que vengan definidos en 'filtros'.
+def aplicar_filtros(statement, filtros: esquemas.FiltrosLibro):
+    #Filtros por relaciones (cada uno agrega su JOIN solo si se pidio).
+    if filtros.autor:
+        statement = filtro_autor(statement, filtros.autor)
+    if filtros.categoria:
+        statement = filtro_categoria(statement, filtros.categoria)
+    if filtros.serie:
+        statement = filtro_serie(statement, filtros.serie)
+    if filtros.publico:
+        statement = filtro_publico(statement, filtros.publico)
+    if filtros.editorial:
+        statement = filtro_editorial(statement, filtros.editorial)
+    #Filtros sobre columnas del propio libro.
+    if filtros.formato:
+        statement = statement.where(modelo.Libro.formato == filtros.formato)
+    if filtros.precio_min is not None:
+        statement = statement.where(modelo.Libro.precio >= filtros.precio_min)
+    if filtros.precio_max is not None:
+        statement = statement.where(modelo.Libro.precio <= filtros.precio_max)
+    if filtros.ano_min is not None:
+        statement = statement.where(modelo.Libro.ano_publicacion >= filtros.ano_min)
+    if filtros.ano_max is not None:
+        statement = statement.where(modelo.Libro.ano_publicacion <= filtros.ano_max)
+    return statement
+
+#Define el servicio para obtener una lista paginada de todos los Libros.
+def get_libros_todos(session: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, proyeccion: Optional[Proyeccion] = None) -> List[modelo.Libro]:
+    #Crea una consulta seleccionando Libro (con sus relaciones).
+    statement = select(modelo.Libro).options(*opciones_libro(proyeccion))
+    #Aplica la paginacion por cursor (o por 'offset' si no se envio cursor).
+    statement = paginar(statement, modelo.Libro.id, skip, limit, cursor)
+    #Ejecuta la consulta y devuelve todos los resultados.
+    return session.exec(statement).all()
+
+#Define el servicio para obtener libros filtrados por autor (con JOIN).
+def get_libros_por_autor(session: Session, nombre_autor: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, proyeccion: Optional[Proyeccion] = None) -> List[modelo.Libro]:
+    #Selecciona 'Libro' con sus relaciones y aplica el filtro (JOIN).
+    statement = filtro_autor(select(modelo.Libro), nombre_autor).options(*opciones_libro(proyeccion))
+    #Aplica la paginacion por cursor (o por 'offset' si no se envio cursor).
+    statement = paginar(statement, modelo.Libro.id, skip, limit, cursor)
+    #Ejecuta la consulta y devuelve todos los resultados.
+    return session.exec(statement).all()
+
+#Define el servicio para obtener libros filtrados por categoria (con JOIN).
+def get_libros_por_categoria(session: Session, genero: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, proyeccion: Optional[Proyeccion] = None) -> List[modelo.Libro]:
+    #Selecciona 'Libro' con sus relaciones y aplica el filtro (JOIN).
+    statement = filtro_categoria(select(modelo.Libro), genero).options(*opciones_libro(proyeccion))
+    #Aplica la paginacion por cursor (o por 'offset' si no se envio cursor).
+    statement = paginar(statement, modelo.Libro.id, skip, limit, cursor)
     #Ejecuta la consulta y devuelve todos los resultados.
     return session.exec(statement).all()
 
 #Define el servicio para obtener libros filtrados por serie (con JOIN).
-def get_libros_por_serie(session: Session, nombre_serie: str, skip: int = 0, limit: int = 10) -> List[modelo.Libro]:
-    #Crea una consulta con JOIN (SQLModel infiere el JOIN simple).
-    statement = (
-        #Selecciona 'Libro'
-        select(modelo.Libro)
-        #Une con la tabla 'Serie' (usando la FK 'serie_id').
-        .join(modelo.Serie)
-        #Filtra donde el nombre de la Serie coincida.
-        .where(modelo.Serie.nombre == nombre_serie)
-        #Aplica paginacion.
-        .offset(skip).limit(limit)
-    )
+def get_libros_por_serie(session: Session, nombre_serie: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, proyeccion: Optional[Proyeccion] = None) -> List[modelo.Libro]:
+    #Selecciona 'Libro' con sus relaciones y aplica el filtro (JOIN).
+    statement = filtro_serie(select(modelo.Libro), nombre_serie).options(*opciones_libro(proyeccion))
+    #Aplica la paginacion por cursor (o por 'offset' si no se envio cursor).
+    statement = paginar(statement, modelo.Libro.id, skip, limit, cursor)
     #Ejecuta la consulta y devuelve todos los resultados.
     return session.exec(statement).all()
 
 #Define el servicio para obtener libros filtrados por publico (con JOIN).
-def get_libros_por_publico(session: Session, tipo_publico: str, skip: int = 0, limit: int = 10) -> List[modelo.Libro]:
-    #Crea una consulta con JOIN.
-    statement = (
-        #Selecciona 'Libro'
-        select(modelo.Libro)
-        #Une con la tabla 'PublicoObjetivo' (usando la FK).
-        .join(modelo.PublicoObjetivo)
-        #Filtra donde el tipo de PublicoObjetivo coincida.
-        .where(modelo.PublicoObjetivo.tipo == tipo_publico)
-        #Aplica paginacion.
-        .offset(skip).limit(limit)
-    )
+def get_libros_por_publico(session: Session, tipo_publico: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, proyeccion: Optional[Proyeccion] = None) -> List[modelo.Libro]:
+    #Selecciona 'Libro' con sus relaciones y aplica el filtro (JOIN).
+    statement = filtro_publico(select(modelo.Libro), tipo_publico).options(*opciones_libro(proyeccion))
+    #Aplica la paginacion por cursor (o por 'offset' si no se envio cursor).
+    statement = paginar(statement, modelo.Libro.id, skip, limit, cursor)
     #Ejecuta la consulta y devuelve todos los resultados.
     return session.exec(statement).all()
 
+#Define el servicio que combina varios filtros (autor, categoria, serie, publico, editorial, precio, ano, formato) en una sola consulta.
+def filtrar_libros(session: Session, filtros: esquemas.FiltrosLibro, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, proyeccion: Optional[Proyeccion] = None) -> List[modelo.Libro]:
+    #Selecciona 'Libro' con sus relaciones y aplica todos los filtros recibidos.
+    statement = aplicar_filtros(select(modelo.Libro), filtros).options(*opciones_libro(proyeccion))
+    #Aplica la paginacion por cursor (o por 'offset'); el orden por id hace que el resultado sea estable.
+    statement = paginar(statement, modelo.Libro.id, skip, limit, cursor)
+    #Ejecuta la consulta y devuelve todos los resultados.
+    return session.exec(statement).all()
+
+# --- Servicio de conteos por faceta ---
+
+#Define una funcion de ayuda que describe cada faceta: (nombre, modelo, columna con el nombre visible).
+def definicion_facetas():
+    return [
+        (facetas.CATEGORIAS, modelo.Categoria, modelo.Categoria.nombre),
+        (facetas.AUTORES, modelo.Autor, modelo.Autor.nombre),
+        (facetas.EDITORIALES, modelo.Editorial, modelo.Editorial.nombre),
+        (facetas.SERIES, modelo.Serie, modelo.Serie.nombre),
+        (facetas.PUBLICOS, modelo.PublicoObjetivo, modelo.PublicoObjetivo.tipo),
+    ]
+
+#Define una funcion de ayuda que arma la consulta (id, total) de una faceta sobre un conjunto de libros filtrado.
+def consulta_faceta_filtrada(faceta: str, libros_ids):
+    #Las facetas muchos-a-muchos se cuentan en su tabla de enlace.
+    if faceta == facetas.AUTORES:
+        columna = modelo.LibroAutorLink.autor_id
+        return select(columna, func.count()).where(modelo.LibroAutorLink.libro_id.in_(libros_ids)).group_by(columna)
+    if faceta == facetas.CATEGORIAS:
+        columna = modelo.LibroCategoriaLink.categoria_id
+        return select(columna, func.count()).where(modelo.LibroCategoriaLink.libro_id.in_(libros_ids)).group_by(columna)
+    #Las facetas uno-a-muchos se cuentan en la llave foranea del libro.
+    columna = {
+        facetas.EDITORIALES: modelo.Libro.editorial_id,
+        facetas.SERIES: modelo.Libro.serie_id,
+        facetas.PUBLICOS: modelo.Libro.publico_objetivo_id,
+    }[faceta]
+    return (
+        select(columna, func.count())
+        .where(modelo.Libro.id.in_(libros_ids), columna.is_not(None))
+        .group_by(columna)
+    )
+
+#Define el servicio que devuelve cuantos libros hay por categoria, autor, editorial, serie y publico.
+def get_facetas(session: Session, filtros: esquemas.FiltrosLibro, limite: int = 50) -> esquemas.Facetas:
+    #Sin filtros se leen los conteos ya calculados (no se recorre el catalogo).
+    filtrado = any(valor is not None for valor in filtros.model_dump().values())
+    #Subconsulta con los ids de los libros que cumplen los filtros.
+    libros_ids = aplicar_filtros(select(modelo.Libro.id), filtros).scalar_subquery() if filtrado else None
+    resultado = {}
+    for faceta, modelo_cls, columna_nombre in definicion_facetas():
+        if filtrado:
+            conteos = consulta_faceta_filtrada(faceta, libros_ids).subquery()
+            id_conteo, total = conteos.c[0], conteos.c[1]
+        else:
+            conteos = select(modelo.ConteoFaceta).where(
+                modelo.ConteoFaceta.faceta == faceta, modelo.ConteoFaceta.total > 0
+            ).subquery()
+            id_conteo, total = conteos.c.entidad_id, conteos.c.total
+        #Une los conteos con la entidad para obtener su nombre; de mayor a menor y con desempate por id.
+        statement = (
+            select(modelo_cls.id, columna_nombre, total)
+            .join(conteos, id_conteo == modelo_cls.id)
+            .order_by(total.desc(), modelo_cls.id)
+            .limit(limite)
+        )
+        resultado[faceta] = [
+            esquemas.Faceta(id=entidad_id, nombre=nombre, total=cantidad)
+            for entidad_id, nombre, cantidad in session.exec(statement).all()
+        ]
+    return esquemas.Facetas(**resultado)
+
+# --- Servicio de busqueda por titulo (FTS5) ---
+
+#Define una funcion de ayuda que convierte el texto del usuario en una consulta FTS5 segura.
+def consulta_fts(q: str) -> str:
+    #Cada palabra va entre comillas (se escapan las comillas internas) para que no se interprete como sintaxis FTS5.
+    #Las palabras se combinan con AND implicito.
+    return " ".join('"' + palabra.replace('"', '""') + '"' for palabra in q.split())
+
+#Define el servicio que busca libros por titulo, ordenados por relevancia (BM25) y paginados por cursor.
+def buscar_libros(session: Session, q: str, limit: int = 10, cursor: Optional[str] = None, proyeccion: Optional[Proyeccion] = None):
+    #Si la busqueda no tiene palabras, no hay resultados.
+    consulta = consulta_fts(q)
+    if not consulta:
+        return [], None
+    #Parametros de la consulta; se pide un elemento extra para saber si hay otra pagina.
+    parametros = {"q": consulta, "limit": limit + 1}
+    #Filtro de keyset sobre (rango, id): continua justo despues del ultimo resultado visto.
+    filtro = ""
+    if cursor:
+        parametros["rango"], parametros["ultimo_id"] = decodificar_cursor_rango(cursor)
+        filtro = "WHERE rango > :rango OR (rango = :rango AND id > :ultimo_id)"
+    #Consulta la tabla FTS5; bm25() es menor mientras mas relevante es el resultado.
+    statement = text(f"""
+        SELECT id, rango FROM (
+            SELECT rowid AS id, bm25(libro_fts) AS rango
+            FROM libro_fts WHERE libro_fts MATCH :q
+        )
+        {filtro}
+        ORDER BY rango, id
+        LIMIT :limit
+    """)
+    filas = session.connection().execute(statement, parametros).all()
+    #Calcula el cursor de la siguiente pagina si sobro un elemento.
+    siguiente = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        siguiente = codificar_cursor_rango(filas[-1].rango, filas[-1].id)
+    #Carga los libros de la pagina (con sus relaciones por lotes) en una sola consulta.
+    ids = [fila.id for fila in filas]
+    statement_libros = select(modelo.Libro).where(modelo.Libro.id.in_(ids)).options(*opciones_libro(proyeccion))
+    libros = {libro.id: libro for libro in session.exec(statement_libros).all()}
+    #Devuelve los libros en el orden de relevancia y el cursor siguiente.
+    return [libros[id_] for id_ in ids if id_ in libros], siguiente
+
 # (Añade esto en Servicios/servicios.py)
 
 #Define el servicio para obtener un Libro por su ISBN.
-def get_libro_por_isbn(session: Session, isbn: str) -> Optional[modelo.Libro]:
+def get_libro_por_isbn(session: Session, isbn: str, proyeccion: Optional[Proyeccion] = None) -> Optional[modelo.Libro]:
     """Busca un libro por su ISBN."""
     #Crea una consulta para seleccionar un Libro donde el ISBN coincida.
-    statement = select(modelo.Libro).where(modelo.Libro.isbn == isbn)
+    statement = select(modelo.Libro).where(modelo.Libro.isbn == isbn).options(*opciones_libro(proyeccion))
     #Ejecuta la consulta y devuelve el primer resultado (o None).
     libro = session.exec(statement).first()
     #Devuelve el libro encontrado.
-    return libro
\ No newline at end of file
+    return libro
+
+#Define el servicio que busca muchos libros por ISBN; devuelve (libros encontrados, ISBN no encontrados).
+def get_libros_por_isbns(session: Session, isbns: List[str], proyeccion: Optional[Proyeccion] = None):
+    #Quita repetidos conservando el orden en que se pidieron.
+    pendientes = list(dict.fromkeys(isbns))
+    #Diccionario isbn -> libro con lo que se encuentre en la BD.
+    encontrados: Dict[str, modelo.Libro] = {}
+    #Consulta por bloques (un 'IN' sobre el indice unico de 'isbn'); las relaciones se cargan por lotes en cada bloque.
+    for inicio in range(0, len(pendientes), TAMANO_LOTE_NOMBRES):
+        bloque = pendientes[inicio:inicio + TAMANO_LOTE_NOMBRES]
+        statement = select(modelo.Libro).where(modelo.Libro.isbn.in_(bloque)).options(*opciones_libro(proyeccion, requeridas=("isbn",)))
+        for libro in session.exec(statement).all():
+            encontrados[libro.isbn] = libro
+    #Devuelve los libros en el orden pedido y la lista de ISBN que no existen.
+    libros = [encontrados[isbn] for isbn in pendientes if isbn in encontrados]
+    no_encontrados = [isbn for isbn in pendientes if isbn not in encontrados]
+    return libros, no_encontrados
+
+# --- Servicio de exportacion del catalogo ---
+
+#Numero de libros que se leen de la BD por cada bloque de la exportacion.
+TAMANO_BLOQUE_EXPORTACION = 1000
+#Columnas (en orden) de cada libro exportado.
+COLUMNAS_EXPORTACION = [
+    "id", "isbn", "titulo", "edicion", "ano_publicacion", "paginas", "precio", "formato",
+    "editorial", "publico_objetivo", "serie", "autores", "categorias",
+]
+
+#Define un generador que recorre todo el catalogo por bloques y devuelve cada libro como un diccionario plano.
+def iterar_libros_planos(session: Session, tamano_bloque: int = TAMANO_BLOQUE_EXPORTACION) -> Iterator[List[dict]]:
+    #Ultimo id leido (paginacion por keyset, cada bloque cuesta lo mismo).
+    ultimo_id = 0
+    while True:
+        #Lee las columnas del libro y los nombres de sus relaciones muchos-a-uno con LEFT JOINs (sin objetos del ORM).
+        statement = (
+            select(
+                modelo.Libro.id, modelo.Libro.isbn, modelo.Libro.titulo, modelo.Libro.edicion,
+                modelo.Libro.ano_publicacion, modelo.Libro.paginas, modelo.Libro.precio, modelo.Libro.formato,
+                modelo.Editorial.nombre, modelo.PublicoObjetivo.tipo, modelo.Serie.nombre,
+            )
+            .outerjoin(modelo.Editorial, modelo.Libro.editorial_id == modelo.Editorial.id)
+            .outerjoin(modelo.PublicoObjetivo, modelo.Libro.publico_objetivo_id == modelo.PublicoObjetivo.id)
+            .outerjoin(modelo.Serie, modelo.Libro.serie_id == modelo.Serie.id)
+            .where(modelo.Libro.id > ultimo_id)
+            .order_by(modelo.Libro.id)
+            .limit(tamano_bloque)
+        )
+        filas = session.exec(statement).all()
+        #Si ya no hay filas, termina la exportacion.
+        if not filas:
+            return
+        #Convierte cada fila en un diccionario con las columnas de la exportacion.
+        libros = [dict(zip(COLUMNAS_EXPORTACION, fila), autores=[], categorias=[]) for fila in filas]
+        por_id = {libro["id"]: libro for libro in libros}
+        #Trae los nombres de autores de todo el bloque en una sola consulta.
+        statement_autores = (
+            select(modelo.LibroAutorLink.libro_id, modelo.Autor.nombre)
+            .join(modelo.Autor, modelo.LibroAutorLink.autor_id == modelo.Autor.id)
+            .where(modelo.LibroAutorLink.libro_id.in_(list(por_id)))
+        )
+        for libro_id, nombre in session.exec(statement_autores).all():
+            por_id[libro_id]["autores"].append(nombre)
+        #Trae los nombres de categorias de todo el bloque en una sola consulta.
+        statement_categorias = (
+            select(modelo.LibroCategoriaLink.libro_id, modelo.Categoria.nombre)
+            .join(modelo.Categoria, modelo.LibroCategoriaLink.categoria_id == modelo.Categoria.id)
+            .where(modelo.LibroCategoriaLink.libro_id.in_(list(por_id)))
+        )
+        for libro_id, nombre in session.exec(statement_categorias).all():
+            por_id[libro_id]["categorias"].append(nombre)
+        #Entrega el bloque y recuerda el ultimo id para la siguiente vuelta.
+        yield libros
+        ultimo_id = libros[-1]["id"]
+
+#Define el generador que exporta todo el catalogo en formato NDJSON (un objeto JSON por linea).
+def exportar_libros_ndjson(session: Session) -> Iterator[str]:
+    for libros in iterar_libros_planos(session):
+        #Cada bloque se envia como un solo fragmento de texto.
+        yield "".join(json.dumps(libro, ensure_ascii=False) + "\n" for libro in libros)
+
+#Define el generador que exporta todo el catalogo en formato CSV.
+def exportar_libros_csv(session: Session) -> Iterator[str]:
+    #Buffer reutilizado para escribir cada bloque.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    #La primera linea es el encabezado con los nombres de las columnas.
+    writer.writerow(COLUMNAS_EXPORTACION)
+    for libros in iterar_libros_planos(session):
+        for libro in libros:
+            #Las listas (autores, categorias) se unen con '; ' en una sola celda.
+            libro["autores"] = "; ".join(libro["autores"])
+            libro["categorias"] = "; ".join(libro["categorias"])
+            writer.writerow([libro[columna] for columna in COLUMNAS_EXPORTACION])
+        #Envia el bloque y vacia el buffer para que la memoria no crezca.
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    #Envia lo que quede (el encabezado, si el catalogo esta vacio).
+    if buffer.getvalue():
+        yield buffer.getvalue()
@@ -0,0 +1,56 @@
+#Versiones: Contadores de version del catalogo y soporte de ETag (GET condicional)
+
+#Modulos y librerias necesarias
+import hashlib
+from typing import Optional, Sequence
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlmodel import Session, select
+from Modelo import modelo
+
+#Nombres de los contadores (uno por tipo de entidad).
+LIBROS = "libros"
+AUTORES = "autores"
+CATEGORIAS = "categorias"
+EDITORIALES = "editoriales"
+SERIES = "series"
+PUBLICOS = "publicos"
+
+#Un libro completo incluye todas sus relaciones, asi que su respuesta depende de todos los contadores.
+ENTIDADES_LIBRO = (LIBROS, AUTORES, CATEGORIAS, EDITORIALES, SERIES, PUBLICOS)
+
+#Define la funcion que incrementa los contadores de las entidades modificadas.
+#No confirma (commit): el incremento viaja en la misma transaccion que la escritura.
+def incrementar(session: Session, *entidades: str) -> None:
+    for entidad in entidades:
+        session.connection().execute(
+            text(
+                "INSERT INTO versioncatalogo (entidad, version) VALUES (:entidad, 1) "
+                "ON CONFLICT (entidad) DO UPDATE SET version = version + 1"
+            ),
+            {"entidad": entidad},
+        )
+
+#Define la funcion que calcula el ETag de una peticion a partir de los contadores y los parametros.
+def calcular_etag(session: Session, request: Request, entidades: Sequence[str]) -> str:
+    #Lee los contadores con una sola consulta a la tabla de versiones.
+    statement = select(modelo.VersionCatalogo).where(modelo.VersionCatalogo.entidad.in_(entidades))
+    versiones = {fila.entidad: fila.version for fila in session.exec(statement).all()}
+    #Combina la ruta, los parametros de consulta y las versiones en un solo texto.
+    partes = [request.url.path, str(request.query_params)]
+    partes += [f"{entidad}={versiones.get(entidad, 0)}" for entidad in entidades]
+    #El ETag es un hash corto de ese texto.
+    return '"' + hashlib.sha1("|".join(partes).encode()).hexdigest() + '"'
+
+#Define la funcion que resuelve un GET condicional.
+#Devuelve una respuesta 304 si el cliente ya tiene la version actual, o None para continuar normalmente.
+def condicional(session: Session, request: Request, response: Response, entidades: Sequence[str]) -> Optional[Response]:
+    #Calcula el ETag actual de la peticion.
+    etag = calcular_etag(session, request, entidades)
+    #Si el ETag coincide con el que envio el cliente, no hace falta consultar ni serializar nada.
+    enviados = [valor.strip().removeprefix("W/") for valor in request.headers.get("if-none-match", "").split(",")]
+    if etag in enviados or "*" in enviados:
+        return Response(status_code=304, headers={"ETag": etag})
+    #Si no coincide, agrega el ETag a la respuesta normal.
+    response.headers["ETag"] = etag
+    return None
@@ -6,32 +6,97 @@
 # Higuera Pineda ANgel Abraham
 # Lorenzo Silva Abad Rey
 
+import time
+#Marca el inicio del arranque (para el reporte de tiempos por fase)
+INICIO_ARRANQUE = time.perf_counter()
 
-from fastapi import FastAPI
-from Servicios.database import create_db_and_tables
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import TimeoutError as PoolAgotado
+from sqlmodel import Session
+from Servicios.database import engine, preparar_base_de_datos
+from Servicios import cache, metricas, consultas_lentas, arranque, servicios
 from Rutas import libros, autores, categorias, editoriales, publico_objetivo, series
+arranque.registrar("importaciones", time.perf_counter() - INICIO_ARRANQUE)
 
-app = FastAPI(
-    title="API de Catálogo de Librería",
-    description="Practica 5: Catalógo de Librería",
-    version="1.0.0"
-)
+#Routers de la aplicacion (en este orden)
+ROUTERS = [
+    libros.router,
+    autores.router,
+    categorias.router,
+    editoriales.router,
+    publico_objetivo.router,
+    series.router,
+]
 
-@app.on_event("startup")
 def on_startup():
     #Esta función se ejecuta al iniciar la app
-    #y crea la base de datos y las tablas
-    create_db_and_tables()
+    #y crea la base de datos y las tablas (solo si el esquema cambio desde el ultimo arranque)
+    with arranque.medir("esquema"):
+        preparar_base_de_datos()
+    #Si se pidio (LIBRERIA_PRECALENTAR_CACHE=1), carga en cache los nombres mas usados
+    if cache.PRECALENTAR:
+        with arranque.medir("precalentado_cache"), Session(engine) as session:
+            servicios.precalentar_caches(session)
+    #Escribe en el log cuanto tardo cada fase
+    arranque.registrar("total", time.perf_counter() - INICIO_ARRANQUE)
+    arranque.reportar()
 
-#Incluimos las rutas que definimos en rutas.py
-app.include_router(libros.router)
-app.include_router(autores.router)
-app.include_router(categorias.router)
-app.include_router(editoriales.router)       
-app.include_router(publico_objetivo.router) 
-app.include_router(series.router)          
+def root():
+    return {"mensaje": "Bienvenido a la API de la Librería"}
 
 
-@app.get("/")
-def root():
-    return {"mensaje": "Bienvenido a la API de la Librería"}
\ No newline at end of file
+#Expone los contadores de la cache de nombres (aciertos/fallos) para medir si conviene.
+def estadisticas_cache():
+    return cache.estadisticas()
+
+
+#Expone los histogramas por ruta (consultas, tiempo de BD, serializacion y latencia total).
+def exportar_metricas():
+    return PlainTextResponse(metricas.registro.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+#Devuelve las ultimas consultas lentas (con parametros, ruta de origen y plan de ejecucion).
+def leer_consultas_lentas():
+    return consultas_lentas.consultar()
+
+#Responde 503 cuando una peticion espero mas de LIBRERIA_BD_POOL_TIMEOUT segundos una conexion del pool.
+def pool_agotado(request: Request, error: PoolAgotado):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "El servidor esta ocupado; intente de nuevo"},
+        headers={"Retry-After": "1"},
+    )
+
+#Define la funcion que arma la aplicacion (las mediciones de concurrencia arman la suya en el mismo proceso).
+def crear_app() -> FastAPI:
+    app = FastAPI(
+        title="API de Catálogo de Librería",
+        description="Practica 5: Catalógo de Librería",
+        version="1.0.0"
+    )
+    app.on_event("startup")(on_startup)
+    app.add_exception_handler(PoolAgotado, pool_agotado)
+
+    inicio_rutas = time.perf_counter()
+
+    #Incluimos las rutas que definimos en rutas.py
+    for router in ROUTERS:
+        app.include_router(router)
+    arranque.registrar("registro_de_rutas", time.perf_counter() - inicio_rutas)
+
+    app.get("/")(root)
+    app.get("/cache/estadisticas")(estadisticas_cache)
+
+    #Si se activaron las metricas (LIBRERIA_METRICAS=1), medimos cada peticion y las exponemos para Prometheus
+    if metricas.USAR_METRICAS:
+        app.add_middleware(metricas.MiddlewareMetricas)
+        app.get(metricas.RUTA_METRICAS, response_class=PlainTextResponse, include_in_schema=False)(exportar_metricas)
+
+    #Si se activo el registro de consultas lentas (LIBRERIA_CONSULTAS_LENTAS=1), lo exponemos para depuracion
+    if consultas_lentas.USAR_CONSULTAS_LENTAS:
+        app.add_middleware(consultas_lentas.MiddlewareConsultasLentas)
+        app.get(consultas_lentas.RUTA_CONSULTAS_LENTAS, include_in_schema=False)(leer_consultas_lentas)
+
+    return app
+
+app = crear_app()
@@ -0,0 +1,180 @@
+#Catalogos sinteticos y funciones de ayuda de las mediciones de rendimiento (pytest-benchmark)
+
+#Cada medicion corre sobre una copia de un catalogo sintetico generado con 'generar_catalogo' (con semilla
+#fija). Los catalogos se guardan en un directorio temporal para reutilizarlos entre corridas. Los tamanos
+#se eligen con la variable de entorno LIBRERIA_BENCH_TAMANOS (ej. "1000,10000,100000").
+
+#Las mediciones no corren con 'pytest' a secas (ver 'pytest.ini'); se piden con '-m benchmark'.
+#No hay una referencia versionada ni un seguimiento automatico de regresiones: los tiempos dependen de la maquina.
+#Para comparar un cambio se mide antes y despues en la misma maquina ('.benchmarks/' esta en .gitignore):
+#   python -m pytest tests/benchmarks -m benchmark --benchmark-save=antes
+#   python -m pytest tests/benchmarks -m benchmark --benchmark-compare=0001 --benchmark-compare-fail=median:25%
+
+#Los modulos de mediciones importan de aqui el fixture 'catalogo' y la funcion 'medir'.
+
+#Modulos y librerias necesarias
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from itertools import count
+from typing import Callable, Dict
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlmodel import Session, create_engine, select
+from Modelo import modelo
+from Esquemas import esquemas
+from Servicios import database, servicios
+from Servicios.database import aplicar_pragmas
+from Herramientas.generar_catalogo import generar_en_url
+
+#Directorio donde se guardan los catalogos generados (se reutilizan si ya existen).
+DIRECTORIO_CATALOGOS = os.path.join(tempfile.gettempdir(), "libreria_catalogos")
+#Semilla del generador: con la misma semilla el catalogo siempre es el mismo.
+SEMILLA = 42
+#Numeros de libros de los catalogos sobre los que se mide.
+TAMANOS = [int(tamano) for tamano in os.getenv("LIBRERIA_BENCH_TAMANOS", "1000,10000").split(",")]
+#Numero de libros de la base de datos de la aplicacion en las mediciones de rutas HTTP.
+LIBROS_APP = int(os.getenv("LIBRERIA_BENCH_LIBROS_APP", "10000"))
+#Llamadas medidas por caso (cada una con su propia sesion).
+RONDAS = int(os.getenv("LIBRERIA_BENCH_RONDAS", "20"))
+
+#Define la funcion que devuelve la ruta de un catalogo de 'tamano' libros (lo genera solo la primera vez).
+def ruta_catalogo(tamano: int) -> str:
+    os.makedirs(DIRECTORIO_CATALOGOS, exist_ok=True)
+    original = os.path.join(DIRECTORIO_CATALOGOS, f"catalogo_{tamano}_{SEMILLA}.db")
+    if not os.path.exists(original):
+        generar_en_url(f"sqlite:///{original}", tamano, SEMILLA)
+    return original
+
+#Define una funcion de ayuda que crea un engine sobre un catalogo con los mismos PRAGMA que la aplicacion
+#(con 'perfil=False', con los valores por defecto de SQLite).
+def crear_motor(ruta, perfil: bool = True):
+    motor = create_engine(f"sqlite:///{ruta}")
+    if perfil:
+        event.listen(motor, "connect", aplicar_pragmas)
+    return motor
+
+#Define la funcion que copia un catalogo en 'destino' (las mediciones que escriben no tocan el original).
+def copiar_catalogo(tamano: int, destino) -> str:
+    shutil.copyfile(ruta_catalogo(tamano), destino)
+    return str(destino)
+
+#Define la funcion que pone un catalogo de 'tamano' libros como base de datos de la aplicacion (la de
+#LIBRERIA_BD_URL, que en las pruebas es un archivo temporal). Cierra antes las conexiones abiertas.
+def preparar_base_de_la_app(tamano: int) -> str:
+    database.engine.dispose()
+    database.read_engine.dispose()
+    ruta = make_url(database.DATABASE_URL).database
+    for sobrante in (ruta + "-wal", ruta + "-shm"):
+        if os.path.exists(sobrante):
+            os.remove(sobrante)
+    return copiar_catalogo(tamano, ruta)
+
+#Define la funcion que toma valores reales del catalogo: el autor y la categoria mas usados, una serie,
+#un publico, una editorial y un libro de la mitad.
+def leer_valores(motor) -> Dict[str, object]:
+    with Session(motor) as session:
+        total = session.exec(select(modelo.Libro.id).order_by(modelo.Libro.id.desc())).first()
+        libro_medio = session.get(modelo.Libro, total // 2)
+        autor = session.get(modelo.Autor, session.exec(select(modelo.LibroAutorLink.autor_id)).first())
+        categoria = session.get(modelo.Categoria, session.exec(select(modelo.LibroCategoriaLink.categoria_id)).first())
+        return {
+            "total": total, "isbn": libro_medio.isbn, "titulo": libro_medio.titulo.split()[0],
+            "autor": autor.nombre, "categoria": categoria.nombre,
+            "serie": session.exec(select(modelo.Serie)).first().nombre,
+            "publico": session.exec(select(modelo.PublicoObjetivo)).first().tipo,
+            "editorial": session.exec(select(modelo.Editorial)).first().nombre,
+        }
+
+#Define el catalogo sobre el que mide un modulo: su tamano, su engine y los valores reales para las consultas.
+class Catalogo:
+    def __init__(self, tamano: int, motor):
+        self.tamano = tamano
+        self.motor = motor
+        self.valores = leer_valores(motor)
+
+#Catalogo de cada tamano de LIBRERIA_BENCH_TAMANOS (una copia por modulo, porque algunos casos escriben).
+@pytest.fixture(scope="module", params=TAMANOS, ids=lambda tamano: f"{tamano}_libros")
+def catalogo(request, tmp_path_factory):
+    ruta = copiar_catalogo(request.param, tmp_path_factory.mktemp("catalogo") / "catalogo.db")
+    motor = crear_motor(ruta)
+    yield Catalogo(request.param, motor)
+    motor.dispose()
+
+#Cliente HTTP de la aplicacion sobre un catalogo de LIBRERIA_BENCH_LIBROS_APP libros.
+@pytest.fixture(scope="module")
+def cliente_app():
+    from fastapi.testclient import TestClient
+    import main
+    preparar_base_de_la_app(LIBROS_APP)
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+#Define la funcion que mide 'funcion' con una sesion nueva por llamada (el mapa de identidad no debe
+#servir objetos de la llamada anterior). La ronda de calentamiento llena las caches de SQLite y de sentencias.
+def medir(benchmark, motor, funcion: Callable[[Session], object], rondas: int = RONDAS):
+    def preparar():
+        return (Session(motor),), {}
+
+    def llamar(session: Session):
+        try:
+            return funcion(session)
+        finally:
+            session.close()
+
+    return benchmark.pedantic(llamar, setup=preparar, rounds=rondas, warmup_rounds=1)
+
+#Define la funcion que devuelve el percentil 'p' (0 a 100) de las rondas medidas, en milisegundos.
+def percentil(benchmark, p: float) -> float:
+    datos = benchmark.stats.stats.sorted_data
+    return round(datos[min(len(datos) - 1, int(len(datos) * p / 100))] * 1000, 4)
+
+#Define el bucle de escritura que corre en otro proceso: lotes de 'libros_por_lote' libros con un COMMIT por
+#lote (como 'POST /Libros/lote'; con un libro, como 'POST /Libros/') hasta que se le pida parar.
+def escribir_en_bucle(ruta, valores, libros_por_lote: int, perfil: bool, parar, lotes):
+    motor = crear_motor(ruta, perfil)
+    isbns = count()
+    while not parar.is_set():
+        with Session(motor) as session:
+            servicios.create_libros_lote(session, [esquemas.LibroCreacion(
+                titulo="Libro de escritura", isbn=f"escritura-{os.getpid()}-{next(isbns)}", precio=99.0, formato="Físico",
+                editorial_nombre=valores["editorial"], publico_objetivo_tipo=valores["publico"],
+                serie_nombre=valores["serie"], autores_nombres=[valores["autor"]], categorias_nombres=[valores["categoria"]],
+            ) for _ in range(libros_por_lote)])
+            session.commit()
+        lotes.value += 1
+    motor.dispose()
+
+#Define el escritor que corre mientras dura el bloque 'with'. Es otro proceso y no un hilo: un hilo de
+#escritura competiria por el GIL con el lector y la medicion mostraria la contencion de Python, no la de SQLite.
+class Escritor:
+    def __init__(self, ruta, valores, libros_por_lote: int = 1, perfil: bool = True):
+        contexto = multiprocessing.get_context("spawn")
+        self.parar = contexto.Event()
+        self.lotes = contexto.Value("i", 0)
+        self.libros_por_lote = libros_por_lote
+        self.proceso = contexto.Process(
+            target=escribir_en_bucle, args=(str(ruta), valores, libros_por_lote, perfil, self.parar, self.lotes)
+        )
+
+    def __enter__(self):
+        self.proceso.start()
+        #Espera el primer COMMIT para medir con la escritura ya en marcha.
+        while not self.lotes.value and self.proceso.is_alive():
+            time.sleep(0.01)
+        #Si el proceso fallo antes del primer COMMIT, la medicion no tendria escritor.
+        if not self.proceso.is_alive():
+            raise RuntimeError(f"El escritor termino antes de empezar (codigo {self.proceso.exitcode})")
+        return self
+
+    def __exit__(self, *excepcion):
+        self.parar.set()
+        self.proceso.join()
+
+    #Libros escritos hasta ahora.
+    @property
+    def libros(self) -> int:
+        return self.lotes.value * self.libros_por_lote
@@ -0,0 +1,58 @@
+#Medicion de la busqueda por titulo: indice FTS5 ('buscar_libros') contra LIKE '%q%' sobre un catalogo grande
+
+#El LIKE con comodin al inicio no puede usar ningun indice: recorre la tabla 'libro' completa. La
+#diferencia solo se nota con catalogos grandes, por eso este modulo usa su propio tamano
+#(LIBRERIA_BENCH_LIBROS_BUSQUEDA, 500000 por defecto; el catalogo se genera una sola vez y se reutiliza).
+
+#Modulos y librerias necesarias
+import os
+import pytest
+from sqlmodel import Session, select
+from Modelo import modelo
+from Servicios import servicios
+from catalogos import Catalogo, crear_motor, medir, ruta_catalogo
+
+#Todo el modulo son mediciones (no corren sin '-m benchmark').
+pytestmark = pytest.mark.benchmark
+
+#Numero de libros del catalogo de busqueda.
+LIBROS_BUSQUEDA = int(os.getenv("LIBRERIA_BENCH_LIBROS_BUSQUEDA", "500000"))
+
+#Define la busqueda equivalente sin indice: cada palabra debe aparecer en el titulo (LIKE '%palabra%'), como el AND de FTS5.
+def buscar_con_like(session: Session, q: str, limit: int = 20):
+    statement = select(modelo.Libro)
+    for palabra in q.split():
+        statement = statement.where(modelo.Libro.titulo.like(f"%{palabra}%"))
+    statement = statement.order_by(modelo.Libro.id).limit(limit).options(*servicios.opciones_libro())
+    return session.exec(statement).all()
+
+#Define la busqueda con el indice FTS5 (la que usa la ruta '/Libros/buscar').
+def buscar_con_fts(session: Session, q: str, limit: int = 20):
+    return servicios.buscar_libros(session, q, limit=limit)
+
+#Metodos de busqueda a comparar.
+METODOS = {"fts5": buscar_con_fts, "like": buscar_con_like}
+
+#Catalogo grande de solo lectura (se usa el original generado, sin copiarlo).
+@pytest.fixture(scope="module")
+def catalogo_busqueda():
+    motor = crear_motor(ruta_catalogo(LIBROS_BUSQUEDA))
+    yield Catalogo(LIBROS_BUSQUEDA, motor)
+    motor.dispose()
+
+#Define las busquedas a medir: una palabra, dos palabras de un mismo titulo y una palabra que no existe
+#(el peor caso para LIKE: recorre todo el catalogo sin encontrar nada).
+@pytest.fixture(scope="module")
+def consultas(catalogo_busqueda):
+    with Session(catalogo_busqueda.motor) as session:
+        titulo = session.get(modelo.Libro, catalogo_busqueda.valores["total"] // 2).titulo.split()
+    return {"una_palabra": titulo[0], "dos_palabras": " ".join(titulo[:2]), "sin_resultados": "zzqxjw"}
+
+#Mide cada metodo con cada busqueda (agrupados por busqueda para comparar FTS5 contra LIKE).
+@pytest.mark.parametrize("metodo", METODOS)
+@pytest.mark.parametrize("busqueda", ["una_palabra", "dos_palabras", "sin_resultados"])
+def test_busqueda(benchmark, catalogo_busqueda, consultas, busqueda, metodo):
+    benchmark.group = f"busqueda / {catalogo_busqueda.tamano} libros / {busqueda}"
+    q = consultas[busqueda]
+    benchmark.extra_info["q"] = q
+    medir(benchmark, catalogo_busqueda.motor, lambda session: METODOS[metodo](session, q))
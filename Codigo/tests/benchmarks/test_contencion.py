@@ -0,0 +1,49 @@
+#Medicion de la contencion lectura/escritura con el perfil de la base de datos activo e inactivo
+
+#Con el perfil activo ('aplicar_pragmas': WAL, synchronous=NORMAL, busy_timeout...) los lectores leen
+#mientras otro proceso escribe. Con el perfil inactivo (valores por defecto de SQLite: journal DELETE y
+#synchronous FULL) cada COMMIT bloquea a los lectores. Se mide la latencia de lectura mientras un escritor
+#crea libros uno por uno (un COMMIT por libro, como 'POST /Libros/').
+
+#Modulos y librerias necesarias
+import sqlite3
+import pytest
+from Servicios import servicios
+from catalogos import Escritor, catalogo, copiar_catalogo, crear_motor, medir, percentil
+
+#Todo el modulo son mediciones (no corren sin '-m benchmark').
+pytestmark = pytest.mark.benchmark
+
+#Lecturas medidas (muchas, para que el p99 tenga sentido).
+RONDAS_LECTURA = 300
+
+#Copia del catalogo con el perfil activo (WAL, como lo deja 'generar_catalogo') o inactivo (journal DELETE).
+@pytest.fixture(scope="module", params=[True, False], ids=["perfil_activo", "perfil_inactivo"])
+def base_perfil(request, catalogo, tmp_path_factory):
+    ruta = copiar_catalogo(catalogo.tamano, tmp_path_factory.mktemp("contencion") / "catalogo.db")
+    if not request.param:
+        #El modo del journal se guarda en el archivo: hay que sacarlo de WAL explicitamente.
+        conexion = sqlite3.connect(ruta)
+        conexion.execute("PRAGMA journal_mode=DELETE")
+        conexion.close()
+    return ruta, request.param
+
+#Mide la lectura de una pagina de la categoria mas usada sin y con un escritor en otro proceso.
+@pytest.mark.parametrize("escritura", [False, True], ids=["sin_escritor", "con_escritor"])
+def test_lectura_con_escritor(benchmark, catalogo, base_perfil, escritura):
+    ruta, perfil = base_perfil
+    benchmark.group = f"contencion / {catalogo.tamano} libros / {'perfil activo' if perfil else 'perfil inactivo'}"
+    categoria = catalogo.valores["categoria"]
+    motor = crear_motor(ruta, perfil)
+    leer = lambda session: servicios.get_libros_por_categoria(session, categoria, limit=20)
+    try:
+        if escritura:
+            with Escritor(ruta, catalogo.valores, perfil=perfil) as escritor:
+                medir(benchmark, motor, leer, rondas=RONDAS_LECTURA)
+            benchmark.extra_info["libros_escritos"] = escritor.libros
+        else:
+            medir(benchmark, motor, leer, rondas=RONDAS_LECTURA)
+    finally:
+        motor.dispose()
+    benchmark.extra_info["p50_ms"] = percentil(benchmark, 50)
+    benchmark.extra_info["p99_ms"] = percentil(benchmark, 99)
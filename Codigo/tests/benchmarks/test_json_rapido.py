@@ -0,0 +1,26 @@
+#Medicion de la serializacion de '/Libros/?limit=100' con LIBRERIA_JSON_RAPIDO=0 (modelos de respuesta
+#de pydantic) y LIBRERIA_JSON_RAPIDO=1 (diccionarios armados a mano y 'respuesta_json')
+
+#Modulos y librerias necesarias
+import pytest
+from Servicios import serializacion
+from catalogos import LIBROS_APP, RONDAS, cliente_app
+
+#Todo el modulo son mediciones (no corren sin '-m benchmark').
+pytestmark = pytest.mark.benchmark
+
+#Mide la peticion completa (ruta, consultas y serializacion) con cada valor de la bandera.
+@pytest.mark.parametrize("rapido", [False, True], ids=["json_rapido_0", "json_rapido_1"])
+def test_listado_de_libros(benchmark, cliente_app, monkeypatch, rapido):
+    benchmark.group = f"/Libros/?limit=100 / {LIBROS_APP} libros"
+    #La ruta lee la bandera en cada peticion.
+    monkeypatch.setattr(serializacion, "USAR_JSON_RAPIDO", rapido)
+
+    def pedir():
+        respuesta = cliente_app.get("/Libros/", params={"limit": 100})
+        assert respuesta.status_code == 200
+        return respuesta
+
+    respuesta = benchmark.pedantic(pedir, rounds=RONDAS, warmup_rounds=1)
+    assert len(respuesta.json()) == 100
+    benchmark.extra_info["bytes"] = len(respuesta.content)
@@ -0,0 +1,43 @@
+#Medicion de la latencia de lectura (p50/p99) mientras otro proceso ingiere libros por lotes
+
+#Las lecturas usan un engine sobre la URL de solo lectura ('url_solo_lectura', como 'read_engine') y la
+#escritura usa un engine normal en otro proceso ('Escritor'). Con WAL los lectores no esperan al escritor: la cola de
+#latencia (p99) con ingesta debe quedar cerca de la de sin ingesta.
+
+#Modulos y librerias necesarias
+import pytest
+from sqlalchemy import event
+from sqlmodel import create_engine
+from Servicios import servicios
+from Servicios.database import aplicar_pragmas_lectura, url_solo_lectura
+from catalogos import Escritor, catalogo, medir, percentil
+
+#Todo el modulo son mediciones (no corren sin '-m benchmark').
+pytestmark = pytest.mark.benchmark
+
+#Libros por lote de la ingesta y lecturas medidas (muchas, para que el p99 tenga sentido).
+LIBROS_POR_LOTE = 100
+RONDAS_LECTURA = 300
+
+#Engine de solo lectura sobre el mismo archivo del catalogo.
+@pytest.fixture(scope="module")
+def motor_lectura(catalogo):
+    motor = create_engine(url_solo_lectura(str(catalogo.motor.url)))
+    event.listen(motor, "connect", aplicar_pragmas_lectura)
+    yield motor
+    motor.dispose()
+
+#Mide la lectura de una pagina de la categoria mas usada, sin y con ingesta (p50/p99 en 'extra_info').
+@pytest.mark.parametrize("ingesta", [False, True], ids=["sin_ingesta", "con_ingesta"])
+def test_lectura_durante_ingesta(benchmark, catalogo, motor_lectura, ingesta):
+    benchmark.group = f"lectura durante ingesta / {catalogo.tamano} libros"
+    categoria = catalogo.valores["categoria"]
+    leer = lambda session: servicios.get_libros_por_categoria(session, categoria, limit=20)
+    if ingesta:
+        with Escritor(catalogo.motor.url.database, catalogo.valores, LIBROS_POR_LOTE) as escritor:
+            medir(benchmark, motor_lectura, leer, rondas=RONDAS_LECTURA)
+        benchmark.extra_info["libros_ingeridos"] = escritor.libros
+    else:
+        medir(benchmark, motor_lectura, leer, rondas=RONDAS_LECTURA)
+    benchmark.extra_info["p50_ms"] = percentil(benchmark, 50)
+    benchmark.extra_info["p99_ms"] = percentil(benchmark, 99)
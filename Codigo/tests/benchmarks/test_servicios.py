@@ -0,0 +1,60 @@
+#Mediciones de la capa de servicios (creacion, listados, filtros, busqueda, ISBN) por tamano de catalogo
+
+#Modulos y librerias necesarias
+from itertools import count
+import pytest
+from sqlmodel import Session
+from Esquemas import esquemas
+from Servicios import servicios
+from Servicios.paginacion import codificar_cursor
+from catalogos import catalogo, medir
+
+#Todo el modulo son mediciones (no corren sin '-m benchmark').
+pytestmark = pytest.mark.benchmark
+
+#Contador para que cada libro creado tenga un ISBN distinto.
+CREADOS = count()
+
+#Define el caso de creacion: el servicio solo hace 'flush'; el COMMIT (que en la API hace la unidad de trabajo) tambien se mide.
+def crear_libro(session: Session, valores, total):
+    libro = servicios.create_libro(session, esquemas.LibroCreacion(
+        titulo="Libro de medicion", isbn=f"medicion-{next(CREADOS)}", precio=199.0, formato="Físico",
+        editorial_nombre=valores["editorial"], publico_objetivo_tipo=valores["publico"],
+        serie_nombre=valores["serie"], autores_nombres=[valores["autor"]], categorias_nombres=[valores["categoria"]],
+    ))
+    session.commit()
+    return libro
+
+#Define una funcion de ayuda con los filtros que usan los casos de filtrado y facetas.
+def filtros(valores):
+    return esquemas.FiltrosLibro(categoria=valores["categoria"], precio_max=300, formato="Físico")
+
+#Casos a medir: nombre -> funcion(session, valores, total).
+CASOS = {
+    "create_libro": crear_libro,
+    "get_libros_todos": lambda session, valores, total: servicios.get_libros_todos(session, limit=20),
+    "get_libros_todos_offset_profundo": lambda session, valores, total: servicios.get_libros_todos(session, skip=total // 2, limit=20),
+    "get_libros_todos_cursor_profundo": lambda session, valores, total: servicios.get_libros_todos(session, limit=20, cursor=codificar_cursor(total // 2)),
+    "get_libros_por_autor": lambda session, valores, total: servicios.get_libros_por_autor(session, valores["autor"], limit=20),
+    "get_libros_por_categoria": lambda session, valores, total: servicios.get_libros_por_categoria(session, valores["categoria"], limit=20),
+    "get_libros_por_serie": lambda session, valores, total: servicios.get_libros_por_serie(session, valores["serie"], limit=20),
+    "get_libros_por_publico": lambda session, valores, total: servicios.get_libros_por_publico(session, valores["publico"], limit=20),
+    "get_libro_por_isbn": lambda session, valores, total: servicios.get_libro_por_isbn(session, valores["isbn"]),
+    "filtrar_libros": lambda session, valores, total: servicios.filtrar_libros(session, filtros(valores), limit=20),
+    "buscar_libros": lambda session, valores, total: servicios.buscar_libros(session, valores["titulo"], limit=20),
+    "get_facetas": lambda session, valores, total: servicios.get_facetas(session, esquemas.FiltrosLibro()),
+    "get_facetas_filtradas": lambda session, valores, total: servicios.get_facetas(session, filtros(valores)),
+    "get_autores_todos": lambda session, valores, total: servicios.get_autores_todos(session, limit=20),
+    "get_categorias_todos": lambda session, valores, total: servicios.get_categorias_todos(session, limit=20),
+    "get_editoriales_todas": lambda session, valores, total: servicios.get_editoriales_todas(session, limit=20),
+    "get_series_todas": lambda session, valores, total: servicios.get_series_todas(session, limit=20),
+    "get_publicos_objetivo_todos": lambda session, valores, total: servicios.get_publicos_objetivo_todos(session, limit=20),
+}
+
+#Mide cada caso sobre cada tamano de catalogo (agrupados por tamano en la tabla de resultados).
+@pytest.mark.parametrize("caso", CASOS)
+def test_servicio(benchmark, catalogo, caso):
+    benchmark.group = f"servicios / {catalogo.tamano} libros"
+    valores = catalogo.valores
+    funcion = CASOS[caso]
+    medir(benchmark, catalogo.motor, lambda session: funcion(session, valores, valores["total"]))
@@ -0,0 +1,84 @@
+#Configuracion comun de las pruebas
+
+#Cada prueba usa su propia base de datos SQLite en un directorio temporal: nunca se toca 'libreria.db'.
+
+#Modulos y librerias necesarias
+import os
+import tempfile
+
+#La URL de la BD de la aplicacion se lee al importar 'Servicios.database', asi que se fija antes de importar la aplicacion.
+os.environ.setdefault(
+    "LIBRERIA_BD_URL",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="libreria_pruebas_"), "libreria.db"),
+)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlmodel import create_engine
+from Servicios import cache, database
+from Servicios.database import aplicar_pragmas, preparar_base_de_datos
+from Herramientas.generar_catalogo import generar_catalogo
+
+#Numero de libros del catalogo sintetico que comparten las pruebas de un modulo.
+LIBROS_CATALOGO = 2000
+
+#Define una funcion de ayuda que crea un engine sobre un archivo SQLite con los mismos PRAGMA que la aplicacion.
+def crear_motor(ruta):
+    motor = create_engine(f"sqlite:///{ruta}")
+    event.listen(motor, "connect", aplicar_pragmas)
+    return motor
+
+#Define el contador de sentencias SQL que ejecuta un engine (evento 'before_cursor_execute').
+class ContadorConsultas:
+    def __init__(self, motor):
+        self.motor = motor
+        #Sentencias ejecutadas desde que se entro al bloque 'with'.
+        self.sentencias = []
+
+    def registrar(self, conn, cursor, statement, parameters, context, executemany):
+        self.sentencias.append((statement, parameters))
+
+    def __enter__(self):
+        self.sentencias = []
+        event.listen(self.motor, "before_cursor_execute", self.registrar)
+        return self
+
+    def __exit__(self, *excepcion):
+        event.remove(self.motor, "before_cursor_execute", self.registrar)
+
+    #Numero de sentencias ejecutadas.
+    @property
+    def total(self) -> int:
+        return len(self.sentencias)
+
+#Las caches de nombres son globales: cada prueba empieza y termina con ellas vacias.
+@pytest.fixture(autouse=True)
+def caches_vacias():
+    cache.limpiar_todas()
+    yield
+    cache.limpiar_todas()
+
+#Engine sobre un catalogo sintetico (con semilla fija), compartido por las pruebas de un modulo que solo leen.
+@pytest.fixture(scope="module")
+def motor_catalogo(tmp_path_factory):
+    motor = crear_motor(tmp_path_factory.mktemp("catalogo") / "catalogo.db")
+    preparar_base_de_datos(motor)
+    generar_catalogo(motor, LIBROS_CATALOGO)
+    yield motor
+    motor.dispose()
+
+#Cliente HTTP de la aplicacion sobre una base de datos vacia (LIBRERIA_BD_URL), compartido por las pruebas de un modulo.
+#Cada modulo empieza con el archivo borrado; el arranque de la aplicacion crea el esquema.
+@pytest.fixture(scope="module")
+def cliente():
+    import main
+    database.engine.dispose()
+    database.read_engine.dispose()
+    ruta = make_url(database.DATABASE_URL).database
+    for archivo in (ruta, ruta + "-wal", ruta + "-shm"):
+        if os.path.exists(archivo):
+            os.remove(archivo)
+    with TestClient(main.app) as cliente:
+        yield cliente
@@ -0,0 +1,30 @@
+#Pruebas de GET /Autores/: 'AutorLeer' por defecto y 'AutorLeer_con_Libros' solo con '?incluir_libros=true'
+
+#Modulos y librerias necesarias
+import pytest
+
+#Crea un autor con un libro (una vez por modulo).
+@pytest.fixture(scope="module", autouse=True)
+def autor(cliente):
+    assert cliente.post("/Autores/", json={"nombre": "Autor Con Libro"}).status_code == 200
+    respuesta = cliente.post("/Libros/bulk", json=[{
+        "titulo": "Libro Del Autor", "isbn": "autores-1", "precio": 10.0, "formato": "Físico",
+        "autores_nombres": ["Autor Con Libro"],
+    }])
+    assert respuesta.json()["creados"] == 1
+
+#Sin 'incluir_libros' cada autor sigue el esquema 'AutorLeer' (sin el campo 'libros').
+def test_autores_sin_libros(cliente):
+    autores = cliente.get("/Autores/").json()
+    assert autores == [{"nombre": "Autor Con Libro", "id": autores[0]["id"]}]
+
+#Con 'incluir_libros=true' cada autor lleva sus libros.
+def test_autores_con_libros(cliente):
+    autores = cliente.get("/Autores/", params={"incluir_libros": True}).json()
+    assert [libro["isbn"] for libro in autores[0]["libros"]] == ["autores-1"]
+
+#El OpenAPI documenta las dos formas de la respuesta.
+def test_openapi_documenta_las_dos_formas(cliente):
+    esquema = cliente.get("/openapi.json").json()["paths"]["/Autores/"]["get"]["responses"]["200"]
+    referencias = [opcion["items"]["$ref"] for opcion in esquema["content"]["application/json"]["schema"]["anyOf"]]
+    assert referencias == ["#/components/schemas/AutorLeer", "#/components/schemas/AutorLeer_con_Libros"]
@@ -0,0 +1,98 @@
+#Pruebas de la cache nombre -> id al crear libros: un acierto se comprueba por clave primaria, un id viejo
+#(o reutilizado por SQLite) se descarta y solo los nombres de transacciones confirmadas llegan a la cache
+
+#Modulos y librerias necesarias
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from Esquemas import esquemas
+from Modelo import modelo
+from Servicios import cache, servicios
+from conftest import ContadorConsultas
+
+#Define los nombres reales del catalogo que usa cada libro de prueba.
+@pytest.fixture(scope="module")
+def nombres(motor_catalogo):
+    with Session(motor_catalogo) as session:
+        return {
+            "editorial": session.exec(select(modelo.Editorial.nombre)).first(),
+            "publico": session.exec(select(modelo.PublicoObjetivo.tipo)).first(),
+            "serie": session.exec(select(modelo.Serie.nombre)).first(),
+            "autores": session.exec(select(modelo.Autor.nombre).limit(2)).all(),
+            "categoria": session.exec(select(modelo.Categoria.nombre)).first(),
+        }
+
+#Define una funcion de ayuda que arma un libro con esos nombres (el primer autor repetido).
+def libro(nombres, isbn: str) -> esquemas.LibroCreacion:
+    return esquemas.LibroCreacion(
+        titulo="Libro de prueba", isbn=isbn, precio=10.0, formato="Físico",
+        editorial_nombre=nombres["editorial"], publico_objetivo_tipo=nombres["publico"], serie_nombre=nombres["serie"],
+        autores_nombres=[*nombres["autores"], nombres["autores"][0]], categorias_nombres=[nombres["categoria"]],
+    )
+
+#Define una funcion de ayuda que devuelve los SELECT registrados por un contador.
+def selects(contador: ContadorConsultas):
+    return [sentencia for sentencia, _ in contador.sentencias if sentencia.lstrip().upper().startswith("SELECT")]
+
+#Con los nombres en cache, 'create_libro' solo comprueba cada acierto por id y nombre (sin buscar por nombre).
+def test_acierto_de_cache_se_comprueba_por_id(motor_catalogo, nombres):
+    with Session(motor_catalogo) as session:
+        servicios.create_libro(session, libro(nombres, "cache-1"))
+        session.commit()
+    #Como 'get_session': la respuesta se serializa despues del COMMIT con los objetos en memoria.
+    with Session(motor_catalogo, expire_on_commit=False) as session, ContadorConsultas(motor_catalogo) as contador:
+        creado = servicios.create_libro(session, libro(nombres, "cache-2"))
+        session.commit()
+    #Una comprobacion por nombre enviado (editorial, publico, serie, 3 autores y 1 categoria) mas la carga
+    #del libro para la respuesta: el libro con sus relaciones muchos-a-uno, autores y categorias.
+    comprobaciones = [sentencia for sentencia in selects(contador) if ".id = ? AND " in sentencia]
+    assert len(comprobaciones) == 7
+    assert len(selects(contador)) == 7 + 3
+    respuesta = esquemas.LibroLeerCompleto.model_validate(creado)
+    assert respuesta.editorial.nombre == nombres["editorial"]
+    assert [autor.nombre for autor in respuesta.autores] == nombres["autores"]
+
+#Un id de la cache que ya no existe se descarta antes del INSERT: el nombre se resuelve en la BD.
+def test_id_viejo_en_cache(motor_catalogo, nombres):
+    cache.autores.guardar(nombres["autores"][1], 10 ** 9)
+    with Session(motor_catalogo) as session:
+        creado = servicios.create_libro(session, libro(nombres, "cache-3"))
+        assert [autor.nombre for autor in creado.autores] == nombres["autores"]
+        session.commit()
+    assert cache.autores.obtener(nombres["autores"][1]) not in (None, 10 ** 9)
+
+#SQLite reutiliza el id de la ultima fila borrada: un nombre viejo en cache no debe enlazar el libro a la fila nueva.
+def test_id_reutilizado_por_otra_fila(motor_catalogo, nombres):
+    with Session(motor_catalogo) as session:
+        viejo = servicios.create_autor(session, esquemas.AutorCreacion(nombre="Autor viejo")).id
+        session.commit()
+    assert cache.autores.obtener("Autor viejo") == viejo
+    #Otro proceso borra el autor (sin pasar por la cache) y se inserta uno nuevo con el mismo id.
+    with Session(motor_catalogo) as session:
+        session.exec(delete(modelo.Autor).where(modelo.Autor.id == viejo))
+        nuevo = servicios.create_autor(session, esquemas.AutorCreacion(nombre="Autor nuevo")).id
+        session.commit()
+    assert nuevo == viejo
+    datos = libro(nombres, "cache-4").model_copy(update={"autores_nombres": ["Autor viejo"]})
+    with Session(motor_catalogo) as session:
+        with pytest.raises(HTTPException) as error:
+            servicios.create_libro(session, datos)
+        session.rollback()
+    assert error.value.status_code == 404
+    assert cache.autores.obtener("Autor viejo") is None
+
+#Los nombres creados en una transaccion que se deshace no llegan a la cache; los confirmados si.
+def test_cache_se_llena_al_confirmar(motor_catalogo):
+    with Session(motor_catalogo) as session:
+        servicios.create_autor(session, esquemas.AutorCreacion(nombre="Autor fantasma"))
+        servicios.create_autores_lote(session, [esquemas.AutorCreacion(nombre="Autor fantasma del lote")])
+        session.rollback()
+    assert cache.autores.obtener("Autor fantasma") is None
+    assert cache.autores.obtener("Autor fantasma del lote") is None
+    with Session(motor_catalogo) as session:
+        creado = servicios.create_autor(session, esquemas.AutorCreacion(nombre="Autor fantasma"))
+        #Antes del COMMIT todavia no esta en la cache.
+        assert cache.autores.obtener("Autor fantasma") is None
+        session.commit()
+        assert cache.autores.obtener("Autor fantasma") == creado.id
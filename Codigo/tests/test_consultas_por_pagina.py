@@ -0,0 +1,59 @@
+#Pruebas: numero de consultas por pagina de los servicios 'get_libros_*'
+
+#Cargar una pagina de libros completos (con editorial, direccion, publico, serie, autores y categorias)
+#debe costar el mismo numero de consultas con 1, 10 o 100 libros: las relaciones se cargan por lotes,
+#no una por libro ("N+1").
+
+#Modulos y librerias necesarias
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+from Esquemas import esquemas
+from Servicios import servicios
+from conftest import ContadorConsultas
+
+#Tamanos de pagina que se comparan.
+TAMANOS_PAGINA = (1, 10, 100)
+
+#Define una funcion de ayuda que devuelve el nombre mas usado de una relacion (asi sus paginas llegan a 100 libros).
+def mas_usado(session: Session, consulta: str) -> str:
+    return session.connection().execute(text(consulta)).scalar()
+
+#Valores del catalogo con los que se filtran los servicios.
+@pytest.fixture(scope="module")
+def valores(motor_catalogo):
+    with Session(motor_catalogo) as session:
+        return {
+            "autor": mas_usado(session, "SELECT a.nombre FROM autor a JOIN libroautorlink l ON l.autor_id = a.id GROUP BY a.id ORDER BY COUNT(*) DESC LIMIT 1"),
+            "categoria": mas_usado(session, "SELECT c.nombre FROM categoria c JOIN librocategorialink l ON l.categoria_id = c.id GROUP BY c.id ORDER BY COUNT(*) DESC LIMIT 1"),
+            "serie": mas_usado(session, "SELECT s.nombre FROM serie s JOIN libro l ON l.serie_id = s.id GROUP BY s.id ORDER BY COUNT(*) DESC LIMIT 1"),
+            "publico": mas_usado(session, "SELECT p.tipo FROM publicoobjetivo p JOIN libro l ON l.publico_objetivo_id = p.id GROUP BY p.id ORDER BY COUNT(*) DESC LIMIT 1"),
+        }
+
+#Cada caso recibe (sesion, valores, tamano de pagina) y devuelve la pagina.
+CASOS = {
+    "get_libros_todos": lambda session, valores, limit: servicios.get_libros_todos(session, limit=limit),
+    "get_libros_por_autor": lambda session, valores, limit: servicios.get_libros_por_autor(session, valores["autor"], limit=limit),
+    "get_libros_por_categoria": lambda session, valores, limit: servicios.get_libros_por_categoria(session, valores["categoria"], limit=limit),
+    "get_libros_por_serie": lambda session, valores, limit: servicios.get_libros_por_serie(session, valores["serie"], limit=limit),
+    "get_libros_por_publico": lambda session, valores, limit: servicios.get_libros_por_publico(session, valores["publico"], limit=limit),
+    "filtrar_libros": lambda session, valores, limit: servicios.filtrar_libros(
+        session, esquemas.FiltrosLibro(categoria=valores["categoria"], precio_max=1000), limit=limit
+    ),
+}
+
+@pytest.mark.parametrize("nombre", list(CASOS))
+def test_consultas_constantes_por_pagina(motor_catalogo, valores, nombre):
+    consultas = {}
+    for limit in TAMANOS_PAGINA:
+        #Una sesion nueva por pagina: el mapa de identidad no debe servir objetos de la pagina anterior.
+        with Session(motor_catalogo) as session, ContadorConsultas(motor_catalogo) as contador:
+            libros = CASOS[nombre](session, valores, limit)
+            #La serializacion de la respuesta tampoco debe disparar cargas perezosas.
+            for libro in libros:
+                esquemas.LibroLeerCompleto.model_validate(libro)
+        assert len(libros) == limit, f"el catalogo no alcanza para una pagina de {limit} libros"
+        consultas[limit] = contador.total
+    #El numero de consultas no depende del tamano de la pagina (1 de libros + 1 por cada lista de relaciones).
+    assert len(set(consultas.values())) == 1, consultas
+    assert consultas[1] <= 3, consultas
@@ -0,0 +1,101 @@
+#Pruebas del borrado por conjuntos (DELETE /Autores/, DELETE /Editoriales/ y servicios.borrar_por_ids):
+#cascada de enlaces, libros sin editorial, conteos por faceta, versiones y el limite de IDs por peticion
+
+#Modulos y librerias necesarias
+import pytest
+from sqlmodel import Session, select
+from Modelo import modelo
+from Servicios import cache, database, facetas, servicios, versiones
+
+#Define una funcion de ayuda que arma una editorial con su direccion.
+def editorial(nombre: str) -> dict:
+    return {"nombre": nombre, "direccion": {"calle": "Calle 1", "ciudad_pais": "CDMX, Mexico", "codigo_postal": "01000"}}
+
+#Define una funcion de ayuda que lee el estado de la BD que cambia con los borrados.
+def estado():
+    with Session(database.engine) as session:
+        return {
+            "enlaces_autores": set(session.exec(select(modelo.LibroAutorLink.libro_id, modelo.LibroAutorLink.autor_id)).all()),
+            "editoriales_libros": dict(session.exec(select(modelo.Libro.isbn, modelo.Libro.editorial_id)).all()),
+            "direcciones": set(session.exec(select(modelo.Direccion.id)).all()),
+            "conteos": {
+                (fila.faceta, fila.entidad_id): fila.total for fila in session.exec(select(modelo.ConteoFaceta)).all()
+            },
+            "versiones": {fila.entidad: fila.version for fila in session.exec(select(modelo.VersionCatalogo)).all()},
+        }
+
+#Catalogo de prueba: 2 editoriales, 3 autores y 3 libros (creado una vez por modulo).
+@pytest.fixture(scope="module")
+def catalogo(cliente):
+    editoriales = {}
+    for nombre in ("Norte", "Sur"):
+        editoriales[nombre] = cliente.post("/Editoriales/", json=editorial(nombre)).json()
+    autores = {a["nombre"]: a["id"] for a in cliente.post("/Autores/bulk", json=[{"nombre": n} for n in ("Uno", "Dos", "Tres")]).json()["creados"]}
+    respuesta = cliente.post("/Libros/bulk", json=[
+        {"titulo": "A", "isbn": "borrado-a", "precio": 1.0, "formato": "Físico", "editorial_nombre": "Norte", "autores_nombres": ["Uno", "Dos"]},
+        {"titulo": "B", "isbn": "borrado-b", "precio": 1.0, "formato": "Físico", "editorial_nombre": "Sur", "autores_nombres": ["Dos", "Tres"]},
+        {"titulo": "C", "isbn": "borrado-c", "precio": 1.0, "formato": "Físico", "editorial_nombre": "Norte", "autores_nombres": ["Tres"]},
+    ])
+    libros = dict(zip(("borrado-a", "borrado-b", "borrado-c"), respuesta.json()["ids"]))
+    return {"editoriales": editoriales, "autores": autores, "libros": libros}
+
+#DELETE /Autores/ borra los autores y, en cascada, sus enlaces; quita sus conteos y sube la version.
+def test_borrado_masivo_de_autores(cliente, catalogo):
+    autores, libros = catalogo["autores"], catalogo["libros"]
+    cache.autores.guardar("Uno", autores["Uno"])
+    antes = estado()
+    respuesta = cliente.request("DELETE", "/Autores/", json=[autores["Uno"], autores["Dos"], autores["Uno"], 10 ** 6])
+    assert respuesta.status_code == 200
+    assert respuesta.json() == {"eliminados": [autores["Uno"], autores["Dos"]], "no_encontrados": [10 ** 6]}
+    despues = estado()
+    #Solo quedan los enlaces del autor que no se borro; los libros siguen existiendo.
+    assert despues["enlaces_autores"] == {(libros["borrado-b"], autores["Tres"]), (libros["borrado-c"], autores["Tres"])}
+    assert set(despues["editoriales_libros"]) == set(antes["editoriales_libros"])
+    #Los conteos de los autores borrados desaparecen y el del que queda no cambia.
+    assert (facetas.AUTORES, autores["Uno"]) not in despues["conteos"]
+    assert (facetas.AUTORES, autores["Dos"]) not in despues["conteos"]
+    assert despues["conteos"][(facetas.AUTORES, autores["Tres"])] == 2
+    assert despues["versiones"][versiones.AUTORES] == antes["versiones"][versiones.AUTORES] + 1
+    assert cache.autores.obtener("Uno") is None
+    #Los libros ya no muestran a los autores borrados.
+    assert cliente.get("/Libros/isbn/borrado-a").json()["autores"] == []
+
+#DELETE /Editoriales/ deja los libros sin editorial, borra las direcciones y quita los conteos.
+def test_borrado_masivo_de_editoriales(cliente, catalogo):
+    norte, sur = catalogo["editoriales"]["Norte"], catalogo["editoriales"]["Sur"]
+    antes = estado()
+    respuesta = cliente.request("DELETE", "/Editoriales/", json=[norte["id"], 10 ** 6])
+    assert respuesta.status_code == 200
+    assert respuesta.json() == {"eliminados": [norte["id"]], "no_encontrados": [10 ** 6]}
+    despues = estado()
+    assert despues["editoriales_libros"] == {"borrado-a": None, "borrado-b": sur["id"], "borrado-c": None}
+    assert despues["direcciones"] == antes["direcciones"] - {norte["direccion"]["id"]}
+    assert (facetas.EDITORIALES, norte["id"]) not in despues["conteos"]
+    assert despues["conteos"][(facetas.EDITORIALES, sur["id"])] == 1
+    assert despues["versiones"][versiones.EDITORIALES] == antes["versiones"][versiones.EDITORIALES] + 1
+    #Las facetas coinciden con un recalculo completo despues de los borrados.
+    with Session(database.engine) as session:
+        facetas.recalcular(session)
+        recalculado = {(f.faceta, f.entidad_id): f.total for f in session.exec(select(modelo.ConteoFaceta)).all()}
+        session.rollback()
+    assert {clave: total for clave, total in despues["conteos"].items() if total} == recalculado
+
+#Un lote sin IDs o con mas de MAX_IDS_LOTE se rechaza con 422 antes de borrar nada.
+@pytest.mark.parametrize("ruta", ["/Autores/", "/Editoriales/", "/Categorias/"])
+@pytest.mark.parametrize("total", [0, servicios.MAX_IDS_LOTE + 1])
+def test_limite_de_ids(cliente, ruta, total):
+    antes = estado()
+    respuesta = cliente.request("DELETE", ruta, json=list(range(1, total + 1)))
+    assert respuesta.status_code == 422
+    assert estado() == antes
+
+#'borrar_por_ids' borra por bloques de TAMANO_LOTE_NOMBRES y devuelve solo las filas que existian.
+def test_borrar_por_ids_por_bloques(cliente, monkeypatch):
+    ids = [a["id"] for a in cliente.post("/Autores/bulk", json=[{"nombre": f"Bloque {n}"} for n in range(5)]).json()["creados"]]
+    monkeypatch.setattr(servicios, "TAMANO_LOTE_NOMBRES", 2)
+    with Session(database.engine) as session:
+        filas = servicios.borrar_por_ids(session, modelo.Autor, [*ids, 10 ** 6], modelo.Autor.nombre)
+        session.commit()
+    assert sorted(filas) == [(autor_id, f"Bloque {n}") for n, autor_id in enumerate(ids)]
+    with Session(database.engine) as session:
+        assert session.exec(select(modelo.Autor).where(modelo.Autor.id.in_(ids))).all() == []
@@ -0,0 +1,32 @@
+#Pruebas del GET condicional: ETag en las lecturas, 304 con If-None-Match y ETag nuevo despues de una escritura
+
+#Modulos y librerias necesarias
+import pytest
+
+#Crea un libro para que las lecturas no esten vacias (una vez por modulo).
+@pytest.fixture(scope="module", autouse=True)
+def libro(cliente):
+    respuesta = cliente.post("/Libros/bulk", json=[{"titulo": "Libro ETag", "isbn": "etag-1", "precio": 10.0, "formato": "Físico"}])
+    assert respuesta.json()["creados"] == 1
+
+#Con el ETag de la respuesta anterior la lectura responde 304 sin cuerpo; tras una escritura el ETag cambia.
+@pytest.mark.parametrize("ruta", ["/Libros/", "/Libros/isbn/etag-1", "/Libros/facetas"])
+def test_304_hasta_la_siguiente_escritura(cliente, ruta):
+    primera = cliente.get(ruta)
+    assert primera.status_code == 200
+    etag = primera.headers["ETag"]
+    repetida = cliente.get(ruta, headers={"If-None-Match": etag})
+    assert repetida.status_code == 304
+    assert repetida.content == b""
+    assert repetida.headers["ETag"] == etag
+    #Crear un autor cambia la version del catalogo: el ETag guardado ya no es el actual.
+    assert cliente.post("/Autores/", json={"nombre": f"Autor {ruta}"}).status_code == 200
+    nueva = cliente.get(ruta, headers={"If-None-Match": etag})
+    assert nueva.status_code == 200
+    assert nueva.headers["ETag"] != etag
+
+#El ETag depende de los parametros: otra pagina u otro formato no reutiliza el ETag de la primera.
+def test_etag_por_parametros(cliente):
+    etag = cliente.get("/Libros/", params={"limit": 5}).headers["ETag"]
+    assert cliente.get("/Libros/", params={"limit": 6}, headers={"If-None-Match": etag}).status_code == 200
+    assert cliente.get("/Libros/", params={"limit": 5}, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
@@ -0,0 +1,42 @@
+#Pruebas de GET /Libros/export: el catalogo completo por bloques, sin ocupar una conexion de lectura todo el envio
+#y con un limite de exportaciones simultaneas
+
+#Modulos y librerias necesarias
+import json
+from Rutas import libros
+from Servicios import database
+
+#Define una funcion de ayuda que crea 'total' libros sin relaciones con la carga masiva.
+def crear_libros(cliente, total: int):
+    respuesta = cliente.post("/Libros/bulk", json=[
+        {"titulo": f"Libro {numero}", "isbn": f"export-{numero}", "precio": 10.0, "formato": "Digital"}
+        for numero in range(total)
+    ])
+    assert respuesta.status_code == 200
+    assert respuesta.json()["creados"] == total
+
+#Exporta todos los libros (mas de un bloque) y al terminar la conexion de lectura y el lugar de exportacion quedan libres.
+def test_exporta_todo_el_catalogo(cliente, monkeypatch):
+    crear_libros(cliente, 25)
+    #Bloques chicos para que la exportacion pida la conexion varias veces.
+    monkeypatch.setattr(libros.servicios.iterar_libros_planos, "__defaults__", (10,))
+    respuesta = cliente.get("/Libros/export")
+    assert respuesta.status_code == 200
+    isbns = [json.loads(linea)["isbn"] for linea in respuesta.text.splitlines()]
+    assert isbns == [f"export-{numero}" for numero in range(25)]
+    assert database.read_engine.pool.checkedout() == 0
+    assert libros.exportaciones.acquire(blocking=False)
+    libros.exportaciones.release()
+
+#Con MAX_EXPORTACIONES en curso, otra exportacion recibe 503 sin abrir una sesion.
+def test_limite_de_exportaciones(cliente):
+    for _ in range(libros.MAX_EXPORTACIONES):
+        assert libros.exportaciones.acquire(blocking=False)
+    try:
+        respuesta = cliente.get("/Libros/export", params={"format": "csv"})
+        assert respuesta.status_code == 503
+        assert respuesta.headers["Retry-After"] == "5"
+    finally:
+        for _ in range(libros.MAX_EXPORTACIONES):
+            libros.exportaciones.release()
+    assert cliente.get("/Libros/export", params={"format": "csv"}).status_code == 200
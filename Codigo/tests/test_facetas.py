@@ -0,0 +1,72 @@
+#Prueba de los conteos por faceta: despues de crear, actualizar y borrar por la API, GET /Libros/facetas
+#devuelve lo mismo que un recalculo completo (facetas.SQL_RECALCULAR) desde las tablas
+
+#Modulos y librerias necesarias
+from sqlmodel import Session
+from Esquemas import esquemas
+from Servicios import database, facetas, servicios
+
+#Define una funcion de ayuda que arma una editorial con su direccion.
+def editorial(nombre: str) -> dict:
+    return {"nombre": nombre, "direccion": {"calle": "Calle 1", "ciudad_pais": "CDMX, Mexico", "codigo_postal": "01000"}}
+
+#Define una funcion de ayuda que arma un libro con sus relaciones por nombre.
+def libro(isbn: str, editorial=None, serie=None, publico=None, autores=(), categorias=()) -> dict:
+    return {
+        "titulo": f"Libro {isbn}", "isbn": isbn, "precio": 10.0, "formato": "Físico",
+        "editorial_nombre": editorial, "serie_nombre": serie, "publico_objetivo_tipo": publico,
+        "autores_nombres": list(autores), "categorias_nombres": list(categorias),
+    }
+
+#Define una funcion de ayuda que devuelve las facetas recalculadas desde cero (sin confirmar el recalculo).
+def facetas_recalculadas() -> dict:
+    with Session(database.engine) as session:
+        facetas.recalcular(session)
+        resultado = servicios.get_facetas(session, esquemas.FiltrosLibro())
+        session.rollback()
+    return resultado.model_dump()
+
+def test_facetas_coinciden_con_el_recalculo(cliente):
+    #Entidades: dos editoriales, una serie, un publico, tres autores y dos categorias.
+    for nombre in ("Editorial Uno", "Editorial Dos"):
+        assert cliente.post("/Editoriales/", json=editorial(nombre)).status_code == 200
+    assert cliente.post("/Series/", json={"nombre": "Saga"}).status_code == 200
+    assert cliente.post("/PublicoObjetivo/", json={"tipo": "Juvenil"}).status_code == 200
+    autores = cliente.post("/Autores/bulk", json=[{"nombre": n} for n in ("Ana", "Beto", "Caro")]).json()["creados"]
+    categorias = cliente.post("/Categorias/bulk", json=[{"nombre": n} for n in ("Drama", "Misterio")]).json()["creados"]
+    ids_autores = {autor["nombre"]: autor["id"] for autor in autores}
+    ids_categorias = {categoria["nombre"]: categoria["id"] for categoria in categorias}
+
+    #Creacion de un libro (con un autor repetido en la lista) y carga masiva.
+    assert cliente.post("/Libros/", json=libro(
+        "faceta-1", "Editorial Uno", "Saga", "Juvenil", ["Ana", "Beto", "Ana"], ["Drama"],
+    )).status_code == 200
+    respuesta = cliente.post("/Libros/bulk", json=[
+        libro("faceta-2", "Editorial Dos", "Saga", None, ["Beto", "Caro"], ["Drama", "Misterio"]),
+        libro("faceta-3", "Editorial Uno", None, "Juvenil", ["Caro"], ["Misterio"]),
+        libro("faceta-4", "Editorial Dos", None, None, ["Ana"], []),
+    ])
+    assert respuesta.json()["creados"] == 3
+
+    #Actualizacion de una relacion (nuevo nombre de la editorial que usan dos libros).
+    editorial_uno = next(e for e in cliente.get("/Editoriales/").json() if e["nombre"] == "Editorial Uno")
+    assert cliente.patch(f"/Editoriales/{editorial_uno['id']}", json={"nombre": "Editorial Primera"}).status_code == 200
+
+    #Borrado de uno (autor y editorial) y borrado masivo (categoria).
+    assert cliente.delete(f"/Autores/{ids_autores['Ana']}").status_code == 204
+    editorial_dos = next(e for e in cliente.get("/Editoriales/").json() if e["nombre"] == "Editorial Dos")
+    assert cliente.delete(f"/Editoriales/{editorial_dos['id']}").status_code == 204
+    respuesta = cliente.request("DELETE", "/Categorias/", json=[ids_categorias["Misterio"], 10 ** 6])
+    assert respuesta.json() == {"eliminados": [ids_categorias["Misterio"]], "no_encontrados": [10 ** 6]}
+
+    #Los conteos mantenidos en cada escritura son los mismos que un recalculo completo.
+    respuesta = cliente.get("/Libros/facetas")
+    assert respuesta.status_code == 200
+    assert respuesta.json() == facetas_recalculadas()
+    #Y reflejan los cambios: sin 'Ana' ni 'Misterio' ni 'Editorial Dos', con el nombre nuevo de la editorial.
+    assert respuesta.json()["autores"] == [
+        {"id": ids_autores["Beto"], "nombre": "Beto", "total": 2},
+        {"id": ids_autores["Caro"], "nombre": "Caro", "total": 2},
+    ]
+    assert respuesta.json()["editoriales"] == [{"id": editorial_uno["id"], "nombre": "Editorial Primera", "total": 2}]
+    assert respuesta.json()["categorias"] == [{"id": ids_categorias["Drama"], "nombre": "Drama", "total": 2}]
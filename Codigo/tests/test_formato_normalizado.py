@@ -0,0 +1,45 @@
+#Pruebas de '?formato=normalizado': libros con ids de sus relaciones y cada entidad una sola vez en 'incluidos'
+
+#Modulos y librerias necesarias
+import pytest
+
+#Crea dos libros que comparten autor y serie (una vez por modulo).
+@pytest.fixture(scope="module", autouse=True)
+def libros(cliente):
+    assert cliente.post("/Autores/bulk", json=[{"nombre": "Autor Comun"}, {"nombre": "Autor Solo"}]).status_code == 200
+    assert cliente.post("/Series/", json={"nombre": "Serie Comun"}).status_code == 200
+    respuesta = cliente.post("/Libros/bulk", json=[
+        {"titulo": "Uno", "isbn": "normal-1", "precio": 5.0, "formato": "Digital",
+         "autores_nombres": ["Autor Comun", "Autor Solo"], "serie_nombre": "Serie Comun"},
+        {"titulo": "Dos", "isbn": "normal-2", "precio": 5.0, "formato": "Digital",
+         "autores_nombres": ["Autor Comun"], "serie_nombre": "Serie Comun"},
+    ])
+    assert respuesta.json()["creados"] == 2
+
+#Cada libro lleva los ids y las entidades compartidas aparecen una sola vez.
+def test_entidades_compartidas_una_vez(cliente):
+    respuesta = cliente.get("/Libros/", params={"formato": "normalizado"})
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    autores = cuerpo["incluidos"]["autores"]
+    ids_por_nombre = {autor["nombre"]: int(autor_id) for autor_id, autor in autores.items()}
+    assert sorted(ids_por_nombre) == ["Autor Comun", "Autor Solo"]
+    uno, dos = cuerpo["libros"]
+    assert uno["autores_ids"] == [ids_por_nombre["Autor Comun"], ids_por_nombre["Autor Solo"]]
+    assert dos["autores_ids"] == [ids_por_nombre["Autor Comun"]]
+    assert uno["serie_id"] == dos["serie_id"]
+    assert list(cuerpo["incluidos"]["series"].values()) == [{"nombre": "Serie Comun", "id": uno["serie_id"]}]
+    #Las relaciones vacias quedan en None, sin entradas en 'incluidos'.
+    assert uno["editorial_id"] is None
+    assert cuerpo["incluidos"]["editoriales"] == {}
+    assert "autores" not in uno
+
+#Con '?expand=' solo se incluyen las relaciones pedidas.
+def test_normalizado_con_expand(cliente):
+    cuerpo = cliente.get("/Libros/", params={"formato": "normalizado", "fields": "isbn", "expand": "serie"}).json()
+    assert set(cuerpo["incluidos"]) == {"series"}
+    assert [sorted(libro) for libro in cuerpo["libros"]] == [["id", "isbn", "serie_id"]] * 2
+
+#Un formato desconocido se rechaza con 422.
+def test_formato_desconocido(cliente):
+    assert cliente.get("/Libros/", params={"formato": "plano"}).status_code == 422
@@ -0,0 +1,37 @@
+#Pruebas de POST /Libros/isbn/lote: libros encontrados en el orden pedido, ISBN inexistentes y limite del cuerpo
+
+#Modulos y librerias necesarias
+import pytest
+from Rutas import libros
+
+#Crea los libros que se buscan por ISBN (una vez por modulo).
+@pytest.fixture(scope="module", autouse=True)
+def catalogo(cliente):
+    assert cliente.post("/Autores/", json={"nombre": "Autor ISBN"}).status_code == 200
+    respuesta = cliente.post("/Libros/bulk", json=[
+        {"titulo": f"Libro {numero}", "isbn": f"isbn-{numero}", "precio": 10.0, "formato": "Digital",
+         "autores_nombres": ["Autor ISBN"]}
+        for numero in range(3)
+    ])
+    assert respuesta.json()["creados"] == 3
+
+#Devuelve los libros completos en el orden pedido (sin repetir) y los ISBN que no existen.
+def test_encontrados_y_no_encontrados(cliente):
+    respuesta = cliente.post("/Libros/isbn/lote", json=["isbn-2", "no-existe", "isbn-0", "isbn-2"])
+    assert respuesta.status_code == 200
+    resultado = respuesta.json()
+    assert [libro["isbn"] for libro in resultado["libros"]] == ["isbn-2", "isbn-0"]
+    assert [autor["nombre"] for autor in resultado["libros"][0]["autores"]] == ["Autor ISBN"]
+    assert resultado["no_encontrados"] == ["no-existe"]
+
+#Con '?fields=' solo vuelven las columnas pedidas (y el 'id').
+def test_lote_con_proyeccion(cliente):
+    respuesta = cliente.post("/Libros/isbn/lote", params={"fields": "isbn"}, json=["isbn-1"])
+    assert respuesta.status_code == 200
+    assert [sorted(libro) for libro in respuesta.json()["libros"]] == [["id", "isbn"]]
+
+#Un cuerpo vacio o con mas de MAX_ISBNS_LOTE ISBN se rechaza con 422.
+@pytest.mark.parametrize("total", [0, libros.MAX_ISBNS_LOTE + 1])
+def test_limite_del_lote(cliente, total):
+    respuesta = cliente.post("/Libros/isbn/lote", json=[f"isbn-{numero}" for numero in range(total)])
+    assert respuesta.status_code == 422
@@ -0,0 +1,69 @@
+#Pruebas de POST /Libros/bulk: exito parcial con errores por indice, aislamiento por SAVEPOINT y limite del cuerpo
+
+#Modulos y librerias necesarias
+import pytest
+from Modelo import modelo
+from Servicios import servicios
+
+#Define una funcion de ayuda que arma un libro para el cuerpo de la carga masiva.
+def libro(isbn: str, **relaciones) -> dict:
+    return {"titulo": f"Libro {isbn}", "isbn": isbn, "precio": 10.0, "formato": "Físico", **relaciones}
+
+#Crea las entidades a las que se refieren los libros (una vez por modulo).
+@pytest.fixture(scope="module", autouse=True)
+def entidades(cliente):
+    assert cliente.post("/Autores/bulk", json=[{"nombre": "Autor A"}, {"nombre": "Autor B"}]).status_code == 200
+    assert cliente.post("/Categorias/", json={"nombre": "Novela"}).status_code == 200
+    assert cliente.post("/Libros/bulk", json=[libro("lote-existente")]).status_code == 200
+
+#Un lote mixto crea los libros validos y reporta cada invalido por su indice, con mensajes del dominio.
+def test_lote_mixto(cliente):
+    respuesta = cliente.post("/Libros/bulk", json=[
+        libro("lote-1", autores_nombres=["Autor A", "Autor B"], categorias_nombres=["Novela"]),
+        libro("lote-2", autores_nombres=["Autor inexistente"]),
+        libro("lote-existente"),
+        libro("lote-3", categorias_nombres=["Novela"]),
+        libro("lote-1"),
+        libro("lote-4", editorial_nombre="Editorial inexistente"),
+    ])
+    assert respuesta.status_code == 200
+    resultado = respuesta.json()
+    assert resultado["creados"] == 2
+    assert [(error["indice"], error["detalle"]) for error in resultado["errores"]] == [
+        (1, "Autor 'Autor inexistente' no encontrado"),
+        (2, "El ISBN 'lote-existente' ya existe"),
+        (4, "El ISBN 'lote-1' ya existe"),
+        (5, "Editorial 'Editorial inexistente' no encontrada"),
+    ]
+    creado = cliente.get("/Libros/isbn/lote-1").json()
+    assert [autor["nombre"] for autor in creado["autores"]] == ["Autor A", "Autor B"]
+    assert cliente.get("/Libros/isbn/lote-2").status_code == 404
+
+#Si un libro solo falla al insertarse (la restriccion de la BD), su bloque se deshace hasta el SAVEPOINT y se
+#reintenta libro por libro: los demas libros se crean y el error llega sin el texto de SQLite.
+def test_savepoint_aisla_el_libro_que_falla(cliente, monkeypatch):
+    original = servicios.get_ids_por_nombres
+    #Simula que la validacion previa no vio el ISBN repetido (ej. otra peticion lo inserto despues).
+    def sin_isbns(session, columna_nombre, columna_id, nombres):
+        return {} if columna_nombre is modelo.Libro.isbn else original(session, columna_nombre, columna_id, nombres)
+    monkeypatch.setattr(servicios, "get_ids_por_nombres", sin_isbns)
+    respuesta = cliente.post("/Libros/bulk", json=[
+        libro("savepoint-1", autores_nombres=["Autor A"]),
+        libro("lote-existente", autores_nombres=["Autor B"]),
+        libro("savepoint-2", categorias_nombres=["Novela"]),
+    ])
+    assert respuesta.status_code == 200
+    resultado = respuesta.json()
+    assert resultado["creados"] == 2
+    assert resultado["errores"] == [{"indice": 1, "isbn": "lote-existente", "detalle": "El ISBN 'lote-existente' ya existe"}]
+    for isbn in ("savepoint-1", "savepoint-2"):
+        assert cliente.get(f"/Libros/isbn/{isbn}").status_code == 200
+    #El libro que fallo no dejo enlaces: el libro existente sigue sin autores.
+    assert cliente.get("/Libros/isbn/lote-existente").json()["autores"] == []
+
+#Un cuerpo vacio o con mas de MAX_LIBROS_LOTE libros se rechaza antes de llegar al servicio.
+@pytest.mark.parametrize("total", [0, servicios.MAX_LIBROS_LOTE + 1])
+def test_limite_del_lote(cliente, total):
+    respuesta = cliente.post("/Libros/bulk", json=[libro(f"limite-{numero}") for numero in range(total)])
+    assert respuesta.status_code == 422
+    assert cliente.get("/Libros/isbn/limite-0").status_code == 404
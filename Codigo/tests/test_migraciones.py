@@ -0,0 +1,82 @@
+#Prueba de la migracion 4 sobre una base de datos anterior (user_version 3) con nombres repetidos:
+#los autores, series y publicos repetidos se fusionan en la fila de menor id, sus libros pasan a esa fila
+#y se crean los indices unicos
+
+#Modulos y librerias necesarias
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import SQLModel
+from Servicios.database import crear_indice_busqueda
+from Servicios.migraciones import MIGRACIONES, aplicar_migraciones
+from conftest import crear_motor
+
+#Indices que la migracion 4 vuelve unicos: (tabla, columna, indice).
+INDICES_UNICOS = [
+    ("autor", "nombre", "ix_autor_nombre"),
+    ("serie", "nombre", "ix_serie_nombre"),
+    ("publicoobjetivo", "tipo", "ix_publicoobjetivo_tipo"),
+]
+
+#Filas de la base de datos vieja: nombres repetidos con libros enlazados a cada copia.
+DATOS_V3 = [
+    "INSERT INTO autor (id, nombre) VALUES (1, 'Repetido'), (2, 'Unico'), (3, 'Repetido'), (4, 'Repetido')",
+    "INSERT INTO serie (id, nombre) VALUES (1, 'Saga'), (2, 'Saga'), (3, 'Otra')",
+    "INSERT INTO publicoobjetivo (id, tipo) VALUES (1, 'Juvenil'), (2, 'Adulto'), (3, 'Juvenil')",
+    "INSERT INTO libro (id, isbn, titulo, precio, formato, serie_id, publico_objetivo_id) VALUES "
+    "(1, 'v3-1', 'Uno', 1.0, 'Físico', 2, 3), (2, 'v3-2', 'Dos', 1.0, 'Físico', 1, 1), "
+    "(3, 'v3-3', 'Tres', 1.0, 'Físico', 3, 2)",
+    #El libro 1 tiene dos copias del mismo autor (se quedan en un solo enlace); el libro 3 solo la copia 4.
+    "INSERT INTO libroautorlink (libro_id, autor_id) VALUES (1, 1), (1, 3), (1, 2), (2, 4), (3, 4)",
+]
+
+#Base de datos con el esquema anterior a la migracion 4 (indices no unicos), con los datos repetidos y migrada.
+@pytest.fixture(scope="module")
+def conexion(tmp_path_factory):
+    motor = crear_motor(tmp_path_factory.mktemp("v3") / "v3.db")
+    SQLModel.metadata.create_all(motor)
+    crear_indice_busqueda(motor)
+    with motor.begin() as conexion:
+        for tabla, columna, indice in INDICES_UNICOS:
+            conexion.execute(text(f"DROP INDEX {indice}"))
+            conexion.execute(text(f"CREATE INDEX {indice} ON {tabla} ({columna})"))
+        for sentencia in DATOS_V3:
+            conexion.execute(text(sentencia))
+        conexion.execute(text("PRAGMA user_version = 3"))
+    assert aplicar_migraciones(motor) == MIGRACIONES[-1][0]
+    with motor.connect() as conexion:
+        yield conexion
+    motor.dispose()
+
+#Define una funcion de ayuda que ejecuta una consulta y devuelve todas sus filas como tuplas.
+def filas(conexion, consulta: str):
+    return [tuple(fila) for fila in conexion.execute(text(consulta)).all()]
+
+#Solo queda la fila de menor id de cada nombre.
+def test_fusiona_nombres_repetidos(conexion):
+    assert filas(conexion, "SELECT id, nombre FROM autor ORDER BY id") == [(1, "Repetido"), (2, "Unico")]
+    assert filas(conexion, "SELECT id, nombre FROM serie ORDER BY id") == [(1, "Saga"), (3, "Otra")]
+    assert filas(conexion, "SELECT id, tipo FROM publicoobjetivo ORDER BY id") == [(1, "Juvenil"), (2, "Adulto")]
+
+#Los libros y enlaces de las copias pasan a la fila que se conserva (sin enlaces duplicados ni perdidos).
+def test_reapunta_libros_y_enlaces(conexion):
+    assert filas(conexion, "SELECT libro_id, autor_id FROM libroautorlink ORDER BY libro_id, autor_id") == [
+        (1, 1), (1, 2), (2, 1), (3, 1),
+    ]
+    assert filas(conexion, "SELECT id, serie_id, publico_objetivo_id FROM libro ORDER BY id") == [
+        (1, 1, 1), (2, 1, 1), (3, 3, 2),
+    ]
+    #Los conteos por faceta se recalculan con las filas fusionadas.
+    assert filas(conexion, "SELECT entidad_id, total FROM conteofaceta WHERE faceta = 'autores' ORDER BY entidad_id") == [
+        (1, 3), (2, 1),
+    ]
+
+#Los indices son unicos y la BD rechaza un nombre repetido.
+@pytest.mark.parametrize("tabla, columna, indice", INDICES_UNICOS)
+def test_indices_unicos(conexion, tabla, columna, indice):
+    unicos = {fila[1]: fila[2] for fila in conexion.execute(text(f"PRAGMA index_list({tabla})")).all()}
+    assert unicos[indice] == 1
+    existente = conexion.execute(text(f"SELECT {columna} FROM {tabla} ORDER BY id LIMIT 1")).scalar()
+    with pytest.raises(IntegrityError):
+        conexion.execute(text(f"INSERT INTO {tabla} ({columna}) VALUES (:valor)"), {"valor": existente})
+    conexion.rollback()
@@ -0,0 +1,96 @@
+#Pruebas: planes de ejecucion (EXPLAIN QUERY PLAN) de las consultas de libros
+
+#Se parte de una base de datos "vieja" (sin los indices que agregan las migraciones 1 y 2, con 'user_version' 0),
+#se aplican las migraciones y se revisa el plan de cada sentencia que ejecutan los servicios 'get_libros_*'
+#y 'filtrar_libros': ninguna debe recorrer completas las tablas 'libro', 'libroautorlink' o 'librocategorialink'.
+#Asi, una migracion que reconstruya o reemplace esos indices (como la 4 y la 5) no puede perderlos sin avisar.
+
+#Modulos y librerias necesarias
+import re
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel
+from Esquemas import esquemas
+from Herramientas.generar_catalogo import generar_catalogo
+from Servicios import servicios
+from Servicios.database import crear_indice_busqueda
+from Servicios.migraciones import MIGRACIONES, aplicar_migraciones
+from Servicios.paginacion import codificar_cursor
+from conftest import ContadorConsultas, crear_motor
+
+#Un paso del plan que recorre completa una de estas tablas (con o sin alias, ej. 'SCAN libro' o 'SCAN libro AS libro_1').
+RECORRIDO_COMPLETO = re.compile(r"^SCAN (libro|libroautorlink|librocategorialink)\b(?!_fts)")
+
+#Indices que crean las migraciones 1 y 2 (la base de datos vieja no los tiene).
+INDICES_MIGRADOS = [
+    re.search(r"CREATE INDEX IF NOT EXISTS (\w+)", sentencia).group(1)
+    for numero, _, sentencias in MIGRACIONES if numero <= 2
+    for sentencia in sentencias
+]
+
+#Base de datos creada sin los indices migrados, actualizada con 'aplicar_migraciones' y llenada con un catalogo.
+@pytest.fixture(scope="module")
+def motor_migrado(tmp_path_factory):
+    motor = crear_motor(tmp_path_factory.mktemp("migrada") / "migrada.db")
+    SQLModel.metadata.create_all(motor)
+    crear_indice_busqueda(motor)
+    with motor.begin() as conexion:
+        for indice in INDICES_MIGRADOS:
+            conexion.execute(text(f"DROP INDEX {indice}"))
+        conexion.execute(text("PRAGMA user_version = 0"))
+    assert aplicar_migraciones(motor) == MIGRACIONES[-1][0]
+    generar_catalogo(motor, 2000)
+    yield motor
+    motor.dispose()
+
+#Valores que existen en el catalogo (se leen antes de capturar las sentencias de los servicios).
+@pytest.fixture(scope="module")
+def valores(motor_migrado):
+    with motor_migrado.connect() as conexion:
+        def valor(consulta: str):
+            return conexion.execute(text(consulta)).scalar()
+        return {
+            "autor": valor("SELECT nombre FROM autor ORDER BY id LIMIT 1"),
+            "categoria": valor("SELECT nombre FROM categoria ORDER BY id LIMIT 1"),
+            "serie": valor("SELECT nombre FROM serie ORDER BY id LIMIT 1"),
+            "publico": valor("SELECT tipo FROM publicoobjetivo ORDER BY id LIMIT 1"),
+            "isbn": valor("SELECT isbn FROM libro ORDER BY id LIMIT 1"),
+        }
+
+#Cada caso recibe (sesion, valores) y ejecuta el servicio.
+CASOS = {
+    #La primera pagina sin filtros recorre 'libro' en orden de id con LIMIT; se revisa la pagina por cursor.
+    "get_libros_todos": lambda session, valores: servicios.get_libros_todos(session, limit=20, cursor=codificar_cursor(1000)),
+    "get_libros_por_autor": lambda session, valores: servicios.get_libros_por_autor(session, valores["autor"], limit=20),
+    "get_libros_por_categoria": lambda session, valores: servicios.get_libros_por_categoria(session, valores["categoria"], limit=20),
+    "get_libros_por_serie": lambda session, valores: servicios.get_libros_por_serie(session, valores["serie"], limit=20),
+    "get_libros_por_publico": lambda session, valores: servicios.get_libros_por_publico(session, valores["publico"], limit=20),
+    "get_libro_por_isbn": lambda session, valores: servicios.get_libro_por_isbn(session, valores["isbn"]),
+    "filtrar_libros_categoria_precio_formato": lambda session, valores: servicios.filtrar_libros(
+        session, esquemas.FiltrosLibro(categoria=valores["categoria"], precio_max=300, formato="Físico"), limit=20
+    ),
+    "filtrar_libros_autor_ano": lambda session, valores: servicios.filtrar_libros(
+        session, esquemas.FiltrosLibro(autor=valores["autor"], ano_min=2000), limit=20
+    ),
+    "filtrar_libros_serie_publico": lambda session, valores: servicios.filtrar_libros(
+        session, esquemas.FiltrosLibro(serie=valores["serie"], publico=valores["publico"]), limit=20
+    ),
+}
+
+def test_migraciones_crean_los_indices(motor_migrado):
+    with motor_migrado.connect() as conexion:
+        indices = set(conexion.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert set(INDICES_MIGRADOS) <= indices
+
+@pytest.mark.parametrize("nombre", list(CASOS))
+def test_consultas_de_libros_usan_indices(motor_migrado, valores, nombre):
+    with Session(motor_migrado) as session:
+        #Captura las sentencias del servicio (la consulta principal y las de carga por lotes).
+        with ContadorConsultas(motor_migrado) as contador:
+            CASOS[nombre](session, valores)
+        consultas = [(sentencia, parametros) for sentencia, parametros in contador.sentencias if sentencia.lstrip().upper().startswith("SELECT")]
+        assert consultas
+        for sentencia, parametros in consultas:
+            plan = [fila[3] for fila in session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sentencia}", parametros)]
+            recorridos = [paso for paso in plan if RECORRIDO_COMPLETO.match(paso)]
+            assert not recorridos, f"{nombre} recorre una tabla completa:\n{sentencia}\n{plan}"
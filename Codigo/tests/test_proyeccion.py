@@ -0,0 +1,43 @@
+#Pruebas de '?fields=' y '?expand=' en las rutas de libros: solo las columnas y relaciones pedidas, 400 si no existen
+
+#Modulos y librerias necesarias
+import pytest
+
+#Crea un libro con autor y serie (una vez por modulo).
+@pytest.fixture(scope="module", autouse=True)
+def libro(cliente):
+    assert cliente.post("/Autores/", json={"nombre": "Autor Proyeccion"}).status_code == 200
+    assert cliente.post("/Series/", json={"nombre": "Serie Proyeccion"}).status_code == 200
+    respuesta = cliente.post("/Libros/bulk", json=[{
+        "titulo": "Libro Proyeccion", "isbn": "proyeccion-1", "precio": 12, "formato": "Físico",
+        "autores_nombres": ["Autor Proyeccion"], "serie_nombre": "Serie Proyeccion",
+    }])
+    assert respuesta.json()["creados"] == 1
+
+#Solo 'fields': esas columnas (mas el 'id') y ninguna relacion; el precio sigue siendo float.
+def test_solo_fields(cliente):
+    respuesta = cliente.get("/Libros/isbn/proyeccion-1", params={"fields": "titulo, precio"})
+    assert respuesta.status_code == 200
+    libro = respuesta.json()
+    assert set(libro) == {"titulo", "precio", "id"}
+    assert libro["precio"] == 12.0
+
+#Solo 'expand': todas las columnas y solo las relaciones pedidas.
+def test_solo_expand(cliente):
+    libros = cliente.get("/Libros/", params={"expand": "autores"}).json()
+    assert set(libros[0]) == {"isbn", "titulo", "edicion", "ano_publicacion", "paginas", "precio", "formato", "id", "autores"}
+    assert [autor["nombre"] for autor in libros[0]["autores"]] == ["Autor Proyeccion"]
+
+#Los dos juntos.
+def test_fields_y_expand(cliente):
+    libros = cliente.get("/Libros/", params={"fields": "isbn", "expand": "serie"}).json()
+    assert libros == [{"isbn": "proyeccion-1", "id": libros[0]["id"], "serie": {"nombre": "Serie Proyeccion", "id": libros[0]["serie"]["id"]}}]
+
+#Un nombre desconocido en cualquiera de los dos parametros es un 400 que lista los valores permitidos.
+@pytest.mark.parametrize("parametro, valor", [("fields", "isbn,clave"), ("expand", "autores,resenas")])
+def test_valor_desconocido(cliente, parametro, valor):
+    respuesta = cliente.get("/Libros/", params={parametro: valor})
+    assert respuesta.status_code == 400
+    detalle = respuesta.json()["detail"]
+    assert detalle.startswith(f"Valores no validos en '{parametro}': {valor.split(',')[1]}.")
+    assert "Permitidos:" in detalle
@@ -0,0 +1,61 @@
+#Pruebas de la unidad de trabajo (get_unidad_de_trabajo): un solo COMMIT al terminar la ruta; si la ruta falla
+#despues de que un servicio ya hizo 'flush', no queda ninguna fila escrita
+
+#Modulos y librerias necesarias
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from Esquemas import esquemas
+from Modelo import modelo
+from Servicios import cache, database, servicios
+from Servicios.database import UNIDAD_DE_TRABAJO
+
+#Aplicacion con rutas que escriben con los servicios reales y despues fallan (o no).
+@pytest.fixture(scope="module")
+def rutas(cliente):
+    app = FastAPI()
+
+    @app.post("/autor-y-falla")
+    def autor_y_falla(nombre: str, session: Session = UNIDAD_DE_TRABAJO):
+        servicios.create_autor(session, esquemas.AutorCreacion(nombre=nombre))
+        servicios.create_categorias_lote(session, [esquemas.CategoriaCrear(nombre=nombre)])
+        raise HTTPException(status_code=409, detail="Falla despues del flush")
+
+    @app.post("/autor-y-error")
+    def autor_y_error(nombre: str, session: Session = UNIDAD_DE_TRABAJO):
+        servicios.create_autor(session, esquemas.AutorCreacion(nombre=nombre))
+        raise RuntimeError("Error inesperado despues del flush")
+
+    @app.post("/autor")
+    def autor(nombre: str, session: Session = UNIDAD_DE_TRABAJO):
+        return servicios.create_autor(session, esquemas.AutorCreacion(nombre=nombre)).id
+
+    return TestClient(app, raise_server_exceptions=False)
+
+#Define una funcion de ayuda que lee lo que quedo confirmado en la BD.
+def confirmado(nombre: str):
+    with Session(database.engine) as session:
+        return {
+            "autor": session.exec(select(modelo.Autor.id).where(modelo.Autor.nombre == nombre)).first(),
+            "categoria": session.exec(select(modelo.Categoria.id).where(modelo.Categoria.nombre == nombre)).first(),
+            "versiones": {fila.entidad: fila.version for fila in session.exec(select(modelo.VersionCatalogo)).all()},
+        }
+
+@pytest.mark.parametrize("ruta, codigo", [("/autor-y-falla", 409), ("/autor-y-error", 500)])
+def test_la_ruta_falla_y_no_queda_nada(rutas, ruta, codigo):
+    antes = confirmado("Autor revertido")
+    respuesta = rutas.post(ruta, params={"nombre": "Autor revertido"})
+    assert respuesta.status_code == codigo
+    #Ni el autor, ni la categoria, ni los incrementos de version: todo se deshizo con el ROLLBACK.
+    assert confirmado("Autor revertido") == antes == {**antes, "autor": None, "categoria": None}
+    #Los nombres que la transaccion habia registrado no llegaron a la cache.
+    assert cache.autores.obtener("Autor revertido") is None
+    assert cache.categorias.obtener("Autor revertido") is None
+
+#Sin errores, lo que escribio el servicio se confirma al terminar la ruta.
+def test_la_ruta_termina_y_se_confirma(rutas):
+    respuesta = rutas.post("/autor", params={"nombre": "Autor confirmado"})
+    assert respuesta.status_code == 200
+    assert confirmado("Autor confirmado")["autor"] == respuesta.json()
+    assert cache.autores.obtener("Autor confirmado") == respuesta.json()
@@ -0,0 +1,46 @@
+#Pruebas de la URL de solo lectura que se arma a partir de LIBRERIA_BD_URL
+
+#Modulos y librerias necesarias
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from Servicios.database import argumentos_pool, url_solo_lectura
+
+#URLs de archivo (con y sin parametros) -> (archivo URI esperado, parametros esperados).
+URLS_ARCHIVO = {
+    "sqlite:///./libreria.db": ("file:./libreria.db", {"mode": "ro", "uri": "true"}),
+    "sqlite:////tmp/libreria.db?timeout=10": ("file:/tmp/libreria.db", {"timeout": "10", "mode": "ro", "uri": "true"}),
+    "sqlite:///file:libreria.db?uri=true&cache=shared": ("file:libreria.db", {"cache": "shared", "mode": "ro", "uri": "true"}),
+}
+
+#La URL de lectura abre el mismo archivo como URI con 'mode=ro' y conserva los parametros que ya traia.
+@pytest.mark.parametrize("url", URLS_ARCHIVO)
+def test_url_de_archivo(url):
+    lectura = make_url(url_solo_lectura(url))
+    base, parametros = URLS_ARCHIVO[url]
+    assert lectura.database == base
+    assert dict(lectura.query) == parametros
+
+#Una base de datos en memoria no tiene URL de lectura (otro engine veria otra base de datos vacia) ni tamanos de pool.
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite:///:memory:"])
+def test_url_en_memoria(url):
+    assert url_solo_lectura(url) is None
+    assert argumentos_pool(url) == {}
+    #El engine se puede crear con esos argumentos (antes 'max_overflow' lo hacia fallar).
+    create_engine(url, **argumentos_pool(url)).dispose()
+
+#Las conexiones de la URL de lectura leen el archivo pero no pueden escribir en el.
+def test_url_de_lectura_no_escribe(tmp_path):
+    ruta = tmp_path / "libreria.db"
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("CREATE TABLE libro (id INTEGER PRIMARY KEY)")
+    motor = create_engine(url_solo_lectura(f"sqlite:///{ruta}?timeout=5"))
+    try:
+        with motor.connect() as conexion:
+            assert conexion.execute(text("SELECT count(*) FROM libro")).scalar() == 0
+            with pytest.raises(OperationalError, match="readonly"):
+                conexion.execute(text("INSERT INTO libro (id) VALUES (1)"))
+    finally:
+        motor.dispose()